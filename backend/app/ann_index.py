@@ -0,0 +1,280 @@
+"""
+Approximate nearest neighbour index construction.
+
+Builds the FAISS index used for retrieval in one of three layouts, all
+inner-product over L2-normalized vectors and wrapped in `IndexIDMap2` so
+search results are chunk ids:
+
+    flat    exact brute-force scan (best for small corpora)
+    hnsw    graph index, fast and high recall, no in-place deletes
+    ivf     inverted lists over k-means cells, scales to large corpora
+
+RAG_INDEX_TYPE selects one, or "auto" picks by corpus size. Query-time knobs
+(nprobe for IVF, efSearch for HNSW) come from config and are applied on load.
+
+RAG_VECTOR_STORAGE picks how vectors are encoded inside the index:
+
+    float32  full precision
+    fp16     half precision (2x smaller)
+    sq8      8-bit scalar quantization (4x smaller)
+    pq       product quantization, RAG_PQ_M bytes per vector (~16x smaller)
+
+Quantized indexes can re-score their top candidates exactly against the
+float32 vectors kept (memory-mapped) in the chunk store; see RescoringIndex.
+"""
+import logging
+import math
+
+import faiss
+import numpy as np
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("flat", "hnsw", "ivf")
+VECTOR_STORAGES = ("float32", "fp16", "sq8", "pq")
+
+# FAISS scalar quantizer type of each SQ storage
+_SQ_TYPES = {
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+    "sq8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+
+def select_vector_storage(count: int, storage: str = None) -> str:
+    """
+    Resolve the configured vector storage for a corpus of `count` vectors.
+
+    PQ codebooks need enough training vectors (256 centroids per
+    sub-quantizer); smaller corpora fall back to SQ8.
+
+    Raises:
+        ValueError: If the storage type is unknown
+    """
+    storage = (storage or config.RAG_VECTOR_STORAGE).lower()
+    if storage not in VECTOR_STORAGES:
+        raise ValueError(f"Unknown RAG vector storage: {storage}")
+    if storage == "pq" and count < config.RAG_PQ_MIN_TRAIN:
+        logger.warning(
+            f"⚠ {count} vectors are too few to train PQ "
+            f"(need {config.RAG_PQ_MIN_TRAIN}) - using sq8"
+        )
+        return "sq8"
+    return storage
+
+
+def select_index_type(
+    count: int, index_type: str = None, storage: str = "float32"
+) -> str:
+    """
+    Resolve the configured index type for a corpus of `count` vectors.
+
+    Raises:
+        ValueError: If the index type is unknown
+    """
+    index_type = (index_type or config.RAG_INDEX_TYPE).lower()
+    if index_type == "auto":
+        if count >= config.RAG_INDEX_AUTO_IVF_MIN:
+            return "ivf"
+        if count >= config.RAG_INDEX_AUTO_HNSW_MIN:
+            # FAISS has no HNSW + PQ index with inner product
+            if storage == "pq":
+                return "ivf"
+            return "hnsw"
+        return "flat"
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown RAG index type: {index_type}")
+    return index_type
+
+
+def ivf_nlist(count: int) -> int:
+    """Number of IVF cells: configured, or ~4 * sqrt(n) capped by the corpus."""
+    nlist = config.RAG_IVF_NLIST or int(4 * math.sqrt(count))
+    # k-means needs several training points per cell
+    return max(1, min(nlist, count // 39 or 1))
+
+
+def pq_subquantizers(dimension: int) -> int:
+    """PQ bytes per vector: configured, or the largest divisor of d up to d / 4."""
+    if config.RAG_PQ_M:
+        return config.RAG_PQ_M
+    return next(m for m in range(dimension // 4, 0, -1) if dimension % m == 0)
+
+
+def _flat_index(dimension: int, storage: str):
+    if storage == "float32":
+        return faiss.IndexFlatIP(dimension)
+    if storage == "pq":
+        return faiss.IndexPQ(
+            dimension, pq_subquantizers(dimension), 8, faiss.METRIC_INNER_PRODUCT
+        )
+    return faiss.IndexScalarQuantizer(
+        dimension, _SQ_TYPES[storage], faiss.METRIC_INNER_PRODUCT
+    )
+
+
+def _hnsw_index(dimension: int, storage: str):
+    if storage == "float32":
+        inner = faiss.IndexHNSWFlat(
+            dimension, config.RAG_HNSW_M, faiss.METRIC_INNER_PRODUCT
+        )
+    elif storage == "pq":
+        raise ValueError("PQ storage is not supported with HNSW - use ivf")
+    else:
+        inner = faiss.IndexHNSWSQ(
+            dimension,
+            _SQ_TYPES[storage],
+            config.RAG_HNSW_M,
+            faiss.METRIC_INNER_PRODUCT,
+        )
+    inner.hnsw.efConstruction = config.RAG_HNSW_EF_CONSTRUCTION
+    return inner
+
+
+def _ivf_index(dimension: int, storage: str, count: int):
+    nlist = ivf_nlist(count)
+    quantizer = faiss.IndexFlatIP(dimension)
+    if storage == "float32":
+        return faiss.IndexIVFFlat(
+            quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT
+        )
+    if storage == "pq":
+        return faiss.IndexIVFPQ(
+            quantizer,
+            dimension,
+            nlist,
+            pq_subquantizers(dimension),
+            8,
+            faiss.METRIC_INNER_PRODUCT,
+        )
+    return faiss.IndexIVFScalarQuantizer(
+        quantizer, dimension, nlist, _SQ_TYPES[storage], faiss.METRIC_INNER_PRODUCT
+    )
+
+
+def build_index(
+    vectors: np.ndarray, ids: np.ndarray, index_type: str, storage: str = "float32"
+):
+    """
+    Build and populate an index of the given type and vector storage.
+
+    Args:
+        vectors: (n, d) float32 matrix of L2-normalized vectors
+        ids: (n,) int64 chunk id of each row
+        index_type: One of INDEX_TYPES
+        storage: One of VECTOR_STORAGES
+
+    Returns:
+        Populated `IndexIDMap2`
+
+    Raises:
+        ValueError: If the type or storage is unknown, or the combination
+            is not supported
+    """
+    dimension = vectors.shape[1]
+
+    if storage not in VECTOR_STORAGES:
+        raise ValueError(f"Unknown RAG vector storage: {storage}")
+    if index_type == "flat":
+        inner = _flat_index(dimension, storage)
+    elif index_type == "hnsw":
+        inner = _hnsw_index(dimension, storage)
+    elif index_type == "ivf":
+        inner = _ivf_index(dimension, storage, len(vectors))
+    else:
+        raise ValueError(f"Unknown RAG index type: {index_type}")
+
+    # IVF cells and quantizer codebooks are fitted on the corpus itself
+    if not inner.is_trained:
+        inner.train(vectors)
+
+    # The FAISS Python wrappers keep `inner` and `quantizer` alive for us
+    index = faiss.IndexIDMap2(inner)
+    index.add_with_ids(vectors, ids)
+    configure_search(index)
+    return index
+
+
+def inner_index(index):
+    """Return the concrete index under an ID map wrapper."""
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return faiss.downcast_index(index.index)
+    return index
+
+
+def index_type_of(index) -> str:
+    """Name of an index's layout (as in INDEX_TYPES), or its class name."""
+    inner = inner_index(index)
+    if isinstance(inner, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(inner, faiss.IndexIVF):
+        return "ivf"
+    if isinstance(
+        inner, (faiss.IndexFlat, faiss.IndexScalarQuantizer, faiss.IndexPQ)
+    ):
+        return "flat"
+    return type(inner).__name__
+
+
+def configure_search(index, nprobe: int = None, ef_search: int = None) -> None:
+    """
+    Apply query-time parameters (IVF nprobe, HNSW efSearch) to an index.
+
+    Args:
+        index: FAISS index (possibly ID-mapped)
+        nprobe: IVF cells to scan (defaults to config value)
+        ef_search: HNSW candidate list size (defaults to config value)
+    """
+    inner = inner_index(index)
+    if isinstance(inner, faiss.IndexIVF):
+        inner.nprobe = min(nprobe or config.RAG_IVF_NPROBE, inner.nlist)
+    elif isinstance(inner, faiss.IndexHNSW):
+        inner.hnsw.efSearch = ef_search or config.RAG_HNSW_EF_SEARCH
+
+
+class RescoringIndex:
+    """
+    Quantized index whose top candidates are re-scored with exact vectors.
+
+    Over-fetches `factor * k` candidates from the quantized index, then ranks
+    them by exact inner product against the float32 vectors of the chunk
+    store. Only the candidates' rows are read, so the full-precision vectors
+    can stay memory-mapped on disk.
+    """
+
+    def __init__(self, index, vectors: np.ndarray, position, factor: int = None):
+        """
+        Args:
+            index: Quantized FAISS index returning chunk ids
+            vectors: (n, d) float32 exact vectors (e.g. ChunkStore.vectors)
+            position: Callable mapping a chunk id to its row in `vectors`
+                (None if unknown), e.g. ChunkStore.position
+            factor: Candidates fetched per requested result (defaults to config)
+        """
+        self.index = index
+        self.vectors = vectors
+        self.position = position
+        self.factor = factor or config.RAG_RESCORE_FACTOR
+        self.ntotal = index.ntotal
+        self.d = index.d
+
+    def search(self, queries: np.ndarray, k: int):
+        """Return (scores, ids) like `faiss.Index.search`, exactly scored."""
+        _, candidates = self.index.search(queries, k * self.factor)
+        scores = np.full((len(queries), k), -np.inf, dtype="float32")
+        ids = np.full((len(queries), k), -1, dtype="int64")
+
+        for row, (query, row_ids) in enumerate(zip(queries, candidates)):
+            found = []  # (chunk id, chunk store position)
+            for chunk_id in row_ids:
+                position = self.position(int(chunk_id))
+                if chunk_id >= 0 and position is not None:
+                    found.append((int(chunk_id), position))
+            if not found:
+                continue
+            exact = self.vectors[[position for _, position in found]] @ query
+            best = np.argsort(-exact)[:k]
+            scores[row, : len(best)] = exact[best]
+            ids[row, : len(best)] = [found[i][0] for i in best]
+        return scores, ids
@@ -0,0 +1,106 @@
+"""
+Micro-batching of concurrent async calls.
+
+Callers submit single items; items arriving within a short window (or until
+the batch is full) are handed to one batch handler call, and each caller gets
+its own result back. Used to turn bursts of per-request work (query
+embeddings, index searches) into one upstream call or one matrix operation.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Collect concurrent submissions and process them as one batch."""
+
+    def __init__(
+        self,
+        handler: Callable[[List], Awaitable[List]],
+        max_batch_size: int,
+        max_wait: float,
+    ):
+        """
+        Args:
+            handler: Async callable taking a list of items and returning one
+                result per item, in order
+            max_batch_size: Flush as soon as this many items are waiting
+            max_wait: Seconds the first item of a batch may wait for company
+        """
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self._pending: List = []  # [(item, future)]
+        self._timer = None
+        self._tasks = set()
+
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    async def submit(self, item):
+        """
+        Queue an item and wait for its result.
+
+        Raises:
+            Exception: Whatever the handler raised for the item's batch
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        # Keep a reference so the task is not garbage collected mid-flight
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+        try:
+            results = await self.handler([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"Batch handler returned {len(results)} results for "
+                    f"{len(batch)} items"
+                )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            # A caller may have been cancelled while the batch ran
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict:
+        """Return batch count and average/largest batch size."""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0,
+            "largest_batch": self.largest_batch,
+        }
@@ -0,0 +1,178 @@
+"""
+Compact, memory-mappable storage for knowledge base chunks.
+
+Replaces the pickled metadata file with a directory of flat arrays:
+
+    text.bin            all chunk texts as one UTF-8 blob
+    offsets.npy         int64[n + 1] byte offsets of each chunk in text.bin
+    ids.npy             int64[n] FAISS id of each chunk
+    sorted_ids.npy      int64[n] ids sorted, for id -> position lookups
+    sorted_pos.npy      int64[n] position of each entry of sorted_ids
+    file_index.npy      int32[n] index into strings.json "files"/"sources"
+    chunk_ids.npy       int32[n] chunk number within its file
+    strings.json        interned file names and source paths
+    vectors.npy         float32[n, d] normalized vectors (optional, row i is
+                        chunk i) for the shared mmap search mode
+
+Everything is opened with mmap and only the top-k hits are decoded, so
+startup is cheap and workers on one host share the same pages.
+"""
+import json
+import logging
+import mmap
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def write_chunk_store(
+    path: str,
+    chunks: List[str],
+    metadata: List[Dict],
+    ids: List[int],
+    vectors: Optional[np.ndarray] = None,
+) -> None:
+    """
+    Write chunks and their metadata in the compact layout.
+
+    Files are written to a temporary directory and swapped in, so readers
+    never see a half-written store.
+
+    Args:
+        path: Store directory
+        chunks: Chunk texts
+        metadata: Per-chunk dicts with filename, chunk_id and source
+        ids: FAISS id of each chunk
+        vectors: Optional normalized vectors, one row per chunk
+    """
+    tmp_path = f"{path}.tmp"
+    os.makedirs(tmp_path, exist_ok=True)
+
+    encoded = [chunk.encode("utf-8") for chunk in chunks]
+    offsets = np.zeros(len(encoded) + 1, dtype="int64")
+    offsets[1:] = np.cumsum([len(data) for data in encoded])
+    with open(os.path.join(tmp_path, "text.bin"), "wb") as f:
+        for data in encoded:
+            f.write(data)
+
+    # Intern file names: each distinct (filename, source) is stored once
+    files, sources, file_positions = [], [], {}
+    file_index = np.zeros(len(metadata), dtype="int32")
+    for i, meta in enumerate(metadata):
+        key = (meta["filename"], meta["source"])
+        if key not in file_positions:
+            file_positions[key] = len(files)
+            files.append(meta["filename"])
+            sources.append(meta["source"])
+        file_index[i] = file_positions[key]
+
+    ids_array = np.asarray(ids, dtype="int64")
+    order = np.argsort(ids_array, kind="stable")
+
+    np.save(os.path.join(tmp_path, "offsets.npy"), offsets)
+    np.save(os.path.join(tmp_path, "ids.npy"), ids_array)
+    np.save(os.path.join(tmp_path, "sorted_ids.npy"), ids_array[order])
+    np.save(os.path.join(tmp_path, "sorted_pos.npy"), order.astype("int64"))
+    np.save(os.path.join(tmp_path, "file_index.npy"), file_index)
+    np.save(
+        os.path.join(tmp_path, "chunk_ids.npy"),
+        np.asarray([meta["chunk_id"] for meta in metadata], dtype="int32"),
+    )
+    if vectors is not None:
+        np.save(os.path.join(tmp_path, "vectors.npy"), vectors.astype("float32"))
+    with open(os.path.join(tmp_path, "strings.json"), "w", encoding="utf-8") as f:
+        json.dump({"files": files, "sources": sources}, f, ensure_ascii=False)
+
+    if os.path.exists(path):
+        old_path = f"{path}.old"
+        os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        for name in os.listdir(old_path):
+            os.remove(os.path.join(old_path, name))
+        os.rmdir(old_path)
+    else:
+        os.replace(tmp_path, path)
+
+
+class ChunkStore:
+    """Read-only, mmap-backed view over a chunk store directory."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+        self._text_file = open(os.path.join(path, "text.bin"), "rb")
+        size = os.fstat(self._text_file.fileno()).st_size
+        # mmap of an empty file is not allowed
+        self._text = (
+            mmap.mmap(self._text_file.fileno(), 0, access=mmap.ACCESS_READ)
+            if size
+            else b""
+        )
+
+        def _load(name):
+            return np.load(os.path.join(path, name), mmap_mode="r")
+
+        self._offsets = _load("offsets.npy")
+        self.ids = _load("ids.npy")
+        self._sorted_ids = _load("sorted_ids.npy")
+        self._sorted_pos = _load("sorted_pos.npy")
+        self._file_index = _load("file_index.npy")
+        self._chunk_ids = _load("chunk_ids.npy")
+
+        with open(os.path.join(path, "strings.json"), "r", encoding="utf-8") as f:
+            strings = json.load(f)
+        self._files = strings["files"]
+        self._sources = strings["sources"]
+
+        vectors_path = os.path.join(path, "vectors.npy")
+        self.vectors = (
+            np.load(vectors_path, mmap_mode="r")
+            if os.path.exists(vectors_path)
+            else None
+        )
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        """Check whether a complete store is present at path."""
+        return os.path.exists(os.path.join(path, "strings.json"))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def position(self, chunk_id: int) -> Optional[int]:
+        """
+        Map a FAISS id to a chunk position.
+
+        Args:
+            chunk_id: FAISS id returned by a search (-1 for padding)
+
+        Returns:
+            Chunk position, or None if the id is unknown
+        """
+        i = int(np.searchsorted(self._sorted_ids, chunk_id))
+        if i < len(self._sorted_ids) and self._sorted_ids[i] == chunk_id:
+            return int(self._sorted_pos[i])
+        return None
+
+    def chunk(self, position: int) -> str:
+        """Decode the text of one chunk."""
+        start, end = int(self._offsets[position]), int(self._offsets[position + 1])
+        return self._text[start:end].decode("utf-8")
+
+    def metadata(self, position: int) -> Dict:
+        """Build the metadata dict of one chunk."""
+        file_index = int(self._file_index[position])
+        return {
+            "filename": self._files[file_index],
+            "chunk_id": int(self._chunk_ids[position]),
+            "source": self._sources[file_index],
+        }
+
+    def close(self) -> None:
+        """Release the mmap and file handle."""
+        if isinstance(self._text, mmap.mmap):
+            self._text.close()
+        self._text_file.close()
@@ -6,12 +6,28 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Backend root, so data paths do not depend on the working directory
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _default_knowledge_base_dir() -> str:
+    """
+    Knowledge base location: backend/knowledge_base in the Docker image (where
+    docker-compose mounts it), otherwise knowledge_base/ at the repo root.
+    """
+    mounted = os.path.join(BACKEND_DIR, "knowledge_base")
+    if os.path.isdir(mounted):
+        return mounted
+    return os.path.join(os.path.dirname(BACKEND_DIR), "knowledge_base")
+
 
 class Config:
     """Application configuration."""
 
     # API Keys
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
+    # Token for /admin endpoints (empty disables them)
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
 
     # Gemini Models
     CHAT_MODEL: str = "gemini-2.5-flash-lite"
@@ -23,18 +39,149 @@ class Config:
     CHAT_TOP_K: int = 40
     CHAT_MAX_OUTPUT_TOKENS: int = 1024
 
+    # Chat Session Config (in-memory session store bounds)
+    SESSION_MAX_COUNT: int = 1000
+    SESSION_IDLE_TTL: float = 3600  # seconds without activity before expiry
+    SESSION_MAX_HISTORY_BYTES: int = 64 * 1024  # per session, oldest turns trimmed
+    SESSION_MAX_TOTAL_BYTES: int = 64 * 1024 * 1024  # across all sessions
+    SESSION_SWEEP_INTERVAL: float = 60  # seconds between idle sweeps
+
+    # Chat Session Store Config (persistent history shared by all workers)
+    SESSION_STORE_BACKEND: str = os.getenv("SESSION_STORE_BACKEND", "sqlite")
+    SESSION_STORE_PATH: str = os.getenv(
+        "SESSION_STORE_PATH", os.path.join(BACKEND_DIR, "sessions.db")
+    )
+    SESSION_STORE_TTL: float = 7 * 24 * 3600  # seconds, idle sessions purged
+
+    # Resume Store Config (generated resumes, shared by all workers)
+    RESUME_STORE_BACKEND: str = os.getenv("RESUME_STORE_BACKEND", "sqlite")
+    RESUME_STORE_PATH: str = os.getenv(
+        "RESUME_STORE_PATH", os.path.join(BACKEND_DIR, "resumes.db")
+    )
+    RESUME_TTL: float = 30 * 24 * 3600  # seconds
+
+    # Job Scrape Cache Config (keyed by canonical job URL, shared by workers)
+    SCRAPE_CACHE_ENABLED: bool = (
+        os.getenv("SCRAPE_CACHE_ENABLED", "true").lower() == "true"
+    )
+    SCRAPE_CACHE_PATH: str = os.getenv(
+        "SCRAPE_CACHE_PATH", os.path.join(BACKEND_DIR, "scrape_cache.db")
+    )
+    SCRAPE_CACHE_TTL: float = 24 * 3600  # seconds an entry is served as fresh
+    # Further seconds a stale entry is served while refreshed in the background
+    # (0 disables stale-while-revalidate)
+    SCRAPE_CACHE_STALE_TTL: float = 6 * 24 * 3600
+
+    # Job Scrape Mode: "local" fetches and cleans the page here, then makes one
+    # structured call; "url_context" lets Gemini fetch the page (two calls);
+    # "auto" tries local first and falls back to url_context
+    SCRAPE_MODE: str = os.getenv("SCRAPE_MODE", "auto")
+    SCRAPE_FETCH_TIMEOUT: float = 10.0  # seconds
+    SCRAPE_MAX_REDIRECTS: int = 5  # each hop is checked for a public address
+    SCRAPE_MAX_PAGE_BYTES: int = 2 * 1024 * 1024
+    SCRAPE_MAX_TEXT_CHARS: int = 20_000  # extracted text sent to the model
+    SCRAPE_MIN_TEXT_CHARS: int = 500  # less usually means a JS-rendered page
+    SCRAPE_USER_AGENT: str = (
+        "Mozilla/5.0 (compatible; GrowthWithFlowBot/1.0; +job-scraper)"
+    )
+
     # RAG Config
     RAG_TOP_K: int = 3
     RAG_SIMILARITY_THRESHOLD: float = 0.3
     RAG_CHUNK_SIZE: int = 1000
     RAG_CHUNK_OVERLAP: int = 200
+    # Share the index between workers via mmap instead of a per-process copy
+    RAG_INDEX_MMAP: bool = os.getenv("RAG_INDEX_MMAP", "true").lower() == "true"
+    # Versioned index artifacts (ingest publishes, workers hot-reload)
+    RAG_INDEX_DIR: str = os.getenv(
+        "RAG_INDEX_DIR", os.path.join(BACKEND_DIR, "index_versions")
+    )
+    RAG_INDEX_KEEP_VERSIONS: int = 3  # pruned by `python ingest.py`
+    RAG_INDEX_WATCH_INTERVAL: float = float(
+        os.getenv("RAG_INDEX_WATCH_INTERVAL", "30")
+    )  # 0 disables polling (workers then need a restart after an ingest)
+    # Versions a worker has polled within this many seconds are never pruned
+    RAG_INDEX_IN_USE_GRACE: float = 3 * RAG_INDEX_WATCH_INTERVAL + 60
+    # ANN index layout: flat, hnsw, ivf, or auto (picked by corpus size)
+    RAG_INDEX_TYPE: str = os.getenv("RAG_INDEX_TYPE", "auto")
+    RAG_INDEX_AUTO_HNSW_MIN: int = 10_000  # vectors; below this auto uses flat
+    RAG_INDEX_AUTO_IVF_MIN: int = 1_000_000  # vectors; HNSW graph gets too large
+    RAG_HNSW_M: int = 32
+    RAG_HNSW_EF_CONSTRUCTION: int = 200
+    RAG_HNSW_EF_SEARCH: int = int(os.getenv("RAG_HNSW_EF_SEARCH", "64"))
+    RAG_IVF_NLIST: int = 0  # 0 = about 4 * sqrt(vectors)
+    RAG_IVF_NPROBE: int = int(os.getenv("RAG_IVF_NPROBE", "16"))
+    # Vector encoding inside the index: float32, fp16, sq8 or pq
+    RAG_VECTOR_STORAGE: str = os.getenv("RAG_VECTOR_STORAGE", "float32")
+    RAG_PQ_M: int = 0  # PQ bytes per vector; 0 = dimension / 4 (16x smaller)
+    RAG_PQ_MIN_TRAIN: int = 256 * 39  # vectors needed to train PQ codebooks
+    # Re-rank quantized results exactly against the float32 chunk store vectors
+    RAG_RESCORE: bool = os.getenv("RAG_RESCORE", "true").lower() == "true"
+    RAG_RESCORE_FACTOR: int = 4  # candidates fetched per requested result
+
+    # Ingest Pipeline Config (run in-process at startup when no index exists)
+    KNOWLEDGE_BASE_DIR: str = os.getenv(
+        "KNOWLEDGE_BASE_DIR", _default_knowledge_base_dir()
+    )
+    INGEST_CHECKPOINT_DIR: str = os.path.join(BACKEND_DIR, "ingest_checkpoint")
+
+    # Query Micro-Batching Config (concurrent searches share one embedding
+    # call and one index search)
+    QUERY_BATCH_MAX_WAIT_MS: float = 5
+    QUERY_BATCH_MAX_SIZE: int = 32
+
+    # Candidate Profile Config (DYNAMIC_CV context, precomputed per index)
+    CANDIDATE_PROFILE_TOP_K: int = 10
+    CANDIDATE_PROFILE_THRESHOLD: float = 0.2
+
+    # CV Generation Config: "single" asks for the whole resume in one call;
+    # "sections" (opt-in) generates the content sections concurrently, then
+    # the match analysis from the merged resume - lower latency, but every
+    # section request resends the full prompt (about 5x the input tokens)
+    CV_GENERATION_MODE: str = os.getenv("CV_GENERATION_MODE", "single")
+    CV_SECTION_RETRIES: int = 2  # extra attempts for a failed section
+
+    # CV Generation Jobs Config (DYNAMIC_CV runs on a bounded worker pool)
+    CV_JOB_WORKERS: int = int(os.getenv("CV_JOB_WORKERS", "2"))  # concurrent jobs
+    CV_JOB_MAX_QUEUED: int = 50  # waiting jobs; beyond this /chat answers 503
+    CV_JOB_TTL: float = 3600  # seconds a job stays queryable after its last event
+    # Job state shared by worker processes, so any of them answers status and
+    # event requests: "sqlite" (all workers on a host) or "memory" (only valid
+    # with a single worker process)
+    CV_JOB_STORE_BACKEND: str = os.getenv("CV_JOB_STORE_BACKEND", "sqlite")
+    CV_JOB_STORE_PATH: str = os.getenv(
+        "CV_JOB_STORE_PATH", os.path.join(BACKEND_DIR, "cv_jobs.db")
+    )
+    CV_JOB_POLL_INTERVAL: float = 0.5  # seconds, following another worker's job
+
+    # Semantic Answer Cache Config (PRESENTATION first turns)
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 256
+    SEMANTIC_CACHE_TTL: float = 24 * 3600  # seconds
+    SEMANTIC_CACHE_MAX_DISTANCE: float = 0.08  # cosine distance (1 - similarity)
 
     # Embedding Config
+    # Output dimensionality of stored/searched vectors (0 = model's full size),
+    # reduced by the API ("api") or a PCA fitted at ingest ("pca")
+    EMBEDDING_DIMENSION: int = int(os.getenv("EMBEDDING_DIMENSION", "0"))
+    EMBEDDING_REDUCTION: str = os.getenv("EMBEDDING_REDUCTION", "api")
     EMBEDDING_BATCH_SIZE: int = 100
+    INGEST_CONCURRENCY: int = 4  # embedding batches in flight during ingest
+    EMBEDDING_REQUESTS_PER_MINUTE: int = 100  # 0 = unlimited
+    EMBEDDING_TOKENS_PER_MINUTE: int = 1_000_000  # 0 = unlimited
+
+    # Embedding Cache Config (query embeddings)
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 1024
+    EMBEDDING_CACHE_TTL: float = 7 * 24 * 3600  # seconds
+    EMBEDDING_CACHE_DISK_PATH: str = os.getenv(
+        "EMBEDDING_CACHE_DISK_PATH", ""
+    )  # empty = memory only
 
     # Retry Config
     MAX_RETRIES: int = 3
-    RETRY_BASE_DELAY: float = 2.0  # seconds
+    RETRY_BASE_DELAY: float = 1.0  # seconds, doubled per attempt (full jitter)
+    RETRY_MAX_DELAY: float = 8.0  # seconds, cap on a single backoff sleep
+    RETRY_DEADLINE: float = 60.0  # seconds, total budget per upstream call
 
 
 config = Config()
@@ -0,0 +1,428 @@
+"""
+Background CV generation jobs.
+
+Resume generation (retrieval + structured generation + storage) runs on a
+fixed pool of CV_JOB_WORKERS workers fed by a bounded queue, which caps the
+number of concurrent heavy generations. A DYNAMIC_CV request either waits for
+its job or gets the job id back right away (`async_job`) and follows the
+job's progress events over SSE or by polling:
+
+    queued -> started -> retrieval_done -> generation_done -> stored -> done
+                                                         (or at any point) error
+
+A job runs in the process that accepted it, which streams its events as they
+happen. Every change is also written to a job store shared by all workers on
+the host (SQLite by default), so status and event requests answered by
+another worker process read the job from there. Jobs are kept for CV_JOB_TTL
+seconds after their last change; the resume itself is in the resume store.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from .config import config
+from .flows import generate_cv
+from .storage import open_sqlite
+
+logger = logging.getLogger(__name__)
+
+# Job pipeline: (form_data, progress callback) -> final payload
+JobHandler = Callable[[dict, Callable[[str, dict], None]], Awaitable[dict]]
+
+FINISHED_STATUSES = ("done", "failed")
+
+
+def job_status(record: dict) -> dict:
+    """Polling view of a job record (see `CVJob.to_record`)."""
+    events = record["events"]
+    return {
+        "job_id": record["job_id"],
+        "status": record["status"],
+        "stage": events[-1][0] if events else None,
+        "events": [event for event, _ in events],
+        "result": record["result"],
+        "error": record["error"],
+    }
+
+
+class CVJobStore(ABC):
+    """Interface for job records shared by the worker processes."""
+
+    @abstractmethod
+    def put(self, record: dict) -> None:
+        """Save a job record unless a newer one (higher `seq`) is stored."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return a job record, or None if unknown or expired."""
+
+
+class MemoryCVJobStore(CVJobStore):
+    """In-process store (single worker process only)."""
+
+    def __init__(self, ttl_seconds: float = None):
+        self.ttl_seconds = ttl_seconds or config.CV_JOB_TTL
+        self._lock = threading.Lock()
+        # {job_id: (updated_at, record)}
+        self._records: Dict[str, Tuple[float, dict]] = {}
+
+    def put(self, record: dict) -> None:
+        now = time.time()
+        with self._lock:
+            stored = self._records.get(record["job_id"])
+            if stored is None:
+                # New job: drop expired ones, keeping the store bounded
+                self._records = {
+                    job_id: entry
+                    for job_id, entry in self._records.items()
+                    if entry[0] > now - self.ttl_seconds
+                }
+            elif stored[1]["seq"] >= record["seq"]:
+                return
+            self._records[record["job_id"]] = (now, record)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._records.get(job_id)
+        if entry is None or entry[0] <= time.time() - self.ttl_seconds:
+            return None
+        return entry[1]
+
+
+class SQLiteCVJobStore(CVJobStore):
+    """
+    Job records in SQLite, so any worker can answer status polls and stream
+    progress for a job running in another worker.
+    """
+
+    def __init__(self, path: str = None, ttl_seconds: float = None):
+        self.path = path or config.CV_JOB_STORE_PATH
+        self.ttl_seconds = ttl_seconds or config.CV_JOB_TTL
+        self._lock = threading.Lock()
+        self._db = open_sqlite(
+            self.path,
+            """
+            CREATE TABLE IF NOT EXISTS cv_jobs (
+                job_id TEXT PRIMARY KEY,
+                seq INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                record TEXT NOT NULL
+            )
+            """,
+        )
+        logger.info(f"✓ SQLite CV job store at {self.path}")
+
+    def put(self, record: dict) -> None:
+        now = time.time()
+        payload = json.dumps(record, ensure_ascii=False)
+        with self._lock, self._db:
+            if record["seq"] == 1:
+                # New job: prune records not updated within the TTL
+                self._db.execute(
+                    "DELETE FROM cv_jobs WHERE updated_at <= ?",
+                    (now - self.ttl_seconds,),
+                )
+            # Writes may land out of order; never replace a newer record
+            self._db.execute(
+                """
+                INSERT INTO cv_jobs VALUES (?, ?, ?, ?)
+                ON CONFLICT (job_id) DO UPDATE SET
+                    seq = excluded.seq,
+                    updated_at = excluded.updated_at,
+                    record = excluded.record
+                WHERE excluded.seq > cv_jobs.seq
+                """,
+                (record["job_id"], record["seq"], now, payload),
+            )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT record FROM cv_jobs WHERE job_id = ? AND updated_at > ?",
+                (job_id, time.time() - self.ttl_seconds),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+def create_job_store() -> CVJobStore:
+    """
+    Build the job store selected by config.CV_JOB_STORE_BACKEND.
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    backend = config.CV_JOB_STORE_BACKEND.lower()
+
+    if backend == "memory":
+        return MemoryCVJobStore()
+    if backend == "sqlite":
+        return SQLiteCVJobStore()
+
+    raise ValueError(f"Unknown CV job store backend: {config.CV_JOB_STORE_BACKEND}")
+
+
+class CVJob:
+    """State and progress events of one resume generation."""
+
+    def __init__(
+        self, form_data: dict, on_change: Optional[Callable[["CVJob"], None]] = None
+    ):
+        """
+        Args:
+            form_data: Job information and recruiter details
+            on_change: Called after every event (e.g. to persist the job)
+        """
+        self.job_id = str(uuid.uuid4())
+        self.form_data = form_data
+        self.status = "queued"  # queued, running, done, failed
+        self.events: List[Tuple[str, dict]] = []
+        self.result: Optional[dict] = None
+        self.error: Optional[dict] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.on_change = on_change
+        # Replaced on every event, so followers wake up exactly once per change
+        self._updated = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def emit(self, event: str, data: Optional[dict] = None) -> None:
+        """Record a progress event and wake up followers."""
+        self.events.append((event, data or {}))
+        self._updated.set()
+        self._updated = asyncio.Event()
+        if self.on_change is not None:
+            self.on_change(self)
+
+    def finish(self, result: dict = None, error: dict = None) -> None:
+        """Mark the job done (with its payload) or failed (with an error)."""
+        self.status = "failed" if error else "done"
+        self.result = result
+        self.error = error
+        self.finished_at = time.time()
+        if error:
+            self.emit("error", error)
+        else:
+            self.emit("done", result)
+
+    async def follow(self) -> AsyncIterator[Tuple[str, dict]]:
+        """Yield past events, then new ones as they happen, until finished."""
+        sent = 0
+        while True:
+            while sent < len(self.events):
+                yield self.events[sent]
+                sent += 1
+            if self.finished:
+                return
+            await self._updated.wait()
+
+    async def wait(self) -> None:
+        """Wait until the job is finished."""
+        async for _ in self.follow():
+            pass
+
+    def to_record(self) -> dict:
+        """JSON-serializable state, versioned by the number of events."""
+        return {
+            "job_id": self.job_id,
+            "seq": len(self.events),
+            "status": self.status,
+            "events": list(self.events),
+            "result": self.result,
+            "error": self.error,
+        }
+
+    def snapshot(self) -> dict:
+        """Job state for polling clients."""
+        return job_status(self.to_record())
+
+
+class CVJobQueue:
+    """Bounded queue of CV jobs drained by a fixed number of workers."""
+
+    def __init__(
+        self,
+        handler: JobHandler,
+        workers: int = None,
+        max_queued: int = None,
+        ttl_seconds: float = None,
+        store: Optional[CVJobStore] = None,
+    ):
+        """
+        Args:
+            handler: Pipeline run for each job
+            workers: Concurrent jobs (defaults to CV_JOB_WORKERS)
+            max_queued: Waiting jobs before submit fails (CV_JOB_MAX_QUEUED)
+            ttl_seconds: How long finished jobs are kept (CV_JOB_TTL)
+            store: Shared job store (by default created by `start` from
+                CV_JOB_STORE_BACKEND)
+        """
+        self.handler = handler
+        self.workers = workers or config.CV_JOB_WORKERS
+        self.max_queued = max_queued or config.CV_JOB_MAX_QUEUED
+        self.ttl_seconds = ttl_seconds or config.CV_JOB_TTL
+        self.store = store
+        self._queue: Optional[asyncio.Queue] = None
+        self._jobs: Dict[str, CVJob] = {}
+        self._pending_writes = set()
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+
+    def start(self) -> List[asyncio.Task]:
+        """Start the worker tasks (call from the event loop at startup)."""
+        if self.store is None:
+            self.store = create_job_store()
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        logger.info(f"✓ Started {self.workers} CV generation workers")
+        return [
+            asyncio.create_task(self._worker(i)) for i in range(self.workers)
+        ]
+
+    async def submit(self, form_data: dict) -> CVJob:
+        """
+        Enqueue a resume generation.
+
+        Returns once the job is in the shared store, so its id can be handed
+        out: status and event requests may reach another worker process.
+
+        Args:
+            form_data: Job information and recruiter details
+
+        Returns:
+            The queued job
+
+        Raises:
+            HTTPException: 503 if the workers are not started or the queue
+                is full
+        """
+        if self._queue is None or self._queue.full():
+            raise HTTPException(
+                status_code=503,
+                detail="Too many resume generations in progress",
+                headers={"Retry-After": "30"},
+            )
+        self._purge()
+
+        job = CVJob(form_data)
+        self._jobs[job.job_id] = job
+        job.emit("queued", {"position": self._queue.qsize() + 1})
+        self._queue.put_nowait(job)
+        # Later events are saved in the background (stores keep the highest seq)
+        job.on_change = self._persist
+        await self._save(job.to_record())
+        return job
+
+    def get(self, job_id: str) -> Optional[CVJob]:
+        """Look up a queued, running or recently finished job of this process."""
+        return self._jobs.get(job_id)
+
+    async def status(self, job_id: str) -> Optional[dict]:
+        """
+        Polling view of a job run by any worker process.
+
+        Returns:
+            See `job_status`, or None if the job is unknown or expired
+        """
+        job = self.get(job_id)
+        if job is not None:
+            return job.snapshot()
+        if self.store is None:
+            return None
+        record = await asyncio.to_thread(self.store.get, job_id)
+        return job_status(record) if record else None
+
+    async def follow(self, job_id: str) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        Yield a job's events until it is finished, from any worker process.
+
+        Jobs of this process are followed live; others are read from the
+        shared store every CV_JOB_POLL_INTERVAL seconds.
+        """
+        job = self.get(job_id)
+        if job is not None:
+            async for event in job.follow():
+                yield event
+            return
+
+        sent = 0
+        while self.store is not None:
+            record = await asyncio.to_thread(self.store.get, job_id)
+            if record is None:
+                return
+            for event, data in record["events"][sent:]:
+                yield event, data
+            sent = len(record["events"])
+            if record["status"] in FINISHED_STATUSES:
+                return
+            await asyncio.sleep(config.CV_JOB_POLL_INTERVAL)
+
+    def _persist(self, job: CVJob) -> None:
+        """Save a job's new state in a background task."""
+        task = asyncio.create_task(self._save(job.to_record()))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+
+    async def _save(self, record: dict) -> None:
+        """Write a job record to the shared store, off the event loop."""
+        if self.store is None:
+            return
+        try:
+            await asyncio.to_thread(self.store.put, record)
+        except Exception as e:
+            logger.warning(f"⚠ Could not save CV job state: {e}")
+
+    def _purge(self) -> None:
+        """Forget finished jobs older than the TTL."""
+        expired_before = time.time() - self.ttl_seconds
+        self._jobs = {
+            job_id: job
+            for job_id, job in self._jobs.items()
+            if not job.finished or job.finished_at > expired_before
+        }
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            job = await self._queue.get()
+            self._running += 1
+            job.status = "running"
+            job.emit("started", {"worker": worker_id})
+            try:
+                result = await self.handler(job.form_data, job.emit)
+                job.finish(result=result)
+                self._completed += 1
+            except HTTPException as e:
+                job.finish(error={"status_code": e.status_code, "detail": e.detail})
+                self._failed += 1
+            except Exception as e:
+                logger.error(f"✗ CV job {job.job_id} failed: {e}")
+                job.finish(error={"status_code": 500, "detail": str(e)})
+                self._failed += 1
+            finally:
+                self._running -= 1
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        """Worker pool and queue statistics."""
+        return {
+            "workers": self.workers,
+            "running": self._running,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_queued": self.max_queued,
+            "completed": self._completed,
+            "failed": self._failed,
+            "tracked_jobs": len(self._jobs),
+        }
+
+
+# Singleton instance
+cv_job_queue = CVJobQueue(generate_cv)
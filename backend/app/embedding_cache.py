@@ -0,0 +1,220 @@
+"""
+Bounded cache for query embeddings.
+
+An in-memory LRU tier with TTL sits in front of an optional SQLite tier so
+repeated queries (greetings, FAQ questions, fixed retrieval queries) skip the
+embedding round trip, including across restarts. The memory tier is checked
+inline; disk tier reads and writes run in a worker thread so they never block
+the event loop.
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .config import config
+from .embedding_reduction import api_output_dimensionality
+from .storage import open_sqlite
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keys: trim, collapse whitespace, lowercase."""
+    return _WHITESPACE_RE.sub(" ", text).strip().lower()
+
+
+class EmbeddingCache:
+    """LRU + TTL cache of embedding vectors with an optional on-disk tier."""
+
+    def __init__(
+        self,
+        max_entries: int = None,
+        ttl_seconds: float = None,
+        disk_path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries or config.EMBEDDING_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds or config.EMBEDDING_CACHE_TTL
+        self.disk_path = (
+            disk_path if disk_path is not None else config.EMBEDDING_CACHE_DISK_PATH
+        )
+
+        # key -> (created_at, vector)
+        self._entries: "OrderedDict[str, Tuple[float, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()  # memory tier and counters
+        self._db_lock = threading.Lock()  # disk tier (held in worker threads)
+        self._db: Optional[sqlite3.Connection] = None
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if self.disk_path:
+            self._open_disk_tier()
+
+    def _open_disk_tier(self) -> None:
+        """Open (or create) the SQLite tier. Failures disable the tier."""
+        try:
+            self._db = open_sqlite(
+                self.disk_path,
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, created_at REAL, vector BLOB)",
+            )
+            logger.info(f"✓ Embedding cache disk tier at {self.disk_path}")
+        except sqlite3.Error as e:
+            logger.warning(f"⚠ Embedding cache disk tier disabled: {e}")
+            self._db = None
+
+    @staticmethod
+    def make_key(text: str, task_type: str, model: str = None) -> str:
+        """
+        Build the cache key for a text.
+
+        Args:
+            text: Text that was embedded
+            task_type: Embedding task type (e.g. RETRIEVAL_QUERY)
+            model: Embedding model name (defaults to config value)
+
+        Returns:
+            Hex digest identifying (model, requested dimension, task_type,
+            normalized text)
+        """
+        model = model or config.EMBEDDING_MODEL
+        # Truncated API vectors differ from full ones for the same text
+        dimension = api_output_dimensionality() or 0
+        raw = f"{model}\x00{dimension}\x00{task_type}\x00{normalize_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get(
+        self, text: str, task_type: str, model: str = None
+    ) -> Optional[np.ndarray]:
+        """
+        Look up a cached embedding.
+
+        Args:
+            text: Text to look up
+            task_type: Embedding task type
+            model: Embedding model name (defaults to config value)
+
+        Returns:
+            The cached vector, or None on miss or expiry
+        """
+        key = self.make_key(text, task_type, model)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at, vector = entry
+                if time.time() - created_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return vector
+                del self._entries[key]
+                self.expirations += 1
+
+            if self._db is None:
+                self.misses += 1
+                return None
+
+        return await asyncio.to_thread(self._get_from_disk, key)
+
+    def _get_from_disk(self, key: str) -> Optional[np.ndarray]:
+        """Disk tier lookup (blocking), promoting hits to the memory tier."""
+        now = time.time()
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT created_at, vector FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+            expired = row is not None and now - row[0] > self.ttl_seconds
+            if expired:
+                self._db.execute("DELETE FROM embeddings WHERE key = ?", (key,))
+                self._db.commit()
+
+        with self._lock:
+            if row is None or expired:
+                if expired:
+                    self.expirations += 1
+                self.misses += 1
+                return None
+            vector = np.frombuffer(row[1], dtype="float32")
+            self._insert(key, row[0], vector)
+            self.disk_hits += 1
+            return vector
+
+    async def put(self, text: str, task_type: str, vector, model: str = None) -> None:
+        """
+        Store an embedding.
+
+        Args:
+            text: Text that was embedded
+            task_type: Embedding task type
+            vector: Embedding values
+            model: Embedding model name (defaults to config value)
+        """
+        key = self.make_key(text, task_type, model)
+        vector = np.asarray(vector, dtype="float32")
+        now = time.time()
+
+        with self._lock:
+            self._insert(key, now, vector)
+        if self._db is not None:
+            await asyncio.to_thread(self._put_on_disk, key, now, vector)
+
+    def _put_on_disk(self, key: str, created_at: float, vector: np.ndarray) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
+                (key, created_at, vector.tobytes()),
+            )
+            self._db.commit()
+
+    def _insert(self, key: str, created_at: float, vector: np.ndarray) -> None:
+        """Insert into the memory tier, evicting the least recently used entries."""
+        self._entries[key] = (created_at, vector)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached embedding (memory and disk)."""
+        with self._lock:
+            self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM embeddings")
+                self._db.commit()
+        logger.info("✓ Cleared embedding cache")
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": (
+                    (self.hits + self.disk_hits) / lookups if lookups else 0.0
+                ),
+                "disk_tier": self._db is not None,
+            }
+
+
+# Global embedding cache instance
+embedding_cache = EmbeddingCache()
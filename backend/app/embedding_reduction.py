@@ -0,0 +1,100 @@
+"""
+Reduced-dimension embeddings.
+
+EMBEDDING_DIMENSION (0 keeps the model's full size) shrinks every vector the
+RAG pipeline stores or searches, in one of two ways (EMBEDDING_REDUCTION):
+
+    api  the embedding API returns truncated vectors (output_dimensionality)
+    pca  full vectors are requested and projected with a PCA fitted on the
+         documents at ingest and saved next to the index
+
+Documents and queries go through `project`, so both sides always land in the
+same space.
+"""
+import logging
+from typing import Optional
+
+import faiss
+import numpy as np
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+REDUCTIONS = ("api", "pca")
+
+
+def reduction_settings() -> dict:
+    """
+    Configured reduction, as recorded in the index manifest.
+
+    Raises:
+        ValueError: If EMBEDDING_REDUCTION is unknown
+    """
+    if config.EMBEDDING_REDUCTION not in REDUCTIONS:
+        raise ValueError(f"Unknown embedding reduction: {config.EMBEDDING_REDUCTION}")
+    return {
+        "embedding_dimension": config.EMBEDDING_DIMENSION,
+        "embedding_reduction": config.EMBEDDING_REDUCTION
+        if config.EMBEDDING_DIMENSION
+        else None,
+    }
+
+
+def api_output_dimensionality() -> Optional[int]:
+    """Dimensionality to request from the embedding API (None for full size)."""
+    if config.EMBEDDING_DIMENSION and config.EMBEDDING_REDUCTION == "api":
+        return config.EMBEDDING_DIMENSION
+    return None
+
+
+def uses_pca() -> bool:
+    return bool(config.EMBEDDING_DIMENSION) and config.EMBEDDING_REDUCTION == "pca"
+
+
+def fit_pca(vectors: np.ndarray, dimension: int):
+    """
+    Fit a PCA projection of normalized document vectors.
+
+    Raises:
+        ValueError: If there are fewer vectors than output dimensions
+    """
+    if len(vectors) < dimension:
+        raise ValueError(
+            f"PCA to {dimension} dimensions needs at least {dimension} chunks, "
+            f"got {len(vectors)} - lower EMBEDDING_DIMENSION or use the api reduction"
+        )
+    pca = faiss.PCAMatrix(vectors.shape[1], dimension)
+    pca.train(vectors)
+    logger.info(f"✓ Fitted PCA {vectors.shape[1]} → {dimension} dimensions")
+    return pca
+
+
+def save_pca(pca, path: str) -> None:
+    faiss.write_VectorTransform(pca, path)
+
+
+def load_pca(path: str):
+    return faiss.read_VectorTransform(path)
+
+
+def project(embeddings, pca=None) -> np.ndarray:
+    """
+    Map raw embeddings into the index space.
+
+    Normalizes for cosine similarity, applies the PCA (if any) and normalizes
+    again, since the projection does not preserve vector length.
+
+    Args:
+        embeddings: (n, d) raw embeddings from the API
+        pca: Fitted PCA transform, or None
+
+    Returns:
+        (n, d') L2-normalized float32 matrix
+    """
+    vectors = np.array(embeddings).astype("float32")
+    faiss.normalize_L2(vectors)
+    if pca is not None:
+        vectors = np.ascontiguousarray(pca.apply(vectors), dtype="float32")
+        faiss.normalize_L2(vectors)
+    return vectors
@@ -3,13 +3,20 @@ Flow handlers for different chatbot flows.
 
 Each flow is responsible for handling a specific conversation type.
 """
-from .cv_flow import handle_job_scraping, handle_cv_generation
-from .roadmap_flow import handle_roadmap_flow
-from .presentation_flow import handle_presentation_flow
+from .cv_flow import (
+    handle_job_scraping,
+    generate_cv,
+    validate_cv_form_data,
+)
+from .roadmap_flow import handle_roadmap_flow, stream_roadmap_flow
+from .presentation_flow import handle_presentation_flow, stream_presentation_flow
 
 __all__ = [
     "handle_job_scraping",
-    "handle_cv_generation",
+    "generate_cv",
+    "validate_cv_form_data",
     "handle_roadmap_flow",
     "handle_presentation_flow",
+    "stream_roadmap_flow",
+    "stream_presentation_flow",
 ]
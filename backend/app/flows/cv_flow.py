@@ -5,24 +5,129 @@ This flow handles:
 1. Scraping job information from URLs
 2. Generating tailored resumes based on job requirements
 """
+import asyncio
+import json
 import logging
 import uuid
+from typing import Callable, Dict, Optional
 from fastapi import HTTPException
-from fastapi.responses import JSONResponse
+from pydantic import ValidationError
 
 from ..gemini_service import gemini_service
 from ..rag_service import rag_service
-from ..resume_models import StructuredResume, Language
+from ..resume_models import (
+    RESUME_SECTION_MODELS,
+    Language,
+    StructuredResume,
+)
 from .. import prompts
 from .. import storage
 from ..models import JobScrapingRequest, JobScrapingResponse
+from ..scrape_cache import canonicalize_url, get_scrape_cache
+from ..page_fetcher import UnsafeURLError, page_fetcher
+from ..config import config
 
 logger = logging.getLogger(__name__)
 
 
+# Background refreshes of stale scrape cache entries, by canonical URL
+_refresh_tasks: Dict[str, asyncio.Task] = {}
+
+
+async def _extract_locally(job_url: str) -> Optional[dict]:
+    """
+    Fetch and clean the page here, then make one structured-output call.
+
+    Returns:
+        Parsed job data, or None if the page had too little content (e.g.
+        rendered client-side)
+
+    Raises:
+        Exception: If fetching the page or the Gemini call fails
+    """
+    page_text = await page_fetcher.fetch_main_text(job_url)
+    if len(page_text) < config.SCRAPE_MIN_TEXT_CHARS:
+        logger.warning(f"Only {len(page_text)} characters of content on {job_url}")
+        return None
+
+    prompt = prompts.get_job_extraction_prompt(job_url, page_text)
+    return await gemini_service.generate_structured_output(
+        prompt, prompts.JOB_SCRAPING_SCHEMA, temperature=0.2
+    )
+
+
+async def _extract_with_url_context(job_url: str) -> Optional[dict]:
+    """Let Gemini fetch the page with URL context (two calls)."""
+    # Get prompt and schema from prompts module
+    prompt = prompts.get_job_scraping_prompt(job_url)
+    schema = prompts.JOB_SCRAPING_SCHEMA
+
+    return await gemini_service.generate_structured_output_with_url(
+        prompt, schema, temperature=0.2
+    )
+
+
+async def _scrape_job(job_url: str) -> Optional[dict]:
+    """
+    Scrape a job URL in the configured SCRAPE_MODE.
+
+    Returns:
+        JobScrapingResponse fields, or None if nothing was extracted
+
+    Raises:
+        UnsafeURLError: If the URL may not be fetched from the server
+    """
+    mode = config.SCRAPE_MODE.lower()
+    parsed_data = None
+
+    if mode in ("local", "auto"):
+        try:
+            parsed_data = await _extract_locally(job_url)
+        except UnsafeURLError:
+            raise
+        except Exception as e:
+            if mode == "local":
+                raise
+            logger.warning(f"⚠ Local fetch failed, using URL context: {e}")
+
+    if parsed_data is None and mode in ("url_context", "auto"):
+        parsed_data = await _extract_with_url_context(job_url)
+
+    if not parsed_data:
+        return None
+
+    return JobScrapingResponse(
+        company_name=parsed_data.get("company_name", ""),
+        job_title=parsed_data.get("job_title", ""),
+        job_description=parsed_data.get("job_description", ""),
+        main_missions=parsed_data.get("main_missions", ""),
+        qualifications=parsed_data.get("qualifications", ""),
+        additional_info=parsed_data.get("additional_info", ""),
+    ).model_dump()
+
+
+async def _refresh_scrape(job_url: str, canonical_url: str) -> None:
+    """Re-scrape a stale cache entry in the background."""
+    try:
+        data = await _scrape_job(job_url)
+        if data:
+            await asyncio.to_thread(get_scrape_cache().put, canonical_url, data)
+            logger.info(f"✓ Refreshed cached scrape of {canonical_url}")
+    except Exception as e:
+        logger.warning(f"⚠ Background refresh of {canonical_url} failed: {e}")
+    finally:
+        _refresh_tasks.pop(canonical_url, None)
+
+
 async def handle_job_scraping(request: JobScrapingRequest) -> JobScrapingResponse:
     """
-    Extract job information from URL using Gemini's URL context feature.
+    Extract job information from a job posting URL.
+
+    The page is fetched and cleaned locally and parsed with one structured
+    call, or fetched by Gemini's URL context feature (see SCRAPE_MODE).
+    Results are cached by canonical URL: fresh entries are returned without
+    calling Gemini, stale ones are returned immediately and refreshed in the
+    background.
 
     Args:
         request: JobScrapingRequest with job_url
@@ -40,28 +145,38 @@ async def handle_job_scraping(request: JobScrapingRequest) -> JobScrapingRespons
 
     if not job_url:
         raise HTTPException(status_code=400, detail="job_url is required")
+    # Links pasted without a scheme ("example.com/jobs/1") are taken as https
+    if "://" not in job_url:
+        job_url = f"https://{job_url.lstrip('/')}"
+
+    canonical_url = canonicalize_url(job_url)
+    scrape_cache = get_scrape_cache()
+    cached = (
+        await asyncio.to_thread(scrape_cache.get, canonical_url)
+        if scrape_cache
+        else None
+    )
+    if cached is not None:
+        data, is_fresh = cached
+        if not is_fresh and canonical_url not in _refresh_tasks:
+            _refresh_tasks[canonical_url] = asyncio.create_task(
+                _refresh_scrape(job_url, canonical_url)
+            )
+        logger.info(
+            f"✓ Job scrape served from cache ({'fresh' if is_fresh else 'stale'})"
+        )
+        return JobScrapingResponse(**data)
 
     logger.info(f"Scraping job URL: {job_url}")
 
-    # Get prompt and schema from prompts module
-    prompt = prompts.get_job_scraping_prompt(job_url)
-    schema = prompts.JOB_SCRAPING_SCHEMA
-
     try:
-        parsed_data = gemini_service.generate_structured_output_with_url(
-            prompt, schema, temperature=0.2
-        )
+        data = await _scrape_job(job_url)
 
-        if parsed_data:
+        if data:
             logger.info("✓ Job information extracted from URL")
-            return JobScrapingResponse(
-                company_name=parsed_data.get("company_name", ""),
-                job_title=parsed_data.get("job_title", ""),
-                job_description=parsed_data.get("job_description", ""),
-                main_missions=parsed_data.get("main_missions", ""),
-                qualifications=parsed_data.get("qualifications", ""),
-                additional_info=parsed_data.get("additional_info", ""),
-            )
+            if scrape_cache:
+                await asyncio.to_thread(scrape_cache.put, canonical_url, data)
+            return JobScrapingResponse(**data)
         else:
             logger.warning("URL extraction failed")
             raise HTTPException(
@@ -70,6 +185,12 @@ async def handle_job_scraping(request: JobScrapingRequest) -> JobScrapingRespons
             )
     except HTTPException:
         raise
+    except UnsafeURLError as e:
+        logger.warning(f"⚠ Refused to fetch job URL: {e}")
+        raise HTTPException(
+            status_code=400,
+            detail="Cette URL ne peut pas être récupérée (adresse non publique).",
+        )
     except Exception as e:
         logger.error(f"Error extracting from URL: {e}")
         raise HTTPException(
@@ -78,20 +199,135 @@ async def handle_job_scraping(request: JobScrapingRequest) -> JobScrapingRespons
         )
 
 
-async def handle_cv_generation(form_data: dict) -> JSONResponse:
+async def _generate_resume_section(
+    prompt: str, section: str, generated: Optional[dict] = None
+) -> Optional[dict]:
+    """
+    Generate and validate one resume section, retrying on failure.
+
+    Args:
+        prompt: Full CV generation prompt (shared by all sections)
+        section: Key of RESUME_SECTION_MODELS
+        generated: Sections generated so far, shown to this one
+
+    Returns:
+        The section's fields, or None if every attempt failed
+    """
+    model = RESUME_SECTION_MODELS[section]
+    section_prompt = prompts.get_cv_section_prompt(
+        prompt,
+        section,
+        json.dumps(generated, ensure_ascii=False) if generated else None,
+    )
+    schema = model.model_json_schema()
+    attempts = config.CV_SECTION_RETRIES + 1
+
+    for attempt in range(1, attempts + 1):
+        data = await gemini_service.generate_structured_output(
+            prompt=section_prompt, response_schema=schema, temperature=0.4
+        )
+        if data is None:
+            logger.warning(
+                f"⚠ Resume section '{section}' failed (attempt {attempt}/{attempts})"
+            )
+            continue
+        try:
+            return model.model_validate(data).model_dump()
+        except ValidationError as e:
+            logger.warning(
+                f"⚠ Resume section '{section}' is invalid "
+                f"(attempt {attempt}/{attempts}): {e}"
+            )
+
+    logger.error(f"✗ Resume section '{section}' failed after {attempts} attempts")
+    return None
+
+
+async def _generate_resume_by_sections(prompt: str) -> Optional[dict]:
+    """
+    Generate the resume as concurrent section requests and merge them.
+
+    Output tokens dominate the latency of a single full-resume call; content
+    sections are independent given the candidate and job context, so they
+    are generated in parallel. The match analysis summarises that content,
+    so it is generated last, from the merged sections.
+
+    Args:
+        prompt: Full CV generation prompt
+
+    Returns:
+        StructuredResume fields, or None if a section could not be generated
+    """
+    sections = [name for name in RESUME_SECTION_MODELS if name != "match_analysis"]
+    results = await asyncio.gather(
+        *(_generate_resume_section(prompt, section) for section in sections)
+    )
+    if any(result is None for result in results):
+        return None
+
+    merged = {}
+    for result in results:
+        merged.update(result)
+
+    match_analysis = await _generate_resume_section(prompt, "match_analysis", merged)
+    if match_analysis is None:
+        return None
+    merged.update(match_analysis)
+    merged["languages"] = []  # Always overridden by the flow
+    logger.info(
+        f"✓ Generated resume from {len(sections)} concurrent sections "
+        "and the match analysis"
+    )
+    return merged
+
+
+# Progress callback of generate_cv: (event name, event data)
+ProgressCallback = Callable[[str, dict], None]
+
+
+def validate_cv_form_data(form_data: Optional[dict]) -> None:
+    """
+    Check the fields required for resume generation.
+
+    Raises:
+        HTTPException: 400 if form_data or a required field is missing
+    """
+    if not form_data:
+        raise HTTPException(
+            status_code=400, detail="form_data is required for DYNAMIC_CV flow"
+        )
+    if (
+        not form_data.get("company_name")
+        or not form_data.get("job_title")
+        or not form_data.get("job_description")
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="company_name, job_title, and job_description are required"
+        )
+
+
+async def generate_cv(
+    form_data: dict, progress: Optional[ProgressCallback] = None
+) -> dict:
     """
-    Generate tailored resume from complete job data.
+    Run the resume pipeline: candidate retrieval, generation, storage.
 
     Args:
         form_data: Dictionary containing job information and recruiter details
+        progress: Called with "retrieval_done", "generation_done" and
+            "stored" events as the pipeline advances (see app/cv_jobs.py)
 
     Returns:
-        JSONResponse with resume analysis and resume_id
+        RENDER_ANALYSIS payload with resume analysis and resume_id
 
     Raises:
         HTTPException: If generation fails or required data missing
     """
     logger.info("Using DYNAMIC_CV flow - Generating resume")
+    progress = progress or (lambda event, data: None)
+
+    validate_cv_form_data(form_data)
 
     # Extract all data from form_data
     company_name = form_data.get("company_name", "")
@@ -101,18 +337,8 @@ async def handle_cv_generation(form_data: dict) -> JSONResponse:
     qualifications = form_data.get("qualifications", "")
     additional_info = form_data.get("additional_info", "")
 
-    # Validate required fields
-    if not company_name or not job_title or not job_description:
-        raise HTTPException(
-            status_code=400,
-            detail="company_name, job_title, and job_description are required"
-        )
-
     logger.info(f"Generating resume for {job_title} at {company_name}")
 
-    # Use RAG to retrieve candidate information
-    candidate_info_query = "Youssef Benkirane resume information, work experience, education, skills, projects, contact details, languages"
-
     if not rag_service.is_available():
         logger.warning("RAG service not available - cannot generate resume")
         raise HTTPException(
@@ -120,21 +346,16 @@ async def handle_cv_generation(form_data: dict) -> JSONResponse:
             detail="Resume generation requires candidate data to be loaded. Please contact support.",
         )
 
-    logger.info("Retrieving candidate information from RAG...")
-    results = rag_service.search(candidate_info_query, top_k=10, similarity_threshold=0.2)
+    # Candidate context is precomputed per index (no embedding call or search)
+    candidate_context = await rag_service.get_candidate_context()
 
-    if not results:
+    if not candidate_context:
         logger.warning("No candidate information found in RAG")
         raise HTTPException(
             status_code=500,
             detail="No candidate information available. Please contact support.",
         )
-
-    candidate_info = [doc["chunk"] for doc in results]
-    logger.info(f"✓ Retrieved {len(candidate_info)} candidate information chunks")
-
-    # Build context from candidate information
-    candidate_context = "\n\n".join(candidate_info)
+    progress("retrieval_done", {"context_chars": len(candidate_context)})
 
     # Build comprehensive job description
     full_job_description = f"""**Description du poste:**
@@ -160,13 +381,16 @@ async def handle_cv_generation(form_data: dict) -> JSONResponse:
         full_job_description=full_job_description
     )
 
-    # Get JSON schema from Pydantic model
-    resume_schema = StructuredResume.model_json_schema()
+    if config.CV_GENERATION_MODE == "sections":
+        structured_data = await _generate_resume_by_sections(prompt)
+    else:
+        # Get JSON schema from Pydantic model
+        resume_schema = StructuredResume.model_json_schema()
 
-    # Generate structured output
-    structured_data = gemini_service.generate_structured_output(
-        prompt=prompt, response_schema=resume_schema, temperature=0.4
-    )
+        # Generate structured output
+        structured_data = await gemini_service.generate_structured_output(
+            prompt=prompt, response_schema=resume_schema, temperature=0.4
+        )
 
     if not structured_data:
         logger.error("Failed to generate structured resume")
@@ -197,26 +421,26 @@ async def handle_cv_generation(form_data: dict) -> JSONResponse:
     ]
 
     logger.info("✓ Applied hardcoded contact info and languages")
+    progress("generation_done", {"match_score": resume.match_analysis.score})
 
     # Store resume data with unique ID
     resume_id = str(uuid.uuid4())
-    storage.store_resume(resume_id, resume.model_dump())
+    await asyncio.to_thread(storage.store_resume, resume_id, resume.model_dump())
+    progress("stored", {"resume_id": resume_id})
 
     # Return analysis view with resume data
-    return JSONResponse(
-        {
-            "next_action": "RENDER_ANALYSIS",
-            "widget_data": {
-                "resume_id": resume_id,
-                "company_name": company_name,
-                "job_title": job_title,
-                "match_score": resume.match_analysis.score,
-                "match_tag": resume.match_analysis.tag,
-                "intro_message": resume.match_analysis.intro_message,
-                "key_strengths": resume.match_analysis.key_strengths,
-                "points_of_attention": resume.match_analysis.points_of_attention,
-                "current_step": 11,
-                "total_steps": 11,
-            },
-        }
-    )
+    return {
+        "next_action": "RENDER_ANALYSIS",
+        "widget_data": {
+            "resume_id": resume_id,
+            "company_name": company_name,
+            "job_title": job_title,
+            "match_score": resume.match_analysis.score,
+            "match_tag": resume.match_analysis.tag,
+            "intro_message": resume.match_analysis.intro_message,
+            "key_strengths": resume.match_analysis.key_strengths,
+            "points_of_attention": resume.match_analysis.points_of_attention,
+            "current_step": 11,
+            "total_steps": 11,
+        },
+    }
@@ -5,35 +5,32 @@ This flow answers questions about the company using RAG
 (Retrieval-Augmented Generation) with the knowledge base.
 """
 import logging
+from typing import AsyncIterator, Optional, Tuple
 
+from ..config import config
 from ..gemini_service import gemini_service
 from ..rag_service import rag_service
+from ..semantic_cache import answer_cache, detect_language
 from .. import prompts
 from ..models import ChatRequest, ChatResponse
 
 logger = logging.getLogger(__name__)
 
 
-async def handle_presentation_flow(request: ChatRequest) -> ChatResponse:
+async def _build_message(request: ChatRequest) -> str:
     """
-    Handle PRESENTATION flow - RAG-powered Q&A.
+    Build the message to send, enriched with RAG context if available.
 
     Args:
-        request: ChatRequest with user question and session_id
+        request: ChatRequest with user question
 
     Returns:
-        ChatResponse with answer based on knowledge base
+        Message text (user question, possibly wrapped with context)
     """
-    logger.info(f"Using PRESENTATION flow with RAG for session {request.session_id}")
-
-    # Get system instruction from prompts module
-    system_instruction = prompts.PRESENTATION_SYSTEM_INSTRUCTION
-
-    # Build message with RAG context if available
     message_to_send = request.message
 
     if rag_service.is_available():
-        search_results = rag_service.search(request.message)
+        search_results = await rag_service.search(request.message)
         if search_results:
             context = rag_service.format_context(search_results)
             logger.info(f"Using RAG with {len(search_results)} chunks")
@@ -45,15 +42,135 @@ async def handle_presentation_flow(request: ChatRequest) -> ChatResponse:
     else:
         logger.info("RAG not available")
 
+    return message_to_send
+
+
+async def _lookup_cached_answer(
+    request: ChatRequest,
+) -> Tuple[Optional[str], Optional[tuple]]:
+    """
+    Check the semantic answer cache for a first-turn question.
+
+    Only the first turn of a session is cacheable: later answers depend on the
+    conversation so far.
+
+    Args:
+        request: ChatRequest with user question and session_id
+
+    Returns:
+        (cached_answer, cache_key): cache_key is the (embedding, language) to
+        store a fresh answer under, or None when caching does not apply
+    """
+    if not config.SEMANTIC_CACHE_ENABLED or not rag_service.is_available():
+        return None, None
+
+    if await gemini_service.has_chat_session(request.session_id):
+        return None, None
+
+    try:
+        embedding = await rag_service.embed_query(request.message)
+    except Exception as e:
+        logger.warning(f"Semantic cache skipped, embedding failed: {e}")
+        return None, None
+
+    if embedding is None:
+        return None, None
+
+    language = detect_language(request.message)
+    answer = answer_cache.lookup(embedding, language, rag_service.index_version)
+    return answer, (embedding, language)
+
+
+async def _serve_cached_answer(request: ChatRequest, answer: str) -> None:
+    """Record a cached answer as the session's first turn so follow-ups keep context."""
+    logger.info(f"Serving cached answer for session {request.session_id}")
+    await gemini_service.seed_chat_session(
+        session_id=request.session_id,
+        user_message=request.message,
+        model_response=answer,
+        system_instruction=prompts.PRESENTATION_SYSTEM_INSTRUCTION,
+    )
+
+
+def _store_answer(request: ChatRequest, cache_key: Optional[tuple], answer: str):
+    """Cache a freshly generated first-turn answer."""
+    if cache_key is None:
+        return
+    embedding, language = cache_key
+    answer_cache.store(
+        request.message, embedding, language, answer, rag_service.index_version
+    )
+
+
+async def handle_presentation_flow(request: ChatRequest) -> ChatResponse:
+    """
+    Handle PRESENTATION flow - RAG-powered Q&A.
+
+    Args:
+        request: ChatRequest with user question and session_id
+
+    Returns:
+        ChatResponse with answer based on knowledge base
+    """
+    logger.info(f"Using PRESENTATION flow with RAG for session {request.session_id}")
+
+    # Get system instruction from prompts module
+    system_instruction = prompts.PRESENTATION_SYSTEM_INSTRUCTION
+
+    cached_answer, cache_key = await _lookup_cached_answer(request)
+    if cached_answer:
+        await _serve_cached_answer(request, cached_answer)
+        return ChatResponse(
+            response=cached_answer,
+            session_id=request.session_id,
+            flow_id=request.flow_id
+        )
+
+    message_to_send = await _build_message(request)
+
     # Send message in multi-turn conversation
-    response_text = gemini_service.send_chat_message(
+    response_text = await gemini_service.send_chat_message(
         session_id=request.session_id,
         message=message_to_send,
         system_instruction=system_instruction,
     )
 
+    _store_answer(request, cache_key, response_text)
+
     return ChatResponse(
         response=response_text,
         session_id=request.session_id,
         flow_id=request.flow_id
     )
+
+
+async def stream_presentation_flow(request: ChatRequest) -> AsyncIterator[str]:
+    """
+    Handle PRESENTATION flow with a streamed answer.
+
+    Args:
+        request: ChatRequest with user question and session_id
+
+    Yields:
+        Answer text chunks as they are generated
+    """
+    logger.info(f"Streaming PRESENTATION flow for session {request.session_id}")
+
+    cached_answer, cache_key = await _lookup_cached_answer(request)
+    if cached_answer:
+        await _serve_cached_answer(request, cached_answer)
+        yield cached_answer
+        return
+
+    message_to_send = await _build_message(request)
+
+    answer_parts = []
+    async for text in gemini_service.send_chat_message_stream(
+        session_id=request.session_id,
+        message=message_to_send,
+        system_instruction=prompts.PRESENTATION_SYSTEM_INSTRUCTION,
+    ):
+        answer_parts.append(text)
+        yield text
+
+    _store_answer(request, cache_key, "".join(answer_parts))
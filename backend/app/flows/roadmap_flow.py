@@ -5,6 +5,7 @@ This flow acts as a strategic consultant, helping clients create
 actionable business roadmaps through multi-turn conversations.
 """
 import logging
+from typing import AsyncIterator
 
 from ..gemini_service import gemini_service
 from .. import prompts
@@ -29,7 +30,7 @@ async def handle_roadmap_flow(request: ChatRequest) -> ChatResponse:
     system_instruction = prompts.ROADMAP_SYSTEM_INSTRUCTION
 
     # Send message in multi-turn conversation
-    response_text = gemini_service.send_chat_message(
+    response_text = await gemini_service.send_chat_message(
         session_id=request.session_id,
         message=request.message,
         system_instruction=system_instruction,
@@ -40,3 +41,23 @@ async def handle_roadmap_flow(request: ChatRequest) -> ChatResponse:
         session_id=request.session_id,
         flow_id=request.flow_id
     )
+
+
+async def stream_roadmap_flow(request: ChatRequest) -> AsyncIterator[str]:
+    """
+    Handle ROADMAP flow with a streamed answer.
+
+    Args:
+        request: ChatRequest with user message and session_id
+
+    Yields:
+        Strategic guidance text chunks as they are generated
+    """
+    logger.info(f"Streaming ROADMAP flow for session {request.session_id}")
+
+    async for text in gemini_service.send_chat_message_stream(
+        session_id=request.session_id,
+        message=request.message,
+        system_instruction=prompts.ROADMAP_SYSTEM_INSTRUCTION,
+    ):
+        yield text
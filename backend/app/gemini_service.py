@@ -1,12 +1,22 @@
 """
 Centralized Gemini API service with retry logic and chat session management.
+
+All methods are async and go through the SDK's async client (``client.aio``)
+so a slow upstream call never blocks the event loop, on the request path as
+well as during the background ingest.
 """
+import asyncio
+import json
 import logging
-import time
-from typing import List, Optional, Dict
+from typing import AsyncIterator, List, Optional, Dict
 from google import genai
 from google.genai import types
 from .config import config
+from .embedding_reduction import api_output_dimensionality
+from .retry import retry_async
+from .single_flight import SingleFlight, request_key
+from .session_manager import ChatSessionManager
+from .session_store import create_session_store
 
 logger = logging.getLogger(__name__)
 
@@ -27,12 +37,21 @@ class GeminiService:
             return
 
         self.client: Optional[genai.Client] = None
-        self.chat_sessions: Dict[str, any] = {}  # session_id -> chat object
+        # session_id -> chat object (bounded: LRU, idle TTL, history size cap)
+        self.chat_sessions = ChatSessionManager(chat_factory=self._create_chat)
+        self.session_store = None
+        # Concurrent identical upstream calls share one request
+        self.single_flight = SingleFlight()
         self._initialized = True
 
         if config.GEMINI_API_KEY:
             self.client = genai.Client(api_key=config.GEMINI_API_KEY)
             logger.info("✓ Gemini client initialized successfully")
+
+            try:
+                self.session_store = create_session_store()
+            except Exception as e:
+                logger.warning(f"⚠ Session store unavailable, memory only: {e}")
         else:
             logger.warning("⚠ GEMINI_API_KEY not found - API will not work")
 
@@ -40,49 +59,32 @@ class GeminiService:
         """Check if the Gemini client is available."""
         return self.client is not None
 
-    def _retry_with_backoff(self, func, *args, **kwargs):
+    async def _retry_with_backoff_async(
+        self, func, *args, operation: str = "default", **kwargs
+    ):
         """
-        Execute a function with exponential backoff retry logic.
-
-        Args:
-            func: Function to execute
-            *args, **kwargs: Arguments to pass to the function
-
-        Returns:
-            Result of the function call
+        Await a coroutine function with jittered backoff and a per-call deadline.
 
-        Raises:
-            Exception: If all retries fail
+        See `retry.retry_async` for the retry/fatal classification.
         """
-        last_exception = None
+        return await retry_async(func, *args, operation=operation, **kwargs)
 
-        for attempt in range(config.MAX_RETRIES):
-            try:
-                return func(*args, **kwargs)
-            except Exception as e:
-                last_exception = e
-                if attempt < config.MAX_RETRIES - 1:
-                    wait_time = config.RETRY_BASE_DELAY**attempt
-                    logger.warning(
-                        f"Attempt {attempt + 1} failed: {e}. Retrying in {wait_time}s..."
-                    )
-                    time.sleep(wait_time)
-                else:
-                    logger.error(
-                        f"All {config.MAX_RETRIES} attempts failed: {last_exception}"
-                    )
-
-        raise last_exception
-
-    def get_or_create_chat_session(
-        self, session_id: str, system_instruction: Optional[str] = None
+    async def get_or_create_chat_session(
+        self,
+        session_id: str,
+        system_instruction: Optional[str] = None,
+        history: Optional[List[types.Content]] = None,
     ):
         """
         Get existing chat session or create a new one.
 
+        With a persistent session store, a session unknown to this worker (or
+        updated by another worker since) is rehydrated from the stored history.
+
         Args:
             session_id: Unique identifier for the chat session
             system_instruction: Optional system instruction for new sessions
+            history: Optional initial history for new sessions
 
         Returns:
             Chat session object
@@ -90,28 +92,144 @@ class GeminiService:
         if not self.is_available():
             raise ValueError("Gemini client not initialized")
 
-        if session_id not in self.chat_sessions:
+        chat = self.chat_sessions.get(session_id)
+
+        if self.session_store is not None:
+            stored_count = await asyncio.to_thread(
+                self.session_store.count, session_id
+            )
+            if chat is not None and stored_count != self.chat_sessions.persisted_count(
+                session_id
+            ):
+                logger.info(f"Session {session_id} changed in store - rehydrating")
+                chat = None
+            if chat is None and stored_count:
+                return await self._rehydrate_chat_session(session_id)
+
+        if chat is None:
             logger.info(f"Creating new chat session: {session_id}")
+            chat = self._create_chat(system_instruction, history)
+            self.chat_sessions.put(session_id, chat, system_instruction)
+            if history:
+                self.chat_sessions.record_turn(session_id)
+            logger.info(f"✓ Chat session created: {session_id}")
 
-            chat_config = {
-                "model": config.CHAT_MODEL,
-            }
-
-            if system_instruction:
-                chat_config["config"] = types.GenerateContentConfig(
-                    system_instruction=system_instruction,
-                    temperature=config.CHAT_TEMPERATURE,
-                    top_p=config.CHAT_TOP_P,
-                    top_k=config.CHAT_TOP_K,
-                    max_output_tokens=config.CHAT_MAX_OUTPUT_TOKENS,
-                )
+        return chat
+
+    async def _rehydrate_chat_session(self, session_id: str):
+        """Rebuild a chat session from the persistent store."""
+        stored = await asyncio.to_thread(self.session_store.load, session_id)
+        history = [
+            types.Content(role=message["role"], parts=[types.Part(text=message["text"])])
+            for message in stored["messages"]
+        ]
+        system_instruction = stored["system_instruction"]
+
+        chat = self._create_chat(system_instruction, history)
+        self.chat_sessions.put(
+            session_id, chat, system_instruction, persisted_count=len(history)
+        )
+        # Applies the history size cap (trims oldest turns in memory only)
+        self.chat_sessions.record_turn(session_id)
+        logger.info(f"✓ Rehydrated chat session {session_id} ({len(history)} messages)")
+        return self.chat_sessions.get(session_id)
+
+    async def _persist_turn(
+        self,
+        session_id: str,
+        user_message: str,
+        model_response: str,
+        system_instruction: Optional[str] = None,
+    ) -> None:
+        """Append one user/model turn to the persistent store, if configured."""
+        if self.session_store is None:
+            return
 
-            self.chat_sessions[session_id] = self.client.chats.create(**chat_config)
-            logger.info(f"✓ Chat session created: {session_id}")
+        messages = [
+            {"role": "user", "text": user_message},
+            {"role": "model", "text": model_response},
+        ]
+        previous = self.chat_sessions.persisted_count(session_id) or 0
+        try:
+            count = await asyncio.to_thread(
+                self.session_store.append, session_id, messages, system_instruction
+            )
+        except Exception as e:
+            logger.error(f"Failed to persist turn for session {session_id}: {e}")
+            return
+
+        # Another worker appended concurrently: force a rehydrate on next use
+        if count != previous + len(messages):
+            count = -1
+        self.chat_sessions.mark_persisted(session_id, count)
+
+    def _create_chat(
+        self,
+        system_instruction: Optional[str] = None,
+        history: Optional[List[types.Content]] = None,
+    ):
+        """Create an SDK chat object with the chat model settings."""
+        chat_config = {
+            "model": config.CHAT_MODEL,
+        }
+
+        if history:
+            chat_config["history"] = history
+
+        if system_instruction:
+            chat_config["config"] = types.GenerateContentConfig(
+                system_instruction=system_instruction,
+                temperature=config.CHAT_TEMPERATURE,
+                top_p=config.CHAT_TOP_P,
+                top_k=config.CHAT_TOP_K,
+                max_output_tokens=config.CHAT_MAX_OUTPUT_TOKENS,
+            )
+
+        return self.client.aio.chats.create(**chat_config)
 
-        return self.chat_sessions[session_id]
+    async def has_chat_session(self, session_id: str) -> bool:
+        """Check whether a session already has a conversation in progress."""
+        if session_id in self.chat_sessions:
+            return True
+        if self.session_store is not None:
+            return await asyncio.to_thread(self.session_store.count, session_id) > 0
+        return False
 
-    def send_chat_message(
+    async def seed_chat_session(
+        self,
+        session_id: str,
+        user_message: str,
+        model_response: str,
+        system_instruction: Optional[str] = None,
+    ):
+        """
+        Create a chat session whose history already holds one turn.
+
+        Used when an answer is served without calling the model (e.g. from the
+        semantic answer cache) so follow-up messages keep the context.
+
+        Args:
+            session_id: Unique identifier for the chat session
+            user_message: The user's first message
+            model_response: The answer that was returned to the user
+            system_instruction: Optional system instruction for the session
+
+        Returns:
+            Chat session object
+        """
+        history = [
+            types.Content(role="user", parts=[types.Part(text=user_message)]),
+            types.Content(role="model", parts=[types.Part(text=model_response)]),
+        ]
+        chat = await self.get_or_create_chat_session(
+            session_id, system_instruction, history
+        )
+        await self._persist_turn(
+            session_id, user_message, model_response, system_instruction
+        )
+        return chat
+
+    async def send_chat_message(
         self, session_id: str, message: str, system_instruction: Optional[str] = None
     ) -> str:
         """
@@ -128,13 +246,63 @@ class GeminiService:
         Raises:
             Exception: If message sending fails after retries
         """
-        chat = self.get_or_create_chat_session(session_id, system_instruction)
+        chat = await self.get_or_create_chat_session(session_id, system_instruction)
 
-        def _send():
-            response = chat.send_message(message)
+        async def _send():
+            response = await chat.send_message(message)
             return response.text if hasattr(response, "text") else ""
 
-        return self._retry_with_backoff(_send)
+        response_text = await self._retry_with_backoff_async(_send, operation="chat")
+        self.chat_sessions.record_turn(session_id)
+        await self._persist_turn(session_id, message, response_text, system_instruction)
+        return response_text
+
+    async def send_chat_message_stream(
+        self, session_id: str, message: str, system_instruction: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Send a message in a multi-turn conversation and stream the reply.
+
+        Only the opening of the stream (up to the first chunk) is retried; once
+        text has been forwarded to the client a failure is surfaced as-is. The
+        turn is recorded in the session history when the stream ends.
+
+        Args:
+            session_id: Unique identifier for the chat session
+            message: User message to send
+            system_instruction: Optional system instruction (only used for new sessions)
+
+        Yields:
+            Text chunks as they are produced by the model
+        """
+        chat = await self.get_or_create_chat_session(session_id, system_instruction)
+
+        async def _open_stream():
+            stream = await chat.send_message_stream(message)
+            first_chunk = await stream.__anext__()
+            return stream, first_chunk
+
+        try:
+            stream, first_chunk = await self._retry_with_backoff_async(
+                _open_stream, operation="chat_stream"
+            )
+        except StopAsyncIteration:
+            return
+
+        response_parts = []
+        if first_chunk.text:
+            response_parts.append(first_chunk.text)
+            yield first_chunk.text
+
+        async for chunk in stream:
+            if chunk.text:
+                response_parts.append(chunk.text)
+                yield chunk.text
+
+        self.chat_sessions.record_turn(session_id)
+        await self._persist_turn(
+            session_id, message, "".join(response_parts), system_instruction
+        )
 
     def get_chat_history(self, session_id: str) -> List[Dict]:
         """
@@ -146,10 +314,10 @@ class GeminiService:
         Returns:
             List of messages with role and content
         """
-        if session_id not in self.chat_sessions:
+        chat = self.chat_sessions.get(session_id)
+        if chat is None:
             return []
 
-        chat = self.chat_sessions[session_id]
         history = []
 
         for message in chat.get_history():
@@ -159,9 +327,9 @@ class GeminiService:
 
         return history
 
-    def clear_chat_session(self, session_id: str) -> bool:
+    async def clear_chat_session(self, session_id: str) -> bool:
         """
-        Clear a chat session from memory.
+        Clear a chat session from memory and from the persistent store.
 
         Args:
             session_id: Session identifier
@@ -169,13 +337,33 @@ class GeminiService:
         Returns:
             True if session was cleared, False if it didn't exist
         """
-        if session_id in self.chat_sessions:
-            del self.chat_sessions[session_id]
+        cleared = self.chat_sessions.remove(session_id)
+        if self.session_store is not None:
+            cleared = (
+                await asyncio.to_thread(self.session_store.delete, session_id)
+                or cleared
+            )
+
+        if cleared:
             logger.info(f"✓ Cleared chat session: {session_id}")
-            return True
-        return False
+        return cleared
+
+    async def run_session_sweeper(self) -> None:
+        """Periodically expire idle sessions (memory and store) until cancelled."""
+        while True:
+            await asyncio.sleep(config.SESSION_SWEEP_INTERVAL)
+            self.chat_sessions.sweep()
+            if self.session_store is not None:
+                try:
+                    purged = await asyncio.to_thread(
+                        self.session_store.purge, config.SESSION_STORE_TTL
+                    )
+                    if purged:
+                        logger.info(f"Purged {purged} idle sessions from store")
+                except Exception as e:
+                    logger.error(f"Error purging session store: {e}")
 
-    def generate_structured_output(
+    async def generate_structured_output(
         self, prompt: str, response_schema: dict, temperature: float = 0.3
     ) -> Optional[dict]:
         """
@@ -193,11 +381,30 @@ class GeminiService:
             logger.error("Gemini client not initialized")
             return None
 
+        # Identical concurrent requests (same model, prompt, schema) share a call
+        key = request_key(
+            "structured_output",
+            config.CHAT_MODEL,
+            prompt,
+            response_schema,
+            temperature,
+        )
+        return await self.single_flight.run(
+            key,
+            lambda: self._generate_structured_output(
+                prompt, response_schema, temperature
+            ),
+        )
+
+    async def _generate_structured_output(
+        self, prompt: str, response_schema: dict, temperature: float
+    ) -> Optional[dict]:
+        """Uncoalesced body of `generate_structured_output`."""
         try:
             logger.info("Generating structured output...")
 
-            def _generate():
-                response = self.client.models.generate_content(
+            async def _generate():
+                response = await self.client.aio.models.generate_content(
                     model=config.CHAT_MODEL,
                     contents=prompt,
                     config=types.GenerateContentConfig(
@@ -208,10 +415,10 @@ class GeminiService:
                 )
                 return response.text if hasattr(response, "text") else None
 
-            result = self._retry_with_backoff(_generate)
+            result = await self._retry_with_backoff_async(
+                _generate, operation="structured_output"
+            )
             if result:
-                import json
-
                 return json.loads(result)
             return None
 
@@ -219,7 +426,7 @@ class GeminiService:
             logger.error(f"Error generating structured output: {e}")
             return None
 
-    def generate_structured_output_with_url(
+    async def generate_structured_output_with_url(
         self, prompt: str, response_schema: dict, temperature: float = 0.3
     ) -> Optional[dict]:
         """
@@ -249,16 +456,35 @@ class GeminiService:
             logger.error("Gemini client not initialized")
             return None
 
+        # The same job URL submitted twice at once is fetched and parsed once
+        key = request_key(
+            "structured_output_with_url",
+            config.CHAT_MODEL,
+            prompt,
+            response_schema,
+            temperature,
+        )
+        return await self.single_flight.run(
+            key,
+            lambda: self._generate_structured_output_with_url(
+                prompt, response_schema, temperature
+            ),
+        )
+
+    async def _generate_structured_output_with_url(
+        self, prompt: str, response_schema: dict, temperature: float
+    ) -> Optional[dict]:
+        """Uncoalesced body of `generate_structured_output_with_url`."""
         try:
             logger.info("Fetching content using URL context...")
 
             # Step 1: Fetch content using URL context tool
-            def _fetch_url_content():
+            async def _fetch_url_content():
                 url_context_tool = types.Tool(
                     url_context=types.UrlContext()
                 )
 
-                response = self.client.models.generate_content(
+                response = await self.client.aio.models.generate_content(
                     model=config.CHAT_MODEL,
                     contents=prompt,
                     config=types.GenerateContentConfig(
@@ -268,7 +494,9 @@ class GeminiService:
                 )
                 return response.text if hasattr(response, "text") else None
 
-            raw_content = self._retry_with_backoff(_fetch_url_content)
+            raw_content = await self._retry_with_backoff_async(
+                _fetch_url_content, operation="url_context"
+            )
             if not raw_content:
                 logger.warning("Failed to fetch URL content")
                 return None
@@ -283,7 +511,7 @@ class GeminiService:
 
 Please extract and structure this information."""
 
-            return self.generate_structured_output(
+            return await self.generate_structured_output(
                 prompt=structured_prompt,
                 response_schema=response_schema,
                 temperature=temperature
@@ -293,43 +521,18 @@ Please extract and structure this information."""
             logger.error(f"Error generating structured output with URL context: {e}")
             return None
 
-    def create_embedding(
-        self, content: str, task_type: str = "RETRIEVAL_QUERY"
-    ) -> Optional[List[float]]:
-        """
-        Create a single embedding for the given content.
-
-        Args:
-            content: Text to embed
-            task_type: One of RETRIEVAL_DOCUMENT, RETRIEVAL_QUERY, SEMANTIC_SIMILARITY,
-                      CLASSIFICATION, CLUSTERING
-
-        Returns:
-            Embedding vector, or None if creation fails
-
-        Raises:
-            Exception: If embedding fails after retries
-        """
-        if not self.is_available():
-            raise ValueError("Gemini client not initialized")
-
-        def _embed():
-            result = self.client.models.embed_content(
-                model=config.EMBEDDING_MODEL,
-                contents=content,
-                config=types.EmbedContentConfig(task_type=task_type),
-            )
-            if hasattr(result, "embeddings") and len(result.embeddings) > 0:
-                return result.embeddings[0].values
-            return None
-
-        return self._retry_with_backoff(_embed)
+    @staticmethod
+    def _embedding_config(task_type: str) -> types.EmbedContentConfig:
+        """Embedding request config, asking for reduced vectors if configured."""
+        return types.EmbedContentConfig(
+            task_type=task_type, output_dimensionality=api_output_dimensionality()
+        )
 
-    def create_embeddings_batch(
+    async def create_embeddings_batch_async(
         self, contents: List[str], task_type: str = "RETRIEVAL_DOCUMENT"
     ) -> List[List[float]]:
         """
-        Create embeddings for multiple contents in batch.
+        Create embeddings for multiple contents in one request.
 
         Args:
             contents: List of texts to embed
@@ -347,17 +550,29 @@ Please extract and structure this information."""
         if not contents:
             return []
 
-        def _embed_batch():
-            result = self.client.models.embed_content(
+        async def _embed_batch():
+            result = await self.client.aio.models.embed_content(
                 model=config.EMBEDDING_MODEL,
                 contents=contents,
-                config=types.EmbedContentConfig(task_type=task_type),
+                config=self._embedding_config(task_type),
             )
             if hasattr(result, "embeddings") and len(result.embeddings) > 0:
                 return [emb.values for emb in result.embeddings]
             return []
 
-        return self._retry_with_backoff(_embed_batch)
+        key = request_key(
+            "embedding_batch",
+            config.EMBEDDING_MODEL,
+            api_output_dimensionality(),
+            task_type,
+            contents,
+        )
+        return await self.single_flight.run(
+            key,
+            lambda: self._retry_with_backoff_async(
+                _embed_batch, operation="embedding_batch"
+            ),
+        )
 
 
 # Singleton instance
@@ -0,0 +1,664 @@
+"""
+Document ingestion pipeline for RAG.
+
+Reads markdown files from the knowledge base directory, chunks them, and
+creates the FAISS index. Importable and async, so the API can run it in the
+background at startup; `ingest.py` is the command-line entry point.
+
+Ingestion is incremental: a manifest records a content hash and FAISS id per
+chunk, so a re-run only embeds new or modified chunks and reuses the stored
+vectors of unchanged ones. The ANN index (flat, HNSW or IVF, see ann_index)
+is rebuilt from those vectors, so every layout supports deletes.
+Each embedded batch is checkpointed to disk as it completes, so a failed run
+resumes from the batches already paid for.
+
+Every run writes a new version directory under RAG_INDEX_DIR and publishes it
+by atomically repointing CURRENT; running API workers pick it up without a
+restart. Runs hold an exclusive lock on RAG_INDEX_DIR, so processes started
+together (e.g. several API workers on a fresh deployment) ingest one at a
+time: the first one embeds and publishes, the others then find the index up
+to date.
+"""
+import os
+import glob
+import asyncio
+import contextlib
+import fcntl
+import json
+import logging
+import shutil
+import hashlib
+from collections import defaultdict, deque
+import faiss
+import numpy as np
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from .gemini_service import gemini_service
+from .config import config
+from .rag_service import (
+    INDEX_FILE,
+    CHUNK_STORE_DIR,
+    MANIFEST_FILE,
+    CANDIDATE_PROFILE_FILE,
+    PCA_FILE,
+    new_version_name,
+    prune_index_versions,
+    publish_index_version,
+    read_current_version,
+    write_candidate_profile,
+)
+from .chunk_store import ChunkStore, write_chunk_store
+from .embedding_reduction import (
+    api_output_dimensionality,
+    fit_pca,
+    load_pca,
+    project,
+    reduction_settings,
+    save_pca,
+    uses_pca,
+)
+from .ann_index import (
+    build_index,
+    select_index_type,
+    select_vector_storage,
+)
+from .rate_limiter import AsyncRateLimiter, estimate_tokens
+from . import prompts
+
+logger = logging.getLogger(__name__)
+
+# Lock file in RAG_INDEX_DIR held for the duration of an ingest run
+INGEST_LOCK_FILE = ".ingest.lock"
+
+
+def read_markdown_files(directory):
+    """Read all markdown files from the knowledge base directory."""
+    files_data = []
+    pattern = os.path.join(directory, "*.md")
+
+    for file_path in glob.glob(pattern):
+        try:
+            with open(file_path, "r", encoding="utf-8") as file:
+                content = file.read()
+                files_data.append(
+                    {
+                        "file_path": file_path,
+                        "content": content,
+                        "filename": os.path.basename(file_path),
+                    }
+                )
+                logger.info(f"✓ Read file: {os.path.basename(file_path)}")
+        except Exception as e:
+            logger.error(f"✗ Error reading {file_path}: {e}")
+
+    return files_data
+
+
+def chunk_text(text, chunk_size=None, overlap=None):
+    """Split text into overlapping chunks using LangChain splitter."""
+    chunk_size = chunk_size or config.RAG_CHUNK_SIZE
+    overlap = overlap or config.RAG_CHUNK_OVERLAP
+
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=overlap,
+        separators=["\n\n", "\n", ". ", " ", ""],
+        keep_separator=True,
+    )
+
+    chunks = text_splitter.split_text(text)
+    return [chunk.strip() for chunk in chunks if chunk.strip()]
+
+
+def process_documents(files_data):
+    """Process documents into chunks with metadata."""
+    all_chunks = []
+    metadata = []
+
+    for file_data in files_data:
+        content = file_data["content"]
+        filename = file_data["filename"]
+
+        # Remove markdown headers for cleaner chunks
+        content = content.replace("#", "").replace("*", "")
+
+        chunks = chunk_text(content)
+
+        for i, chunk in enumerate(chunks):
+            if len(chunk.strip()) > 50:  # Only keep substantial chunks
+                all_chunks.append(chunk)
+                metadata.append(
+                    {
+                        "filename": filename,
+                        "chunk_id": i,
+                        "source": file_data["file_path"],
+                    }
+                )
+
+        logger.info(f"✓ Processed {len(chunks)} chunks from {filename}")
+
+    return all_chunks, metadata
+
+
+def batch_checkpoint_path(batch):
+    """
+    Checkpoint file of a batch, keyed by everything that shapes its vectors:
+    embedding model, requested dimensionality, reduction and batch content.
+    """
+    settings = {
+        "model": config.EMBEDDING_MODEL,
+        "output_dimensionality": api_output_dimensionality(),
+        **reduction_settings(),
+    }
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    for chunk in batch:
+        digest.update(b"\0" + chunk.encode("utf-8"))
+    return os.path.join(config.INGEST_CHECKPOINT_DIR, f"{digest.hexdigest()}.npy")
+
+
+def load_batch_checkpoint(batch):
+    """Return the checkpointed embeddings of a batch, or None."""
+    path = batch_checkpoint_path(batch)
+    if not os.path.exists(path):
+        return None
+    try:
+        embeddings = np.load(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠ Ignoring unreadable checkpoint {path}: {e}")
+        return None
+    if embeddings.ndim != 2 or len(embeddings) != len(batch):
+        return None
+    expected_dimension = api_output_dimensionality()
+    if expected_dimension and embeddings.shape[1] != expected_dimension:
+        logger.warning(
+            f"⚠ Ignoring checkpoint {path}: vectors of dimension "
+            f"{embeddings.shape[1]}, expected {expected_dimension}"
+        )
+        return None
+    return embeddings
+
+
+def save_batch_checkpoint(batch, embeddings):
+    """Atomically write a batch's embeddings to the checkpoint spool."""
+    os.makedirs(config.INGEST_CHECKPOINT_DIR, exist_ok=True)
+    path = batch_checkpoint_path(batch)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, np.array(embeddings, dtype="float32"))
+    os.replace(tmp_path, path)
+
+
+def clear_checkpoints():
+    """Remove the checkpoint spool once the index has been saved."""
+    if os.path.exists(config.INGEST_CHECKPOINT_DIR):
+        shutil.rmtree(config.INGEST_CHECKPOINT_DIR)
+        logger.info(f"✓ Cleared checkpoints in {config.INGEST_CHECKPOINT_DIR}")
+
+
+async def embed_batch(batch, batch_num, total_batches, limiter):
+    """
+    Embed one batch once the rate limiter admits it.
+
+    Each batch is retried on its own by the Gemini retry policy, so a failing
+    batch never forces the others to be re-sent. Batches already checkpointed
+    by a previous run are loaded from disk without calling the API.
+    """
+    checkpoint = load_batch_checkpoint(batch)
+    if checkpoint is not None:
+        logger.info(f"  ✓ Batch {batch_num}/{total_batches} restored from checkpoint")
+        return list(checkpoint)
+
+    await limiter.acquire(sum(estimate_tokens(chunk) for chunk in batch))
+    logger.info(f"  → Sending batch {batch_num}/{total_batches} ({len(batch)} chunks)...")
+
+    batch_embeddings = await gemini_service.create_embeddings_batch_async(
+        batch, task_type="RETRIEVAL_DOCUMENT"
+    )
+
+    if not batch_embeddings or len(batch_embeddings) != len(batch):
+        raise Exception(
+            f"Failed to create embeddings for batch {batch_num}. "
+            f"Expected {len(batch)} embeddings, got {len(batch_embeddings) if batch_embeddings else 0}"
+        )
+
+    save_batch_checkpoint(batch, batch_embeddings)
+    logger.info(f"  ✓ Batch {batch_num}/{total_batches} completed and checkpointed")
+    return batch_embeddings
+
+
+async def create_embeddings_batch(chunks):
+    """
+    Create embeddings using GeminiService, several batches in flight at once.
+
+    Up to INGEST_CONCURRENCY batches run concurrently under the configured
+    requests-per-minute and tokens-per-minute limits; results keep chunk order.
+
+    Args:
+        chunks: List of text chunks to embed
+
+    Returns:
+        NumPy array of embeddings
+
+    Raises:
+        ValueError: If there are no chunks to embed
+        Exception: If embedding creation fails
+    """
+    if not chunks:
+        raise ValueError("No chunks to embed")
+    logger.info(f"Creating embeddings for {len(chunks)} chunks using Gemini...")
+
+    batch_size = config.EMBEDDING_BATCH_SIZE
+    batches = [
+        chunks[batch_start : batch_start + batch_size]
+        for batch_start in range(0, len(chunks), batch_size)
+    ]
+    total_batches = len(batches)
+
+    limiter = AsyncRateLimiter(
+        config.EMBEDDING_REQUESTS_PER_MINUTE, config.EMBEDDING_TOKENS_PER_MINUTE
+    )
+    semaphore = asyncio.Semaphore(config.INGEST_CONCURRENCY)
+
+    async def _run(batch, batch_num):
+        async with semaphore:
+            return await embed_batch(batch, batch_num, total_batches, limiter)
+
+    # gather preserves input order, whatever order the batches finish in
+    results = await asyncio.gather(
+        *(_run(batch, i + 1) for i, batch in enumerate(batches))
+    )
+    embeddings = [embedding for batch in results for embedding in batch]
+
+    embeddings_array = np.array(embeddings).astype("float32")
+    logger.info(
+        f"✓ Created {len(embeddings)} embeddings of dimension {embeddings_array.shape[1]}"
+    )
+
+    return embeddings_array
+
+
+def chunk_hash(filename, chunk):
+    """Content hash identifying a chunk across ingest runs."""
+    return hashlib.sha256(f"{filename}\0{chunk}".encode("utf-8")).hexdigest()
+
+
+def load_manifest(version_path):
+    """
+    Load the manifest of the previous run, if it can be updated incrementally.
+
+    Args:
+        version_path: Directory of the published index version, or None
+
+    Returns:
+        Manifest dict, or None if a full rebuild is needed
+    """
+    if not version_path:
+        logger.info("No published index - full rebuild")
+        return None
+
+    manifest_path = os.path.join(version_path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path) or not os.path.exists(
+        os.path.join(version_path, INDEX_FILE)
+    ):
+        logger.info("No manifest found - full rebuild")
+        return None
+
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if manifest.get("embedding_model") != config.EMBEDDING_MODEL:
+        logger.info("Embedding model changed - full rebuild")
+        return None
+
+    settings = reduction_settings()
+    if any(manifest.get(key) != value for key, value in settings.items()):
+        logger.info("Embedding dimension changed - full rebuild")
+        return None
+
+    store = ChunkStore(os.path.join(version_path, CHUNK_STORE_DIR))
+    has_vectors = store.vectors is not None
+    store.close()
+    if not has_vectors:
+        logger.info("No stored vectors to reuse - full rebuild")
+        return None
+
+    return manifest
+
+
+def plan_incremental_update(hashes, manifest):
+    """
+    Match the new chunks against the previous manifest.
+
+    Args:
+        hashes: Content hash of every new chunk, in order
+        manifest: Previous manifest, or None for a full rebuild
+
+    Returns:
+        Tuple (ids, to_embed, removed_ids, next_id): the FAISS id of every new
+        chunk, positions of chunks that need embedding, ids to delete from the
+        index, and the next free id
+    """
+    previous = defaultdict(deque)
+    next_id = 0
+    if manifest:
+        for entry in manifest["chunks"]:
+            previous[entry["hash"]].append(entry["id"])
+        next_id = manifest["next_id"]
+
+    ids = []
+    to_embed = []
+    for position, digest in enumerate(hashes):
+        if previous[digest]:
+            ids.append(previous[digest].popleft())
+        else:
+            ids.append(next_id)
+            to_embed.append(position)
+            next_id += 1
+
+    removed_ids = [chunk_id for remaining in previous.values() for chunk_id in remaining]
+    return ids, to_embed, removed_ids, next_id
+
+
+def assemble_vectors(current_path, embeddings, ids, to_embed, pca=None):
+    """
+    Build the vector matrix of the new version, one row per chunk.
+
+    Rows of unchanged chunks are copied from the published chunk store; rows
+    of new or modified chunks come from the fresh embeddings, projected into
+    the index space.
+
+    Raises:
+        ValueError: If there are no chunks to index
+    """
+    if not ids:
+        raise ValueError("No chunks to index")
+    new_rows = dict(zip(to_embed, project(embeddings, pca))) if to_embed else {}
+    store = None
+    if len(new_rows) < len(ids):
+        store = ChunkStore(os.path.join(current_path, CHUNK_STORE_DIR))
+
+    rows = []
+    for position, chunk_id in enumerate(ids):
+        if position in new_rows:
+            rows.append(new_rows[position])
+        else:
+            rows.append(np.array(store.vectors[store.position(chunk_id)]))
+
+    if store is not None:
+        store.close()
+    return np.vstack(rows).astype("float32")
+
+
+def save_index_and_metadata(version_path, index, metadata, chunks, ids, vectors):
+    """Save FAISS index and metadata to a version directory."""
+    # Save FAISS index
+    index_path = os.path.join(version_path, INDEX_FILE)
+    faiss.write_index(index, index_path)
+    logger.info(f"✓ Saved FAISS index to {index_path}")
+
+    # Save chunks, metadata and normalized vectors (row i is chunks[i], id ids[i])
+    chunk_store_path = os.path.join(version_path, CHUNK_STORE_DIR)
+    write_chunk_store(chunk_store_path, chunks, metadata, ids, vectors)
+    logger.info(f"✓ Saved chunks and metadata to {chunk_store_path}/")
+
+
+def save_manifest(
+    version_path, hashes, ids, next_id, dimension, index_type, storage
+):
+    """Save the per-chunk content hash manifest used by the next run."""
+    manifest = {
+        "embedding_model": config.EMBEDDING_MODEL,
+        "dimension": dimension,
+        "index_type": index_type,
+        "vector_storage": storage,
+        **reduction_settings(),
+        "next_id": next_id,
+        "chunks": [
+            {"hash": digest, "id": chunk_id} for digest, chunk_id in zip(hashes, ids)
+        ],
+    }
+    manifest_path = os.path.join(version_path, MANIFEST_FILE)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    logger.info(f"✓ Saved manifest to {manifest_path}")
+
+
+async def save_candidate_profile(version_path, index, chunks, ids, pca=None):
+    """
+    Precompute the DYNAMIC_CV candidate profile against the new index.
+
+    Stored next to the index (tagged with its fingerprint) so resume generation
+    never has to embed the profile query or search the index at request time.
+    """
+    logger.info("Precomputing candidate profile...")
+
+    query_embedding = project(
+        await gemini_service.create_embeddings_batch_async(
+            [prompts.CANDIDATE_PROFILE_QUERY], task_type="RETRIEVAL_QUERY"
+        ),
+        pca,
+    )
+
+    positions = {chunk_id: position for position, chunk_id in enumerate(ids)}
+    scores, indices = index.search(query_embedding, config.CANDIDATE_PROFILE_TOP_K)
+    profile_chunks = [
+        chunks[positions[idx]]
+        for score, idx in zip(scores[0], indices[0])
+        if score >= config.CANDIDATE_PROFILE_THRESHOLD and idx in positions
+    ]
+
+    profile_path = os.path.join(version_path, CANDIDATE_PROFILE_FILE)
+    write_candidate_profile(
+        profile_path, os.path.join(version_path, INDEX_FILE), profile_chunks
+    )
+    logger.info(
+        f"✓ Saved candidate profile ({len(profile_chunks)} chunks) to {profile_path}"
+    )
+
+
+def load_documents():
+    """Read and chunk the knowledge base (blocking file I/O and splitting)."""
+    files_data = read_markdown_files(config.KNOWLEDGE_BASE_DIR)
+    if not files_data:
+        return [], [], []
+
+    logger.info(f"Found {len(files_data)} files to process")
+    chunks, metadata = process_documents(files_data)
+    logger.info(f"Total chunks created: {len(chunks)}")
+    return files_data, chunks, metadata
+
+
+def build_index_version(current_path, embeddings, plan, chunks, metadata, hashes):
+    """
+    Apply an incremental update plan and write the result as a new version.
+
+    Blocking (FAISS and disk work); run it off the event loop.
+
+    Args:
+        current_path: Published version to reuse vectors (and PCA) from, or
+            None for a full rebuild
+
+    Returns:
+        Tuple (index, pca, version, version_path) of the unpublished version
+    """
+    ids, to_embed, removed_ids, next_id = plan
+
+    # Incremental runs keep the published projection so old rows stay valid
+    pca = None
+    if uses_pca():
+        if current_path:
+            pca = load_pca(os.path.join(current_path, PCA_FILE))
+        else:
+            pca = fit_pca(project(embeddings), config.EMBEDDING_DIMENSION)
+
+    vectors = assemble_vectors(current_path, embeddings, ids, to_embed, pca)
+    dimension = vectors.shape[1]
+    if removed_ids:
+        logger.info(f"✓ Dropped {len(removed_ids)} deleted chunks")
+    if to_embed:
+        logger.info(f"✓ Added {len(to_embed)} new or modified chunks")
+
+    storage = select_vector_storage(len(ids))
+    index_type = select_index_type(len(ids), storage=storage)
+    logger.info(f"Building {index_type} index with {storage} vectors...")
+    index = build_index(vectors, np.array(ids, dtype="int64"), index_type, storage)
+    logger.info(f"✓ Index holds {index.ntotal} vectors of dimension {dimension}")
+
+    # Save everything into a new version directory
+    version = new_version_name()
+    version_path = os.path.join(config.RAG_INDEX_DIR, version)
+    # Never write into an existing version: another process may be serving it
+    os.makedirs(version_path)
+    save_index_and_metadata(version_path, index, metadata, chunks, ids, vectors)
+    save_manifest(
+        version_path, hashes, ids, next_id, dimension, index_type, storage
+    )
+    if pca is not None:
+        save_pca(pca, os.path.join(version_path, PCA_FILE))
+    return index, pca, version, version_path
+
+
+@contextlib.asynccontextmanager
+async def ingest_lock(index_dir, poll_interval=1.0):
+    """
+    Hold an exclusive, cross-process lock on an index directory.
+
+    Waits (without blocking the event loop) while another process holds it;
+    the lock is released by the OS if its holder dies.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    with open(os.path.join(index_dir, INGEST_LOCK_FILE), "w") as lock_file:
+        waiting = False
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if not waiting:
+                    logger.info("Another ingest is running - waiting for it...")
+                    waiting = True
+                await asyncio.sleep(poll_interval)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+async def run_ingest(prune: bool = False) -> bool:
+    """
+    Run the ingestion pipeline and publish a new index version if needed.
+
+    Embedding calls are awaited and blocking steps run in worker threads, so
+    this can run as a background task of the API without stalling requests.
+    Concurrent runs are serialized by `ingest_lock`.
+
+    Args:
+        prune: Also delete superseded versions no process is serving (the
+            command-line entry point does; API workers never do)
+
+    Returns:
+        True if an up-to-date index version is published, False on failure
+    """
+    async with ingest_lock(config.RAG_INDEX_DIR):
+        published = await _run_ingest()
+        if published and prune:
+            deleted = prune_index_versions(config.RAG_INDEX_DIR)
+            if deleted:
+                logger.info(f"✓ Pruned old index versions: {', '.join(deleted)}")
+        return published
+
+
+async def _run_ingest() -> bool:
+    """Body of `run_ingest`, run while holding the ingest lock."""
+    logger.info("Starting document ingestion pipeline...")
+
+    # Check if knowledge base directory exists
+    if not os.path.exists(config.KNOWLEDGE_BASE_DIR):
+        logger.error(f"✗ Knowledge base directory not found: {config.KNOWLEDGE_BASE_DIR}")
+        return False
+
+    # Check if Gemini service is available
+    if not gemini_service.is_available():
+        logger.error("✗ Gemini service not initialized. Check GEMINI_API_KEY in .env")
+        return False
+
+    # Read and chunk markdown files
+    files_data, chunks, metadata = await asyncio.to_thread(load_documents)
+    if not files_data:
+        logger.error("✗ No markdown files found in knowledge base directory")
+        return False
+    if not chunks:
+        logger.error(
+            "✗ No chunks to index: the knowledge base files are empty or too "
+            "short (chunks under 50 characters are skipped)"
+        )
+        return False
+
+    # Match chunks against the previous run
+    hashes = [chunk_hash(meta["filename"], chunk) for chunk, meta in zip(chunks, metadata)]
+    current_version = read_current_version(config.RAG_INDEX_DIR)
+    current_path = (
+        os.path.join(config.RAG_INDEX_DIR, current_version) if current_version else None
+    )
+    manifest = load_manifest(current_path)
+    plan = plan_incremental_update(hashes, manifest)
+    ids, to_embed, removed_ids, _ = plan
+    logger.info(
+        f"Chunks: {len(chunks) - len(to_embed)} unchanged, "
+        f"{len(to_embed)} to embed, {len(removed_ids)} removed"
+    )
+
+    # A changed index type or storage (config or corpus size) needs a rebuild
+    storage = select_vector_storage(len(chunks))
+    index_type = select_index_type(len(chunks), storage=storage)
+    up_to_date = (
+        manifest
+        and not to_embed
+        and not removed_ids
+        and manifest.get("vector_storage", "float32") == storage
+        and manifest.get("index_type") == index_type
+    )
+    if up_to_date and ChunkStore.exists(os.path.join(current_path, CHUNK_STORE_DIR)):
+        logger.info("✓ Index is already up to date - nothing to do")
+        return True
+
+    # Create embeddings in batches (new or modified chunks only)
+    embeddings = None
+    if to_embed:
+        try:
+            embeddings = await create_embeddings_batch([chunks[i] for i in to_embed])
+        except Exception as e:
+            logger.error(f"✗ Failed to create embeddings: {e}")
+            logger.info(
+                f"  Completed batches are kept in {config.INGEST_CHECKPOINT_DIR}/ "
+                "- re-run to resume"
+            )
+            return False
+
+    try:
+        index, pca, version, version_path = await asyncio.to_thread(
+            build_index_version,
+            current_path if manifest else None,
+            embeddings,
+            plan,
+            chunks,
+            metadata,
+            hashes,
+        )
+    except ValueError as e:
+        logger.error(f"✗ Failed to build the index version: {e}")
+        return False
+
+    # Precompute the candidate profile (the app recomputes it if this fails)
+    try:
+        await save_candidate_profile(version_path, index, chunks, ids, pca)
+    except Exception as e:
+        logger.warning(f"⚠ Failed to precompute candidate profile: {e}")
+
+    # Make the complete version live, then drop the checkpoints it consumed
+    publish_index_version(config.RAG_INDEX_DIR, version)
+    clear_checkpoints()
+
+    logger.info(f"✓ Published index version {version}")
+    logger.info(f"✓ Index contains {len(chunks)} chunks from {len(files_data)} files")
+    return True
@@ -4,22 +4,33 @@ FastAPI backend for Growth With Flow chatbots.
 This module defines the API routes and application startup logic.
 Business logic is delegated to flow handlers in the flows/ directory.
 """
-import os
+import asyncio
 import logging
-import subprocess
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
 
 from .rag_service import rag_service
+from .ingest_pipeline import run_ingest
 from .gemini_service import gemini_service
+from .config import config
+from .retry import retry_stats
+from .embedding_cache import embedding_cache
+from .semantic_cache import answer_cache
+from .scrape_cache import get_scrape_cache
+from .page_fetcher import page_fetcher
+from .cv_jobs import cv_job_queue
 from .models import ChatRequest, ChatResponse, JobScrapingRequest, JobScrapingResponse
 from . import storage
+from .sse import format_sse, sse_response
 from .flows import (
     handle_job_scraping,
-    handle_cv_generation,
+    validate_cv_form_data,
     handle_roadmap_flow,
     handle_presentation_flow,
+    stream_roadmap_flow,
+    stream_presentation_flow,
 )
 
 # Configure logging
@@ -40,46 +51,117 @@ app.add_middleware(
 )
 
 
+# Background tasks started at startup and cancelled at shutdown
+_background_tasks = []
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on application startup."""
-    logger.info("Initializing RAG service...")
+    _background_tasks.append(
+        asyncio.create_task(gemini_service.run_session_sweeper())
+    )
+    # Resume generations run on a bounded worker pool
+    _background_tasks.extend(cv_job_queue.start())
 
-    # Check if RAG index files exist, if not, create them
-    index_path = "index.faiss"
-    metadata_path = "index_metadata.pkl"
+    # RAG is prepared in the background: the server accepts connections right
+    # away, DYNAMIC_CV answers 503 until the knowledge base is ready
+    _background_tasks.append(asyncio.create_task(prepare_rag()))
 
-    if not os.path.exists(index_path) or not os.path.exists(metadata_path):
-        logger.info("RAG index files not found. Creating them...")
-        try:
-            subprocess.run(["python", "ingest.py"], check=True, cwd=".")
+
+async def prepare_rag():
+    """Build the index if none is published, then load it and start watching."""
+    try:
+        if rag_service.current_version() is None:
+            # Only one process ingests at a time; the others wait for it and
+            # then find the published index up to date
+            logger.info("RAG index files not found. Creating them...")
+            rag_service.status = "ingesting"
+            if not await run_ingest():
+                raise RuntimeError("ingest pipeline failed")
             logger.info("✓ RAG index created successfully")
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to create RAG index: {e}")
-            raise RuntimeError("Failed to initialize RAG service")
 
-    # Initialize RAG service (loads index and metadata)
-    if rag_service.initialize():
+        # Initialize RAG service (loads index and metadata)
+        logger.info("Initializing RAG service...")
+        if not await asyncio.to_thread(rag_service.initialize):
+            raise RuntimeError("index could not be loaded")
         logger.info("✓ RAG service initialized successfully")
-    else:
-        logger.error("Failed to initialize RAG service")
-        raise RuntimeError("Failed to initialize RAG service")
+
+        # Pin the DYNAMIC_CV candidate profile if it was not precomputed
+        if not await rag_service.get_candidate_context():
+            logger.warning("⚠ Candidate profile unavailable - DYNAMIC_CV will retry")
+    except Exception as e:
+        rag_service.status = "failed"
+        logger.error(f"Failed to initialize RAG service: {e}")
+
+    # Hot-reload new index versions published by ingest (this also recovers
+    # from a failed startup once `python ingest.py` publishes a version)
+    if config.RAG_INDEX_WATCH_INTERVAL > 0:
+        _background_tasks.append(asyncio.create_task(rag_service.watch()))
+
+
+# Flows that cannot answer without the knowledge base (PRESENTATION answers
+# without retrieval context until it is ready)
+RAG_FLOWS = {"DYNAMIC_CV"}
+
+
+def require_rag(flow_id: str) -> None:
+    """Reject RAG-backed flows with 503 while the knowledge base is not ready."""
+    if flow_id in RAG_FLOWS and not rag_service.is_available():
+        raise HTTPException(
+            status_code=503,
+            detail=f"Knowledge base is not ready yet ({rag_service.status})",
+            headers={"Retry-After": "10"},
+        )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks and close pooled connections."""
+    for task in _background_tasks:
+        task.cancel()
+    await page_fetcher.close()
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
+    scrape_cache = get_scrape_cache()
     return {
         "status": "ok",
+        "rag_status": rag_service.status,
         "rag_available": rag_service.is_available(),
+        "index": rag_service.index_stats(),
+        "query_batching": rag_service.batching_stats(),
         "gemini_available": gemini_service.is_available(),
+        "gemini_retries": retry_stats.snapshot(),
+        "gemini_single_flight": gemini_service.single_flight.stats(),
+        "embedding_cache": embedding_cache.stats(),
+        "answer_cache": answer_cache.stats(),
+        "scrape_cache": scrape_cache.stats() if scrape_cache else None,
+        "cv_jobs": cv_job_queue.stats(),
+        "chat_sessions": gemini_service.chat_sessions.stats(),
     }
 
 
+@app.post("/admin/reload-index")
+async def reload_index(x_admin_token: str = Header(default="")):
+    """
+    Swap in the latest published index version without a restart.
+
+    Requires the X-Admin-Token header to match ADMIN_TOKEN.
+    """
+    if not config.ADMIN_TOKEN or x_admin_token != config.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    reloaded = await rag_service.reload()
+    return {"reloaded": reloaded, "index_version": rag_service.index_version}
+
+
 @app.post("/scrape-job-url", response_model=JobScrapingResponse)
 async def scrape_job_url(request: JobScrapingRequest):
     """
-    Extract job information from URL using Gemini's URL context feature.
+    Extract job information from a job posting URL (see SCRAPE_MODE).
 
     This is part of the CV generation flow.
     """
@@ -89,35 +171,100 @@ async def scrape_job_url(request: JobScrapingRequest):
 @app.get("/resume/{resume_id}")
 async def get_resume(resume_id: str):
     """Retrieve generated resume data by ID."""
-    resume_data = storage.get_resume(resume_id)
+    resume_data = await asyncio.to_thread(storage.get_resume, resume_id)
     if not resume_data:
         raise HTTPException(status_code=404, detail="Resume not found")
     return resume_data
 
 
+async def get_cv_job_status(job_id: str) -> dict:
+    """Look up a CV job run by any worker process, or answer 404."""
+    status = await cv_job_queue.status(job_id)
+    if status is None:
+        detail = "Job not found or expired"
+        if config.CV_JOB_STORE_BACKEND.lower() == "memory":
+            detail += (
+                " (CV_JOB_STORE_BACKEND=memory only sees jobs of the server "
+                "process that accepted them)"
+            )
+        raise HTTPException(status_code=404, detail=detail)
+    return status
+
+
+@app.get("/cv-jobs/{job_id}")
+async def cv_job_status(job_id: str):
+    """
+    Poll a CV generation job.
+
+    Returns its status, latest stage, and once done the RENDER_ANALYSIS
+    payload (`result`) or the failure (`error`).
+    """
+    return await get_cv_job_status(job_id)
+
+
+@app.get("/cv-jobs/{job_id}/events")
+async def cv_job_events(job_id: str):
+    """
+    Follow a CV generation job as Server-Sent Events.
+
+    Replays the events so far, then streams new ones: `queued`, `started`,
+    `retrieval_done`, `generation_done`, `stored`, and finally `done` (with
+    the RENDER_ANALYSIS payload) or `error`.
+    """
+    await get_cv_job_status(job_id)
+
+    async def event_stream():
+        async for event, data in cv_job_queue.follow(job_id):
+            yield format_sse(event, data)
+
+    return sse_response(event_stream())
+
+
+@app.delete("/chat/{session_id}")
+async def clear_chat(session_id: str):
+    """Discard a conversation (e.g. when the user starts a new chat)."""
+    return {"cleared": await gemini_service.clear_chat_session(session_id)}
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat_with_gemini(request: ChatRequest):
     """
     Main chat endpoint - routes to appropriate flow handler.
 
-    Supports multi-turn conversations (no streaming).
+    Supports multi-turn conversations (no streaming, see /chat/stream).
     """
     if not gemini_service.is_available():
         raise HTTPException(status_code=500, detail="Gemini service not initialized")
 
+    require_rag(request.flow_id)
+
     try:
         # Route based on flow_id
         if request.flow_id == "ROADMAP":
             return await handle_roadmap_flow(request)
 
         elif request.flow_id == "DYNAMIC_CV":
-            # CV generation flow
-            if not request.form_data:
+            # CV generation flow, run on the CV job worker pool
+            validate_cv_form_data(request.form_data)
+            job = await cv_job_queue.submit(request.form_data)
+            if request.async_job:
+                return JSONResponse(
+                    status_code=202,
+                    content={
+                        "next_action": "RENDER_LOADING",
+                        "widget_data": {
+                            "job_id": job.job_id,
+                            "status_url": f"/cv-jobs/{job.job_id}",
+                            "events_url": f"/cv-jobs/{job.job_id}/events",
+                        },
+                    },
+                )
+            await job.wait()
+            if job.error:
                 raise HTTPException(
-                    status_code=400,
-                    detail="form_data is required for DYNAMIC_CV flow"
+                    status_code=job.error["status_code"], detail=job.error["detail"]
                 )
-            return await handle_cv_generation(request.form_data)
+            return JSONResponse(job.result)
 
         elif request.flow_id == "PRESENTATION":
             return await handle_presentation_flow(request)
@@ -133,3 +280,44 @@ async def chat_with_gemini(request: ChatRequest):
     except Exception as e:
         logger.error(f"Error in chat endpoint: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# Flows that support token streaming over /chat/stream
+STREAM_HANDLERS = {
+    "PRESENTATION": stream_presentation_flow,
+    "ROADMAP": stream_roadmap_flow,
+}
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming chat endpoint - forwards model chunks as Server-Sent Events.
+
+    Emits `chunk` events ({"text": ...}) as the answer is generated, then a
+    single `done` event, or an `error` event if generation fails mid-stream.
+    Only conversational flows (PRESENTATION, ROADMAP) are supported.
+    """
+    if not gemini_service.is_available():
+        raise HTTPException(status_code=500, detail="Gemini service not initialized")
+
+    handler = STREAM_HANDLERS.get(request.flow_id)
+    if handler is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Streaming not supported for flow_id: {request.flow_id}"
+        )
+    require_rag(request.flow_id)
+
+    async def event_stream():
+        try:
+            async for text in handler(request):
+                yield format_sse("chunk", {"text": text})
+            yield format_sse(
+                "done", {"session_id": request.session_id, "flow_id": request.flow_id}
+            )
+        except Exception as e:
+            logger.error(f"Error in chat stream: {e}")
+            yield format_sse("error", {"detail": str(e)})
+
+    return sse_response(event_stream())
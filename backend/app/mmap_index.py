@@ -0,0 +1,53 @@
+"""
+Read-only flat index over memory-mapped vectors.
+
+FAISS copies flat index codes into process memory on `read_index`, so every
+uvicorn worker would hold its own copy. This index searches a normalized
+float32 matrix opened with `np.load(mmap_mode="r")` instead: all workers on a
+host map the same file and share its physical pages through the page cache.
+"""
+import numpy as np
+
+
+class MmapFlatIndex:
+    """Exact inner-product search with the FAISS `search` interface."""
+
+    def __init__(self, vectors: np.ndarray, ids: np.ndarray):
+        """
+        Args:
+            vectors: (n, d) float32 matrix of L2-normalized vectors (mmap);
+                an empty store may hold a (0,) array
+            ids: (n,) int64 FAISS id of each row
+        """
+        self.vectors = vectors
+        self.ids = ids
+        self.ntotal = vectors.shape[0]
+        self.d = vectors.shape[1] if vectors.ndim == 2 else 0
+
+    def search(self, queries: np.ndarray, k: int):
+        """
+        Return the k best rows for each query, like `faiss.Index.search`.
+
+        Args:
+            queries: (nq, d) float32 query matrix
+            k: Number of results per query
+
+        Returns:
+            (scores, ids) arrays of shape (nq, k), padded with -inf / -1
+        """
+        nq = queries.shape[0]
+        scores = np.full((nq, k), -np.inf, dtype="float32")
+        ids = np.full((nq, k), -1, dtype="int64")
+        if self.ntotal == 0:
+            return scores, ids
+
+        all_scores = queries @ self.vectors.T
+        top_k = min(k, self.ntotal)
+        top = np.argpartition(-all_scores, top_k - 1, axis=1)[:, :top_k]
+        top_scores = np.take_along_axis(all_scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+
+        scores[:, :top_k] = np.take_along_axis(top_scores, order, axis=1)
+        ids[:, :top_k] = self.ids[top]
+        return scores, ids
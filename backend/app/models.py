@@ -10,6 +10,7 @@ class ChatRequest(BaseModel):
     flow_id: str = "PRESENTATION"
     session_id: str  # Required: unique session identifier for multi-turn conversations
     form_data: dict = None  # Optional form data for multi-step flows
+    async_job: bool = False  # DYNAMIC_CV: return a job id instead of waiting
 
 
 class ChatResponse(BaseModel):
@@ -0,0 +1,342 @@
+"""
+Local fetch and main-content extraction of job posting pages.
+
+Fetches pages with one pooled async HTTP client (keep-alive connections are
+reused across scrapes) and strips boilerplate locally: scripts, navigation,
+headers, footers and forms are dropped, <main>/<article> content is preferred
+when present, and schema.org JobPosting JSON-LD is kept since most job boards
+embed the full posting there. The compact text is then sent to a single
+structured-output call instead of a URL-context call plus a conversion call.
+
+Since the page is fetched from inside the deployment, only http(s) URLs whose
+host resolves to public addresses are fetched, and redirects are followed
+manually so every hop is checked (no requests to loopback, private,
+link-local or metadata addresses).
+"""
+import asyncio
+import html
+import ipaddress
+import json
+import logging
+import re
+import socket
+from html.parser import HTMLParser
+from typing import Awaitable, Callable, List, Optional
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+# Elements whose content is never part of the posting
+_SKIP_TAGS = {
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "svg",
+    "iframe",
+    "nav",
+    "header",
+    "footer",
+    "aside",
+    "form",
+    "button",
+}
+# Elements that start a new line in the extracted text
+_BLOCK_TAGS = {
+    "p",
+    "div",
+    "section",
+    "article",
+    "main",
+    "br",
+    "li",
+    "ul",
+    "ol",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "tr",
+    "table",
+    "dd",
+    "dt",
+}
+_VOID_TAGS = {"br", "hr", "img", "input", "meta", "link", "source", "wbr"}
+_SPACES_RE = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES_RE = re.compile(r"\n\s*\n+")
+
+
+class _MainContentParser(HTMLParser):
+    """Collect visible text, separately for <main>/<article> and the page."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.page: List[str] = []
+        self.main: List[str] = []
+        self.json_ld: List[str] = []
+        self._skip_depth = 0
+        self._main_depth = 0
+        self._in_json_ld = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "script" and dict(attrs).get("type") == "application/ld+json":
+            self._in_json_ld = True
+        if tag in _VOID_TAGS:
+            if tag == "br":
+                self._emit("\n")
+            return
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in ("main", "article"):
+            self._main_depth += 1
+        if tag in _BLOCK_TAGS:
+            self._emit("\n")
+
+    def handle_endtag(self, tag):
+        if tag == "script":
+            self._in_json_ld = False
+        if tag in _VOID_TAGS:
+            return
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag in ("main", "article"):
+            self._main_depth = max(self._main_depth - 1, 0)
+        if tag in _BLOCK_TAGS:
+            self._emit("\n")
+
+    def handle_data(self, data):
+        if self._in_json_ld:
+            self.json_ld.append(data)
+        elif not self._skip_depth:
+            self._emit(data)
+
+    def _emit(self, text: str) -> None:
+        if self._skip_depth:
+            return
+        self.page.append(text)
+        if self._main_depth:
+            self.main.append(text)
+
+
+def _clean(parts: List[str]) -> str:
+    text = _SPACES_RE.sub(" ", "".join(parts))
+    lines = (line.strip() for line in text.split("\n"))
+    return _BLANK_LINES_RE.sub("\n", "\n".join(lines)).strip()
+
+
+def _html_to_text(fragment: str) -> str:
+    parser = _MainContentParser()
+    parser.feed(fragment)
+    return _clean(parser.page)
+
+
+def _find_job_postings(data) -> List[dict]:
+    """JobPosting objects anywhere in a JSON-LD document (incl. @graph)."""
+    if isinstance(data, list):
+        return [posting for item in data for posting in _find_job_postings(item)]
+    if not isinstance(data, dict):
+        return []
+    kind = data.get("@type")
+    if kind == "JobPosting" or (isinstance(kind, list) and "JobPosting" in kind):
+        return [data]
+    return _find_job_postings(data.get("@graph", []))
+
+
+def _format_job_posting(posting: dict) -> str:
+    """Render the useful fields of a schema.org JobPosting as text."""
+    organization = posting.get("hiringOrganization") or {}
+    if isinstance(organization, dict):
+        organization = organization.get("name", "")
+    description = _html_to_text(html.unescape(posting.get("description") or ""))
+    fields = [
+        ("Intitulé", posting.get("title")),
+        ("Entreprise", organization),
+        ("Contrat", posting.get("employmentType")),
+        ("Publié le", posting.get("datePosted")),
+        ("Description", description),
+    ]
+    return "\n".join(
+        f"{label}: {value}"
+        for label, value in fields
+        if value and isinstance(value, str)
+    )
+
+
+def extract_main_text(page_html: str, max_chars: int = None) -> str:
+    """
+    Reduce a page to the compact text of its main content.
+
+    Args:
+        page_html: Raw HTML
+        max_chars: Output cap (defaults to SCRAPE_MAX_TEXT_CHARS)
+
+    Returns:
+        JobPosting JSON-LD fields (if any) followed by the visible main text
+    """
+    max_chars = max_chars or config.SCRAPE_MAX_TEXT_CHARS
+    parser = _MainContentParser()
+    parser.feed(page_html)
+    parser.close()
+
+    sections = []
+    for block in parser.json_ld:
+        try:
+            postings = _find_job_postings(json.loads(block))
+        except ValueError:
+            continue
+        sections.extend(_format_job_posting(posting) for posting in postings)
+
+    main_text = _clean(parser.main)
+    page_text = _clean(parser.page)
+    # Some sites wrap only a teaser in <main>; fall back to the whole page
+    sections.append(main_text if len(main_text) >= len(page_text) / 4 else page_text)
+
+    return "\n\n".join(section for section in sections if section)[:max_chars]
+
+
+class UnsafeURLError(ValueError):
+    """The URL is not http(s) or points at a non-public address."""
+
+
+# Resolver used to vet hosts: (host, port) -> IP address strings
+Resolver = Callable[[str, int], Awaitable[List[str]]]
+
+
+async def resolve_host(host: str, port: int) -> List[str]:
+    """Resolve a host name to its IP addresses."""
+    infos = await asyncio.get_running_loop().getaddrinfo(
+        host, port, type=socket.SOCK_STREAM
+    )
+    return [info[4][0] for info in infos]
+
+
+def is_public_address(address: str) -> bool:
+    """Whether an IP address is globally routable (not loopback, private...)."""
+    ip = ipaddress.ip_address(address.split("%", 1)[0])  # drop IPv6 zone id
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+class PageFetcher:
+    """Pooled async HTTP client for job pages."""
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        resolver: Optional[Resolver] = None,
+    ):
+        """
+        Args:
+            client: HTTP client to use (e.g. one with a mock transport);
+                by default a pooled client is created on first use
+            resolver: Host resolver used to vet URLs (defaults to DNS)
+        """
+        self._client = client
+        self._resolver = resolver or resolve_host
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=config.SCRAPE_FETCH_TIMEOUT,
+                # Redirects are followed in `fetch`, which vets every hop
+                follow_redirects=False,
+                limits=httpx.Limits(
+                    max_connections=20, max_keepalive_connections=10
+                ),
+                headers={
+                    "User-Agent": config.SCRAPE_USER_AGENT,
+                    "Accept": "text/html,application/xhtml+xml",
+                    "Accept-Language": "fr-FR,fr;q=0.9,en;q=0.8",
+                },
+            )
+        return self._client
+
+    async def check_url(self, url: str) -> None:
+        """
+        Refuse URLs that are not http(s) or resolve to non-public addresses.
+
+        Raises:
+            UnsafeURLError: If the URL must not be fetched from the server
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise UnsafeURLError(f"Only http(s) URLs can be fetched: {url}")
+        try:
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+            addresses = await self._resolver(parts.hostname, port)
+        except (OSError, ValueError) as e:
+            raise UnsafeURLError(f"Cannot resolve {parts.hostname}: {e}") from e
+        if not addresses or not all(map(is_public_address, addresses)):
+            raise UnsafeURLError(f"{parts.hostname} is not a public address")
+
+    async def fetch(self, url: str) -> str:
+        """
+        Download a page's HTML, up to SCRAPE_MAX_PAGE_BYTES.
+
+        Redirects (up to SCRAPE_MAX_REDIRECTS) are followed here so each
+        location is checked before it is requested.
+
+        Raises:
+            UnsafeURLError: If the URL or a redirect target is not public
+            httpx.HTTPError: If the request fails or returns an error status
+            ValueError: If the response is not HTML
+        """
+        client = self._get_client()
+        for _ in range(config.SCRAPE_MAX_REDIRECTS + 1):
+            await self.check_url(url)
+            async with client.stream(
+                "GET", url, follow_redirects=False
+            ) as response:
+                if response.is_redirect:
+                    url = urljoin(str(response.url), response.headers["location"])
+                    continue
+                return await self._read_html(response)
+        raise httpx.TooManyRedirects(
+            f"More than {config.SCRAPE_MAX_REDIRECTS} redirects"
+        )
+
+    async def _read_html(self, response: httpx.Response) -> str:
+        """Check a response and decode its body, up to SCRAPE_MAX_PAGE_BYTES."""
+        response.raise_for_status()
+        content_type = response.headers.get("content-type", "")
+        if "html" not in content_type and "xml" not in content_type:
+            raise ValueError(f"Not an HTML page ({content_type or 'no type'})")
+
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body.extend(chunk)
+            if len(body) >= config.SCRAPE_MAX_PAGE_BYTES:
+                break
+        encoding = response.encoding or "utf-8"
+
+        return bytes(body[: config.SCRAPE_MAX_PAGE_BYTES]).decode(
+            encoding, errors="replace"
+        )
+
+    async def fetch_main_text(self, url: str) -> str:
+        """Fetch a page and return its extracted main-content text."""
+        page_html = await self.fetch(url)
+        # Parsing up to SCRAPE_MAX_PAGE_BYTES of HTML is CPU-bound
+        text = await asyncio.to_thread(extract_main_text, page_html)
+        logger.info(
+            f"✓ Fetched {len(page_html)} characters of HTML, "
+            f"kept {len(text)} characters of content"
+        )
+        return text
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Singleton instance
+page_fetcher = PageFetcher()
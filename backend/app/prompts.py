@@ -78,6 +78,36 @@ Extrais et formate ces informations clairement en français.
 """
 
 
+def get_job_extraction_prompt(job_url: str, page_text: str) -> str:
+    """
+    Prompt for extracting job information from an already fetched page.
+
+    Args:
+        job_url: The job posting URL (for context only)
+        page_text: Main-content text extracted from the page
+
+    Returns:
+        Formatted prompt for job extraction
+    """
+    return f"""Extrais les informations de l'offre d'emploi ci-dessous (source : {job_url}).
+
+=== CONTENU DE LA PAGE ===
+{page_text}
+=== FIN DU CONTENU ===
+
+Structure les informations en 4 sections:
+
+1. Description du poste: Un résumé clair du rôle, contexte entreprise, et ce que le poste implique (2-4 phrases)
+2. Missions principales: Les responsabilités clés et missions du rôle (sous forme de liste)
+3. Qualifications requises: Compétences, expérience, formation et prérequis essentiels (sous forme de liste)
+4. Informations complémentaires: Avantages, salaire, environnement de travail, ou autres détails pertinents (1-2 phrases, ou "Non spécifié" si indisponible)
+
+Extrais et formate ces informations clairement en français.
+
+{LINGUISTIC_RULES}
+"""
+
+
 JOB_SCRAPING_SCHEMA = {
     "type": "object",
     "properties": {
@@ -121,6 +151,9 @@ Tu es un consultant stratégique qui aide les clients à créer des roadmaps bus
 # FLOW 3: DYNAMIC CV (Resume Generation)
 # ═══════════════════════════════════════════════════════════════════════════
 
+# Retrieval query for the candidate profile (precomputed next to the index)
+CANDIDATE_PROFILE_QUERY = "Youssef Benkirane resume information, work experience, education, skills, projects, contact details, languages"
+
 def get_cv_generation_prompt(
     candidate_context: str,
     company_name: str,
@@ -257,6 +290,50 @@ Aucun commentaire supplémentaire.
 """
 
 
+# What each section request of get_cv_section_prompt must produce
+CV_SECTION_FOCUS = {
+    "header": "les informations de contact et le résumé professionnel",
+    "skills": "la catégorisation des compétences",
+    "experience": "les expériences professionnelles",
+    "education_projects": "la formation et les projets",
+    "match_analysis": "l'analyse de match (score, tag, message, points forts, "
+    "points de vigilance)",
+}
+
+
+def get_cv_section_prompt(
+    cv_prompt: str, section: str, generated_resume: str = None
+) -> str:
+    """
+    Prompt for generating one section of the resume.
+
+    The full CV generation prompt is kept as a shared prefix so every section
+    sees the same candidate and job context and the same rules.
+
+    Args:
+        cv_prompt: Prompt from get_cv_generation_prompt
+        section: Key of CV_SECTION_FOCUS
+        generated_resume: JSON of the sections generated so far, which this
+            section must build on (used for the match analysis)
+
+    Returns:
+        Formatted prompt for one resume section
+    """
+    generated = ""
+    if generated_resume:
+        generated = f"""
+Voici le CV déjà généré. Ta réponse doit s'appuyer sur son contenu :
+{generated_resume}
+"""
+    return f"""{cv_prompt}
+──────────────────────────────────
+### 🎯 SECTION DEMANDÉE
+
+Pour cette requête, génère UNIQUEMENT {CV_SECTION_FOCUS[section]}.
+Les autres sections sont générées séparément : ne les inclus pas.
+Le schéma JSON fourni ne contient que cette partie du CV.
+{generated}"""
+
 # ═══════════════════════════════════════════════════════════════════════════
 # FLOW 4: PRESENTATION (General Information with RAG)
 # ═══════════════════════════════════════════════════════════════════════════
@@ -1,62 +1,591 @@
 """
 RAG (Retrieval-Augmented Generation) service for knowledge base search.
+
+Index artifacts are versioned: ingest writes each build to its own directory
+under RAG_INDEX_DIR and then atomically repoints the CURRENT file. The service
+holds the loaded version as one immutable snapshot, so a reload builds the
+new snapshot in the background and swaps a single reference: in-flight
+searches finish on the old version, new ones use the new version. The old
+snapshot's chunk store is closed once the last of those searches ends.
 """
 import os
+import asyncio
+import hashlib
+import json
+import shutil
+import time
 import faiss
 import numpy as np
-import pickle
-from typing import List, Dict
+from typing import List, Dict, Optional
 import logging
 from .gemini_service import gemini_service
+from .embedding_cache import embedding_cache
+from .semantic_cache import answer_cache
+from .chunk_store import ChunkStore
+from .batcher import MicroBatcher
+from .mmap_index import MmapFlatIndex
+from .ann_index import RescoringIndex, configure_search
+from .embedding_reduction import load_pca, project, reduction_settings
 from .config import config
+from . import prompts
 
 logger = logging.getLogger(__name__)
 
+# File names inside an index version directory
+INDEX_FILE = "index.faiss"
+CHUNK_STORE_DIR = "chunk_store"
+MANIFEST_FILE = "index_manifest.json"
+CANDIDATE_PROFILE_FILE = "candidate_profile.json"
+PCA_FILE = "pca.faiss"
+CURRENT_FILE = "CURRENT"
+PREVIOUS_FILE = "PREVIOUS"  # version CURRENT pointed to before the last publish
+IN_USE_FILE = "IN_USE"  # touched by every process serving the version
+
+
+def file_fingerprint(path: str) -> str:
+    """SHA-256 of a file's content, used to tie derived artifacts to an index."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_candidate_profile(profile_path: str, index_path: str, chunks: List[str]):
+    """
+    Save the precomputed candidate profile next to the index.
+
+    The profile records the fingerprint of the index it was computed from, so
+    a re-ingest (which rewrites the index) invalidates it automatically.
+
+    Args:
+        profile_path: Where to write the profile JSON
+        index_path: FAISS index the chunks were retrieved from
+        chunks: Retrieved candidate chunks, best match first
+    """
+    data = {
+        "index_fingerprint": file_fingerprint(index_path),
+        "query": prompts.CANDIDATE_PROFILE_QUERY,
+        "chunks": chunks,
+    }
+    with open(profile_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def _read_pointer(index_dir: str, name: str) -> Optional[str]:
+    try:
+        with open(os.path.join(index_dir, name), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _write_pointer(index_dir: str, name: str, version: str) -> None:
+    path = os.path.join(index_dir, name)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_path, path)
+
+
+def read_current_version(index_dir: str) -> Optional[str]:
+    """Return the published index version name, or None if nothing is published."""
+    return _read_pointer(index_dir, CURRENT_FILE)
+
+
+def new_version_name() -> str:
+    """Name for a new index version (sortable timestamp, microsecond precision)."""
+    now = time.time()
+    microseconds = int(now % 1 * 1_000_000)
+    return (
+        time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+        + f".{microseconds:06d}-{os.getpid()}"
+    )
+
+
+def publish_index_version(index_dir: str, version: str) -> None:
+    """
+    Atomically make `version` the current index.
+
+    The version it replaces is recorded in PREVIOUS. Nothing is deleted here:
+    other processes may still serve older versions until their next watch
+    poll (see `prune_index_versions`).
+    """
+    previous = read_current_version(index_dir)
+    if previous and previous != version:
+        _write_pointer(index_dir, PREVIOUS_FILE, previous)
+    _write_pointer(index_dir, CURRENT_FILE, version)
+
+
+def mark_version_in_use(version_path: str) -> None:
+    """Touch a version's IN_USE heartbeat so pruning leaves it alone."""
+    path = os.path.join(version_path, IN_USE_FILE)
+    try:
+        with open(path, "a"):
+            pass
+        os.utime(path)
+    except OSError as e:
+        logger.warning(f"⚠ Could not mark {version_path} as in use: {e}")
+
+
+def prune_index_versions(index_dir: str, keep: int = None) -> List[str]:
+    """
+    Delete superseded index versions that no process is serving.
+
+    Never deletes CURRENT, PREVIOUS (processes that have not reloaded yet),
+    versions newer than CURRENT (an ingest may be writing one) or versions
+    whose IN_USE heartbeat is younger than RAG_INDEX_IN_USE_GRACE. Of the
+    remaining older versions, the newest are kept up to `keep` versions in
+    total.
+
+    Args:
+        index_dir: Directory holding the version directories
+        keep: Versions to keep, including CURRENT (RAG_INDEX_KEEP_VERSIONS)
+
+    Returns:
+        Names of the deleted versions
+    """
+    keep = keep or config.RAG_INDEX_KEEP_VERSIONS
+    current = read_current_version(index_dir)
+    if current is None:
+        return []
+    protected = {current, _read_pointer(index_dir, PREVIOUS_FILE)}
+
+    older = sorted(
+        name
+        for name in os.listdir(index_dir)
+        if os.path.isdir(os.path.join(index_dir, name)) and name < current
+    )
+    in_use_after = time.time() - config.RAG_INDEX_IN_USE_GRACE
+    deleted = []
+    for name in older[: max(len(older) - keep + 1, 0)]:
+        path = os.path.join(index_dir, name)
+        heartbeat = os.path.join(path, IN_USE_FILE)
+        if name in protected or (
+            os.path.exists(heartbeat) and os.path.getmtime(heartbeat) > in_use_after
+        ):
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        deleted.append(name)
+    return deleted
+
+
+class _IndexSnapshot:
+    """Everything loaded for one index version; replaced as a whole on reload."""
+
+    def __init__(self, version: str, path: str):
+        self.version = version
+        self.path = path
+        self.index_path = os.path.join(path, INDEX_FILE)
+        self.candidate_profile_path = os.path.join(path, CANDIDATE_PROFILE_FILE)
+        self.chunk_store = ChunkStore(os.path.join(path, CHUNK_STORE_DIR))
+        self.fingerprint = file_fingerprint(self.index_path)
+        # Versions written before these fields existed are flat float32
+        manifest = self._read_manifest()
+        self.index_type = manifest.get("index_type", "flat")
+        self.vector_storage = manifest.get("vector_storage", "float32")
+        self.index_bytes = os.path.getsize(self.index_path)
+        self.rescoring = False
+        self.index_mode: Optional[str] = None
+        self.index = self._load_index()
+        self.pca = self._load_pca()
+        self._check_dimensions(manifest)
+        self.candidate_context = self._load_candidate_profile()
+        # In-flight searches, and whether a reload has replaced this snapshot
+        self._searches = 0
+        self._retired = False
+
+    def acquire(self) -> None:
+        """Register an in-flight search (called on the event loop)."""
+        self._searches += 1
+
+    def release(self) -> None:
+        """End an in-flight search, closing the snapshot if it was retired."""
+        self._searches -= 1
+        if self._retired and self._searches == 0:
+            self.close()
+
+    def retire(self) -> None:
+        """Mark as replaced: close now, or when the last search releases it."""
+        self._retired = True
+        if self._searches == 0:
+            self.close()
+
+    def close(self) -> None:
+        """Release the chunk store's mmap and file handle."""
+        self.chunk_store.close()
+        logger.info(f"Closed index version {self.version}")
+
+    def _read_manifest(self) -> Dict:
+        """Ingest manifest of this version ({} if missing or unreadable)."""
+        manifest_path = os.path.join(self.path, MANIFEST_FILE)
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _load_index(self):
+        """
+        Load the vector index.
+
+        In mmap mode (RAG_INDEX_MMAP) the index is opened read-only from the
+        page cache, so all workers on a host share one physical copy: flat
+        indexes are searched straight from the chunk store's vectors.npy, and
+        other index types are read with FAISS's mmap flag. HNSW/IVF search
+        parameters are applied from config, and quantized indexes are wrapped
+        for exact re-scoring when RAG_RESCORE is on.
+        """
+        is_flat_float32 = (
+            self.index_type == "flat" and self.vector_storage == "float32"
+        )
+        if not config.RAG_INDEX_MMAP:
+            self.index_mode = "in-memory"
+            index = faiss.read_index(self.index_path)
+        elif is_flat_float32 and self.chunk_store.vectors is not None:
+            self.index_mode = "mmap-flat"
+            return MmapFlatIndex(self.chunk_store.vectors, self.chunk_store.ids)
+        else:
+            self.index_mode = "mmap-faiss"
+            index = faiss.read_index(
+                self.index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+            )
+
+        configure_search(index)
+        if (
+            config.RAG_RESCORE
+            and self.vector_storage != "float32"
+            and self.chunk_store.vectors is not None
+        ):
+            self.rescoring = True
+            return RescoringIndex(
+                index, self.chunk_store.vectors, self.chunk_store.position
+            )
+        return index
+
+    def _load_pca(self):
+        """PCA projection fitted at ingest, if this version uses one."""
+        pca_path = os.path.join(self.path, PCA_FILE)
+        return load_pca(pca_path) if os.path.exists(pca_path) else None
+
+    def _check_dimensions(self, manifest: Dict) -> None:
+        """
+        Verify the index matches the embedding settings queries will use.
+
+        Raises:
+            ValueError: If the index was built with another output dimension or
+                reduction, or its vectors do not match the recorded dimension
+        """
+        if not manifest:
+            return
+
+        for key, value in reduction_settings().items():
+            # Versions built before reduced dimensions existed are full size
+            built = manifest.get(key, 0 if key == "embedding_dimension" else None)
+            if built != value:
+                raise ValueError(
+                    f"Index version {self.version} was built with {key}={built}, "
+                    f"but config has {value} - re-run ingest"
+                )
+
+        if manifest.get("dimension", self.index.d) != self.index.d:
+            raise ValueError(
+                f"Index version {self.version} holds {self.index.d}-dimensional "
+                f"vectors, manifest records {manifest['dimension']}"
+            )
+
+    def _load_candidate_profile(self) -> Optional[str]:
+        """Load the precomputed candidate profile if it matches this index."""
+        if not os.path.exists(self.candidate_profile_path):
+            logger.info("No precomputed candidate profile found")
+            return None
+
+        try:
+            with open(self.candidate_profile_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠ Could not read candidate profile: {e}")
+            return None
+
+        if data.get("index_fingerprint") != self.fingerprint:
+            logger.info("Candidate profile is stale (index changed) - ignoring it")
+            return None
+
+        if not data.get("chunks"):
+            return None
+
+        logger.info(f"✓ Loaded candidate profile ({len(data['chunks'])} chunks)")
+        return "\n\n".join(data["chunks"])
+
 
 class RAGService:
     """Service for retrieving relevant context from the knowledge base."""
 
-    def __init__(
-        self, index_path: str = "index.faiss", metadata_path: str = "index_metadata.pkl"
-    ):
-        self.index_path = index_path
-        self.metadata_path = metadata_path
-        self.index = None
-        self.metadata = None
-        self.chunks = None
-        self.is_initialized = False
+    def __init__(self, index_dir: str = None):
+        self.index_dir = index_dir or config.RAG_INDEX_DIR
+        self._snapshot: Optional[_IndexSnapshot] = None
+        self._reload_lock = asyncio.Lock()
+        # Concurrent searches are coalesced into batched embedding calls and
+        # batched index searches
+        batch_wait = config.QUERY_BATCH_MAX_WAIT_MS / 1000
+        self._embed_batcher = MicroBatcher(
+            self._embed_queries, config.QUERY_BATCH_MAX_SIZE, batch_wait
+        )
+        self._search_batcher = MicroBatcher(
+            self._search_queries, config.QUERY_BATCH_MAX_SIZE, batch_wait
+        )
+        # Readiness reported by /health: starting, ingesting, ready or failed
+        self.status = "starting"
+
+    @property
+    def is_initialized(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def index_version(self) -> Optional[str]:
+        """Name of the loaded index version (None before initialization)."""
+        return self._snapshot.version if self._snapshot else None
+
+    @property
+    def index(self):
+        return self._snapshot.index if self._snapshot else None
+
+    @property
+    def index_mode(self) -> Optional[str]:
+        return self._snapshot.index_mode if self._snapshot else None
+
+    @property
+    def index_type(self) -> Optional[str]:
+        return self._snapshot.index_type if self._snapshot else None
+
+    def index_stats(self) -> Dict:
+        """Layout and storage of the loaded index, for /health."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {}
+        return {
+            "version": snapshot.version,
+            "type": snapshot.index_type,
+            "vector_storage": snapshot.vector_storage,
+            "rescoring": snapshot.rescoring,
+            "mode": snapshot.index_mode,
+            "vectors": snapshot.index.ntotal,
+            "dimension": snapshot.index.d,
+            "reduction": reduction_settings()["embedding_reduction"],
+            "index_bytes": snapshot.index_bytes,
+        }
+
+    def current_version(self) -> Optional[str]:
+        """Name of the published index version on disk."""
+        return read_current_version(self.index_dir)
+
+    def _load_snapshot(self) -> Optional[_IndexSnapshot]:
+        """Load the published index version (blocking)."""
+        version = self.current_version()
+        if version is None:
+            logger.warning(f"No published index version in {self.index_dir}")
+            return None
+
+        path = os.path.join(self.index_dir, version)
+        if not os.path.exists(os.path.join(path, INDEX_FILE)):
+            logger.warning(f"FAISS index not found in {path}")
+            return None
+        if not ChunkStore.exists(os.path.join(path, CHUNK_STORE_DIR)):
+            logger.warning(f"Chunk store not found in {path}")
+            return None
+
+        snapshot = _IndexSnapshot(version, path)
+        mark_version_in_use(path)
+        logger.info(
+            f"✓ Loaded index version {version}: {snapshot.index.ntotal} vectors, "
+            f"{len(snapshot.chunk_store)} chunks ({snapshot.index_type}, "
+            f"{snapshot.index_mode})"
+        )
+        return snapshot
 
     def initialize(self) -> bool:
-        """Initialize the RAG service by loading index and metadata."""
+        """Initialize the RAG service by loading the published index version."""
         try:
-            # Load FAISS index
-            if not os.path.exists(self.index_path):
-                logger.warning(f"FAISS index not found at {self.index_path}")
+            snapshot = self._load_snapshot()
+            if snapshot is None:
                 return False
+            self._snapshot = snapshot
+            self.status = "ready"
+            return True
+
+        except Exception as e:
+            logger.error(f"Error initializing RAG service: {e}")
+            return False
 
-            self.index = faiss.read_index(self.index_path)
-            logger.info(f"✓ Loaded FAISS index with {self.index.ntotal} vectors")
+    async def reload(self, force: bool = False) -> bool:
+        """
+        Load the published index version in the background and swap it in.
 
-            # Load metadata and chunks
-            if not os.path.exists(self.metadata_path):
-                logger.warning(f"Metadata file not found at {self.metadata_path}")
+        The new snapshot (index, chunk store, candidate profile) is fully
+        built before a single reference assignment makes it live, so requests
+        are never blocked or served a half-loaded index. Caches tied to the
+        old version are cleared, and the old snapshot is closed once its
+        in-flight searches finish.
+
+        Args:
+            force: Reload even if the published version is already loaded
+
+        Returns:
+            True if a new version was swapped in
+        """
+        async with self._reload_lock:
+            version = self.current_version()
+            if version is None or (not force and version == self.index_version):
                 return False
 
-            with open(self.metadata_path, "rb") as f:
-                data = pickle.load(f)
-                self.metadata = data["metadata"]
-                self.chunks = data["chunks"]
+            logger.info(f"Reloading index version {version}...")
+            try:
+                snapshot = await asyncio.to_thread(self._load_snapshot)
+            except Exception as e:
+                logger.error(f"Error reloading index version {version}: {e}")
+                return False
+            if snapshot is None:
+                return False
 
-            logger.info(f"✓ Loaded metadata for {len(self.chunks)} chunks")
+            if snapshot.candidate_context is None:
+                await self._pin_candidate_context(snapshot)
 
-            self.is_initialized = True
+            previous = self._snapshot
+            previous_version = self.index_version
+            self._snapshot = snapshot
+            self.status = "ready"
+            answer_cache.clear()
+            logger.info(
+                f"✓ Swapped index version {previous_version} → {snapshot.version}"
+            )
+            if previous is not None:
+                previous.retire()
             return True
 
-        except Exception as e:
-            logger.error(f"Error initializing RAG service: {e}")
-            return False
+    async def watch(self, interval: float = None) -> None:
+        """
+        Poll the published version and hot-reload when it changes, until cancelled.
+
+        Each poll also refreshes the IN_USE heartbeat of the served version,
+        so `prune_index_versions` does not delete it under this process.
+        """
+        interval = interval or config.RAG_INDEX_WATCH_INTERVAL
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                snapshot = self._snapshot
+                if snapshot is not None:
+                    mark_version_in_use(snapshot.path)
+                if self.current_version() != self.index_version:
+                    await self.reload()
+            except Exception as e:
+                logger.error(f"Error watching index version: {e}")
+
+    async def get_candidate_context(self) -> str:
+        """
+        Get the candidate profile context used by DYNAMIC_CV.
 
-    def search(
+        Served from the precomputed profile when available; otherwise computed
+        once with a RAG search and pinned (in memory and next to the index).
+
+        Returns:
+            Candidate context string, or "" if nothing relevant was found
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return ""
+        if snapshot.candidate_context:
+            return snapshot.candidate_context
+        return await self._pin_candidate_context(snapshot)
+
+    async def _pin_candidate_context(self, snapshot: _IndexSnapshot) -> str:
+        """Compute the candidate profile against a snapshot and store it there."""
+        results = await self._search_snapshot(
+            snapshot,
+            prompts.CANDIDATE_PROFILE_QUERY,
+            top_k=config.CANDIDATE_PROFILE_TOP_K,
+            similarity_threshold=config.CANDIDATE_PROFILE_THRESHOLD,
+        )
+        if not results:
+            return ""
+
+        chunks = [doc["chunk"] for doc in results]
+        try:
+            write_candidate_profile(
+                snapshot.candidate_profile_path, snapshot.index_path, chunks
+            )
+        except OSError as e:
+            logger.warning(f"⚠ Could not save candidate profile: {e}")
+
+        snapshot.candidate_context = "\n\n".join(chunks)
+        logger.info(f"✓ Pinned candidate profile ({len(chunks)} chunks)")
+        return snapshot.candidate_context
+
+    async def embed_query(self, query: str) -> Optional[np.ndarray]:
+        """
+        Embed a search query, going through the embedding cache first.
+
+        Args:
+            query: The search query
+
+        Returns:
+            Query embedding, or None if creation fails
+        """
+        cached = await embedding_cache.get(query, "RETRIEVAL_QUERY")
+        if cached is not None:
+            return cached
+
+        # Batched with other queries arriving within QUERY_BATCH_MAX_WAIT_MS
+        vector = await self._embed_batcher.submit(query)
+        if vector is None:
+            return None
+
+        await embedding_cache.put(query, "RETRIEVAL_QUERY", vector)
+        return vector
+
+    async def _embed_queries(self, queries: List[str]) -> List[Optional[np.ndarray]]:
+        """Embed a batch of queries with one API call (MicroBatcher handler)."""
+        embeddings = await gemini_service.create_embeddings_batch_async(
+            queries, task_type="RETRIEVAL_QUERY"
+        )
+        if len(embeddings) != len(queries):
+            return [None] * len(queries)
+        return [np.asarray(values, dtype="float32") for values in embeddings]
+
+    async def _search_queries(self, requests: List) -> List:
+        """
+        Run a batch of (snapshot, query vector, top_k) searches (MicroBatcher
+        handler).
+
+        Queries against the same snapshot are stacked into one matrix and
+        searched with a single `index.search` in a worker thread.
+
+        Returns:
+            (scores, ids) rows for each request, in order
+        """
+        results = [None] * len(requests)
+        groups: Dict[int, List[int]] = {}
+        for i, (snapshot, _, _) in enumerate(requests):
+            groups.setdefault(id(snapshot), []).append(i)
+
+        for positions in groups.values():
+            snapshot = requests[positions[0]][0]
+            queries = np.vstack([requests[i][1] for i in positions])
+            k = max(requests[i][2] for i in positions)
+            scores, ids = await asyncio.to_thread(snapshot.index.search, queries, k)
+            for row, i in enumerate(positions):
+                top_k = requests[i][2]
+                results[i] = (scores[row, :top_k], ids[row, :top_k])
+        return results
+
+    def batching_stats(self) -> Dict:
+        """Query micro-batching counters, for /health."""
+        return {
+            "embedding": self._embed_batcher.stats(),
+            "search": self._search_batcher.stats(),
+        }
+
+    async def search(
         self,
         query: str,
         top_k: int = None,
@@ -73,10 +602,25 @@ class RAGService:
         Returns:
             List of relevant chunks with metadata and scores
         """
-        if not self.is_initialized:
+        # Pin the snapshot so a concurrent reload cannot change it mid-search
+        snapshot = self._snapshot
+        if snapshot is None:
             logger.warning("RAG service not initialized")
             return []
 
+        return await self._search_snapshot(
+            snapshot, query, top_k, similarity_threshold
+        )
+
+    async def _search_snapshot(
+        self,
+        snapshot: _IndexSnapshot,
+        query: str,
+        top_k: int = None,
+        similarity_threshold: float = None,
+    ) -> List[Dict]:
+        """Search one index snapshot (see `search`)."""
+
         if not gemini_service.is_available():
             logger.warning("Gemini service not available for embeddings")
             return []
@@ -85,32 +629,34 @@ class RAGService:
         top_k = top_k or config.RAG_TOP_K
         similarity_threshold = similarity_threshold or config.RAG_SIMILARITY_THRESHOLD
 
+        # Keep the snapshot's chunk store open until this search is done
+        snapshot.acquire()
         try:
-            # Create embedding for query using gemini_service
-            embedding_values = gemini_service.create_embedding(
-                query, task_type="RETRIEVAL_QUERY"
-            )
+            embedding_values = await self.embed_query(query)
 
             if embedding_values is None:
                 logger.error("Failed to create query embedding")
                 return []
 
-            query_embedding = np.array([embedding_values]).astype("float32")
+            # Same normalization and projection as the indexed documents
+            query_embedding = project([embedding_values], snapshot.pca)
 
-            # Normalize for cosine similarity
-            faiss.normalize_L2(query_embedding)
-
-            # Search the index
-            scores, indices = self.index.search(query_embedding, top_k)
+            # Search the index (batched with concurrent searches)
+            scores, indices = await self._search_batcher.submit(
+                (snapshot, query_embedding, top_k)
+            )
 
             # Prepare results
             results = []
-            for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-                if score >= similarity_threshold and idx < len(self.chunks):
+            for i, (score, idx) in enumerate(zip(scores, indices)):
+                if score < similarity_threshold:
+                    continue
+                position = snapshot.chunk_store.position(int(idx))
+                if position is not None:
                     results.append(
                         {
-                            "chunk": self.chunks[idx],
-                            "metadata": self.metadata[idx],
+                            "chunk": snapshot.chunk_store.chunk(position),
+                            "metadata": snapshot.chunk_store.metadata(position),
                             "score": float(score),
                             "rank": i + 1,
                         }
@@ -124,6 +670,8 @@ class RAGService:
         except Exception as e:
             logger.error(f"Error searching knowledge base: {e}")
             return []
+        finally:
+            snapshot.release()
 
     def format_context(
         self, search_results: List[Dict], max_context_length: int = 2000
@@ -0,0 +1,76 @@
+"""
+Async rate limiter for upstream quotas (requests and tokens per minute).
+"""
+import asyncio
+import time
+
+
+class _TokenBucket:
+    """
+    Continuously refilling bucket holding up to one minute of quota.
+
+    A quota of 0 (or less) means unlimited.
+    """
+
+    def __init__(self, per_minute: float):
+        self.unlimited = per_minute <= 0
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0  # units per second
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if available now)."""
+        if self.unlimited:
+            return 0.0
+        missing = amount - self.level
+        return max(missing / self.rate, 0.0)
+
+
+class AsyncRateLimiter:
+    """Limit callers to a requests-per-minute and tokens-per-minute budget."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        """
+        Args:
+            requests_per_minute: Request budget (0 = unlimited)
+            tokens_per_minute: Token budget (0 = unlimited)
+        """
+        self._requests = _TokenBucket(requests_per_minute)
+        self._tokens = _TokenBucket(tokens_per_minute)
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """
+        Wait until one request carrying `tokens` tokens fits in the budget.
+
+        Requests larger than the per-minute token budget are clamped to it, so
+        they wait for a full bucket instead of blocking forever.
+
+        Args:
+            tokens: Estimated tokens for the request
+        """
+        if not self._tokens.unlimited:
+            tokens = min(tokens, self._tokens.capacity)
+
+        # Callers are served one at a time, in arrival order
+        async with self._lock:
+            while True:
+                self._requests.refill()
+                self._tokens.refill()
+                wait = max(self._requests.wait_time(1), self._tokens.wait_time(tokens))
+                if wait <= 0:
+                    self._requests.level -= 1
+                    self._tokens.level -= tokens
+                    return
+                await asyncio.sleep(wait)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)."""
+    return len(text) // 4 + 1
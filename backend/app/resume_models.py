@@ -1,8 +1,8 @@
 """
 Pydantic models for structured resume generation using Gemini.
 """
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, Field, create_model
 
 
 class ContactInfo(BaseModel):
@@ -110,3 +110,35 @@ class StructuredResume(BaseModel):
     match_analysis: MatchScore = Field(
         description="Analysis of how well the candidate matches the job"
     )
+
+
+# Groups of StructuredResume fields generated separately in "sections" mode:
+# the content sections concurrently, then "match_analysis" from the merged
+# content. `languages` is not generated: the CV flow always sets it.
+RESUME_SECTIONS: Dict[str, Tuple[str, ...]] = {
+    "header": ("contact_info", "professional_summary"),
+    "skills": ("key_skills",),
+    "experience": ("professional_experience",),
+    "education_projects": ("education", "projects"),
+    "match_analysis": ("match_analysis",),
+}
+
+
+def _section_model(section: str, fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Model holding a subset of StructuredResume fields, with their schema."""
+    return create_model(
+        f"Resume_{section}",
+        **{
+            name: (
+                StructuredResume.model_fields[name].annotation,
+                StructuredResume.model_fields[name],
+            )
+            for name in fields
+        },
+    )
+
+
+RESUME_SECTION_MODELS: Dict[str, Type[BaseModel]] = {
+    section: _section_model(section, fields)
+    for section, fields in RESUME_SECTIONS.items()
+}
@@ -0,0 +1,202 @@
+"""
+Retry policy for upstream (Gemini) calls.
+
+Retries use exponential backoff with full jitter, only retry errors that can
+plausibly succeed on a second try (5xx, 408/429, transport failures), and stop
+once a per-call deadline is spent so tail latency stays bounded.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+import httpx
+from google.genai import errors as genai_errors
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+# HTTP status codes worth retrying (timeouts, rate limits, upstream failures)
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Decide whether an upstream error is worth retrying.
+
+    Args:
+        exc: Exception raised by the upstream call
+
+    Returns:
+        True for transient errors, False for fatal ones (bad request, auth, ...)
+    """
+    if isinstance(exc, genai_errors.APIError):
+        return exc.code in RETRYABLE_STATUS_CODES
+    if isinstance(exc, (httpx.TransportError, ConnectionError, TimeoutError)):
+        return True
+    if isinstance(exc, asyncio.TimeoutError):
+        return True
+    return False
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Full-jitter backoff: a random delay in [0, min(max_delay, base * 2^attempt)].
+
+    Args:
+        attempt: Zero-based index of the attempt that just failed
+
+    Returns:
+        Number of seconds to sleep before the next attempt
+    """
+    cap = min(config.RETRY_MAX_DELAY, config.RETRY_BASE_DELAY * (2**attempt))
+    return random.uniform(0, cap)
+
+
+class RetryStats:
+    """Thread-safe attempt and latency counters, grouped by operation name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ops: Dict[str, Dict[str, float]] = {}
+
+    def record(
+        self, operation: str, attempts: int, latency: float, outcome: str
+    ) -> None:
+        """
+        Record the result of one retried call.
+
+        Args:
+            operation: Logical operation name (e.g. "chat", "embedding")
+            attempts: Number of attempts made
+            latency: Total wall-clock time in seconds, including sleeps
+            outcome: One of "success", "fatal", "exhausted", "deadline"
+        """
+        with self._lock:
+            op = self._ops.setdefault(
+                operation,
+                {
+                    "calls": 0,
+                    "attempts": 0,
+                    "retries": 0,
+                    "success": 0,
+                    "fatal": 0,
+                    "exhausted": 0,
+                    "deadline": 0,
+                    "total_latency": 0.0,
+                    "max_latency": 0.0,
+                },
+            )
+            op["calls"] += 1
+            op["attempts"] += attempts
+            op["retries"] += max(attempts - 1, 0)
+            op[outcome] += 1
+            op["total_latency"] += latency
+            op["max_latency"] = max(op["max_latency"], latency)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return a copy of the counters with an average latency per operation."""
+        with self._lock:
+            result = {}
+            for name, op in self._ops.items():
+                data = dict(op)
+                data["avg_latency"] = (
+                    op["total_latency"] / op["calls"] if op["calls"] else 0.0
+                )
+                result[name] = data
+            return result
+
+
+retry_stats = RetryStats()
+
+
+async def retry_async(
+    func,
+    *args,
+    operation: str = "default",
+    max_retries: Optional[int] = None,
+    deadline: Optional[float] = None,
+    **kwargs,
+):
+    """
+    Await a coroutine function, retrying transient failures.
+
+    Sleeps with asyncio so the event loop keeps serving other requests, and
+    cancels the in-flight attempt if it would overrun the call deadline.
+
+    Args:
+        func: Coroutine function to execute
+        *args, **kwargs: Arguments to pass to the function
+        operation: Name used for metrics and logs
+        max_retries: Maximum attempts (defaults to config value)
+        deadline: Total time budget in seconds (defaults to config value)
+
+    Returns:
+        Result of the awaited call
+
+    Raises:
+        Exception: The fatal error, the last transient error, or a TimeoutError
+            if the deadline is spent
+    """
+    max_retries = max_retries or config.MAX_RETRIES
+    deadline = deadline or config.RETRY_DEADLINE
+    start = time.monotonic()
+    attempt = 0
+
+    while True:
+        remaining = deadline - (time.monotonic() - start)
+        # Only this scope's expiry is the call deadline: a TimeoutError raised
+        # by the upstream call itself is a transient error like any other
+        timeout = asyncio.timeout(remaining)
+        try:
+            async with timeout:
+                result = await func(*args, **kwargs)
+        except Exception as e:
+            if timeout.expired():
+                logger.error(f"[{operation}] Deadline of {deadline}s exceeded")
+                retry_stats.record(
+                    operation, attempt + 1, time.monotonic() - start, "deadline"
+                )
+                raise
+
+            outcome = _next_step(operation, e, attempt, max_retries)
+            if outcome:
+                retry_stats.record(
+                    operation, attempt + 1, time.monotonic() - start, outcome
+                )
+                raise
+
+            wait_time = backoff_delay(attempt)
+            if time.monotonic() - start + wait_time >= deadline:
+                logger.error(f"[{operation}] No time left in deadline to retry: {e}")
+                retry_stats.record(
+                    operation, attempt + 1, time.monotonic() - start, "deadline"
+                )
+                raise
+
+            logger.warning(
+                f"[{operation}] Attempt {attempt + 1} failed: {e}. "
+                f"Retrying in {wait_time:.2f}s..."
+            )
+            await asyncio.sleep(wait_time)
+            attempt += 1
+            continue
+
+        retry_stats.record(operation, attempt + 1, time.monotonic() - start, "success")
+        return result
+
+
+def _next_step(
+    operation: str, exc: Exception, attempt: int, max_retries: int
+) -> Optional[str]:
+    """Return the terminal outcome for a failed attempt, or None to retry."""
+    if not is_retryable(exc):
+        logger.error(f"[{operation}] Non-retryable error: {exc}")
+        return "fatal"
+    if attempt + 1 >= max_retries:
+        logger.error(f"[{operation}] All {max_retries} attempts failed: {exc}")
+        return "exhausted"
+    return None
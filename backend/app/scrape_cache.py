@@ -0,0 +1,154 @@
+"""
+Persistent cache of scraped job postings, keyed by canonical URL.
+
+Candidates often retry the CV flow with the same job link, and every scrape
+costs two Gemini calls. Results are kept in an embedded SQLite file (shared by
+all workers on a host) for SCRAPE_CACHE_TTL. Past that, entries younger than
+SCRAPE_CACHE_STALE_TTL are still served immediately while a background scrape
+refreshes them (stale-while-revalidate).
+"""
+import json
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .config import config
+from .storage import open_sqlite
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only track the visit and never change the posting
+_TRACKING_PARAMS = {
+    "fbclid",
+    "gclid",
+    "mc_cid",
+    "mc_eid",
+    "ref",
+    "refid",
+    "src",
+    "trackingid",
+    "trk",
+    "trkinfo",
+}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of a job URL, so trivially different links share an entry.
+
+    Lowercases scheme and host, drops default ports, the fragment, tracking
+    parameters (utm_*, gclid, trk...) and a trailing slash, and sorts the
+    remaining query parameters. A URL without a scheme is taken as https.
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url.lstrip('/')}"
+    parts = urlsplit(url)
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_")
+        and key.lower() not in _TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+class ScrapeCache:
+    """SQLite-backed scrape results with fresh and stale TTLs."""
+
+    def __init__(
+        self, path: str = None, ttl_seconds: float = None, stale_seconds: float = None
+    ):
+        self.path = path or config.SCRAPE_CACHE_PATH
+        self.ttl_seconds = ttl_seconds or config.SCRAPE_CACHE_TTL
+        self.stale_seconds = (
+            config.SCRAPE_CACHE_STALE_TTL if stale_seconds is None else stale_seconds
+        )
+        self._lock = threading.Lock()
+        self._db = open_sqlite(
+            self.path,
+            """
+            CREATE TABLE IF NOT EXISTS scrapes (
+                url TEXT PRIMARY KEY,
+                scraped_at REAL NOT NULL,
+                payload TEXT NOT NULL
+            )
+            """,
+        )
+
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        logger.info(f"✓ Scrape cache at {self.path}")
+
+    def get(self, url: str) -> Optional[Tuple[Dict, bool]]:
+        """
+        Look up a scraped posting.
+
+        Args:
+            url: Canonical job URL
+
+        Returns:
+            Tuple (data, is_fresh), or None if absent or too old to serve
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT scraped_at, payload FROM scrapes WHERE url = ?", (url,)
+            ).fetchone()
+
+        age = time.time() - row[0] if row else None
+        if row is None or age > self.ttl_seconds + self.stale_seconds:
+            self.misses += 1
+            return None
+
+        is_fresh = age <= self.ttl_seconds
+        if is_fresh:
+            self.fresh_hits += 1
+        else:
+            self.stale_hits += 1
+        return json.loads(row[1]), is_fresh
+
+    def put(self, url: str, data: Dict) -> None:
+        """Store a scraped posting under its canonical URL."""
+        now = time.time()
+        with self._lock, self._db:
+            # Entries past the stale window are dropped on write
+            self._db.execute(
+                "DELETE FROM scrapes WHERE scraped_at <= ?",
+                (now - self.ttl_seconds - self.stale_seconds,),
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO scrapes VALUES (?, ?, ?)",
+                (url, now, json.dumps(data, ensure_ascii=False)),
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM scrapes")
+
+    def stats(self) -> Dict[str, int]:
+        """Return fresh/stale hit and miss counters."""
+        return {
+            "fresh_hits": self.fresh_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+        }
+
+
+_scrape_cache: Optional[ScrapeCache] = None
+
+
+def get_scrape_cache() -> Optional[ScrapeCache]:
+    """Create the cache on first use (None when SCRAPE_CACHE_ENABLED is off)."""
+    global _scrape_cache
+    if _scrape_cache is None and config.SCRAPE_CACHE_ENABLED:
+        _scrape_cache = ScrapeCache()
+    return _scrape_cache
@@ -0,0 +1,205 @@
+"""
+Semantic answer cache for the PRESENTATION flow.
+
+First-turn questions whose embedding is close enough (cosine distance) to a
+previously answered question in the same language are served the stored
+answer without calling the chat model. Entries are tied to the FAISS index
+version they were answered against and dropped when the index changes.
+"""
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"[a-zàâäçéèêëîïôöùûüÿœæ']+")
+
+# Frequent function words, enough to tell French from English questions
+_FRENCH_WORDS = set(
+    "le la les un une des du de et est que qui quoi vous votre vos nous je "
+    "pour avec dans sur pas quel quelle quels quelles comment pourquoi "
+    "combien êtes faites proposez c'est qu'est".split()
+)
+_ENGLISH_WORDS = set(
+    "the a an and is are what who which you your we i for with in on not "
+    "how why do does can much many about of to".split()
+)
+
+
+def detect_language(text: str) -> str:
+    """
+    Cheap French/English detection from function words and accents.
+
+    Args:
+        text: User message
+
+    Returns:
+        "fr", "en", or "unknown"
+    """
+    words = _WORD_RE.findall(text.lower())
+    french = sum(1 for word in words if word in _FRENCH_WORDS)
+    english = sum(1 for word in words if word in _ENGLISH_WORDS)
+    if re.search(r"[àâçéèêëîïôùûüœ]", text.lower()):
+        french += 1
+
+    if french > english:
+        return "fr"
+    if english > french:
+        return "en"
+    return "unknown"
+
+
+class SemanticAnswerCache:
+    """Capacity- and TTL-bounded cache of answers keyed by question embedding."""
+
+    def __init__(
+        self,
+        max_entries: int = None,
+        ttl_seconds: float = None,
+        max_distance: float = None,
+    ):
+        self.max_entries = max_entries or config.SEMANTIC_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds or config.SEMANTIC_CACHE_TTL
+        self.max_distance = (
+            max_distance
+            if max_distance is not None
+            else config.SEMANTIC_CACHE_MAX_DISTANCE
+        )
+
+        # question -> (created_at, language, unit-norm embedding, answer)
+        self._entries: OrderedDict = OrderedDict()
+        self._index_version: Optional[str] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, index_version: Optional[str]) -> None:
+        """Drop all entries if they were answered against another index version."""
+        if index_version != self._index_version:
+            if self._entries:
+                logger.info("Index version changed - clearing semantic answer cache")
+                self.invalidations += 1
+            self._entries.clear()
+            self._index_version = index_version
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype="float32")
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(
+        self, embedding, language: str, index_version: Optional[str]
+    ) -> Optional[str]:
+        """
+        Find a cached answer for a semantically equivalent question.
+
+        Args:
+            embedding: Query embedding of the new question
+            language: Detected language of the new question
+            index_version: Version of the currently loaded FAISS index
+
+        Returns:
+            The cached answer, or None on miss
+        """
+        query = self._normalize(embedding)
+        now = time.time()
+
+        with self._lock:
+            self._check_version(index_version)
+
+            expired = [
+                key
+                for key, (created_at, _, _, _) in self._entries.items()
+                if now - created_at > self.ttl_seconds
+            ]
+            for key in expired:
+                del self._entries[key]
+
+            best_key, best_distance = None, None
+            for key, (_, entry_language, vector, _) in self._entries.items():
+                if entry_language != language or vector.shape != query.shape:
+                    continue
+                distance = 1.0 - float(np.dot(vector, query))
+                if best_distance is None or distance < best_distance:
+                    best_key, best_distance = key, distance
+
+            if best_key is not None and best_distance <= self.max_distance:
+                self._entries.move_to_end(best_key)
+                self.hits += 1
+                logger.info(
+                    f"Semantic cache hit (distance {best_distance:.3f}) for '{best_key[:50]}'"
+                )
+                return self._entries[best_key][3]
+
+            self.misses += 1
+            return None
+
+    def store(
+        self,
+        question: str,
+        embedding,
+        language: str,
+        answer: str,
+        index_version: Optional[str],
+    ) -> None:
+        """
+        Cache the answer to a first-turn question.
+
+        Args:
+            question: The user's question
+            embedding: Query embedding of the question
+            language: Detected language of the question
+            answer: The model's answer
+            index_version: Version of the FAISS index used for the answer
+        """
+        if not answer:
+            return
+
+        with self._lock:
+            self._check_version(index_version)
+            self._entries[question] = (
+                time.time(),
+                language,
+                self._normalize(embedding),
+                answer,
+            )
+            self._entries.move_to_end(question)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached answer."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+        logger.info("✓ Cleared semantic answer cache")
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Global semantic answer cache instance
+answer_cache = SemanticAnswerCache()
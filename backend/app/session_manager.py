@@ -0,0 +1,238 @@
+"""
+Bounded in-memory store for Gemini chat sessions.
+
+Sessions are evicted least-recently-used past a maximum count or a total
+history-size budget, expire after an idle TTL, and have their history trimmed
+to the oldest turns' expense when it grows past a per-session byte cap.
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+
+def history_size(history: List) -> int:
+    """Approximate size in bytes of a chat history (text parts only)."""
+    size = 0
+    for content in history:
+        for part in content.parts or []:
+            if getattr(part, "text", None):
+                size += len(part.text.encode("utf-8"))
+    return size
+
+
+class _SessionEntry:
+    """A live chat session and its bookkeeping."""
+
+    __slots__ = (
+        "chat",
+        "system_instruction",
+        "last_access",
+        "history_bytes",
+        "persisted_count",
+    )
+
+    def __init__(self, chat, system_instruction: Optional[str], persisted_count: int):
+        self.chat = chat
+        self.system_instruction = system_instruction
+        self.last_access = time.monotonic()
+        self.history_bytes = 0
+        # Messages of this session known to be in the persistent store
+        self.persisted_count = persisted_count
+
+
+class ChatSessionManager:
+    """LRU + idle-TTL store of chat sessions with a memory budget."""
+
+    def __init__(
+        self,
+        chat_factory: Callable,
+        max_sessions: int = None,
+        idle_ttl: float = None,
+        max_history_bytes: int = None,
+        max_total_bytes: int = None,
+    ):
+        """
+        Args:
+            chat_factory: Callable (system_instruction, history) -> chat object,
+                used to rebuild a chat when its history is trimmed
+            max_sessions: Maximum live sessions (defaults to config value)
+            idle_ttl: Seconds of inactivity before expiry (defaults to config value)
+            max_history_bytes: Per-session history cap (defaults to config value)
+            max_total_bytes: History budget across sessions (defaults to config value)
+        """
+        self.chat_factory = chat_factory
+        self.max_sessions = max_sessions or config.SESSION_MAX_COUNT
+        self.idle_ttl = idle_ttl or config.SESSION_IDLE_TTL
+        self.max_history_bytes = max_history_bytes or config.SESSION_MAX_HISTORY_BYTES
+        self.max_total_bytes = max_total_bytes or config.SESSION_MAX_TOTAL_BYTES
+
+        self._sessions: "OrderedDict[str, _SessionEntry]" = OrderedDict()
+        self._total_bytes = 0
+
+        self.evictions = 0
+        self.expirations = 0
+        self.trims = 0
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str):
+        """
+        Get a live chat session, refreshing its LRU position.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Chat object, or None if unknown or expired
+        """
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+
+        if time.monotonic() - entry.last_access > self.idle_ttl:
+            self._drop(session_id)
+            self.expirations += 1
+            return None
+
+        entry.last_access = time.monotonic()
+        self._sessions.move_to_end(session_id)
+        return entry.chat
+
+    def put(
+        self,
+        session_id: str,
+        chat,
+        system_instruction: Optional[str] = None,
+        persisted_count: int = 0,
+    ):
+        """
+        Register a new chat session, evicting old ones if over capacity.
+
+        Args:
+            session_id: Session identifier
+            chat: SDK chat object
+            system_instruction: System instruction the chat was created with
+            persisted_count: Messages already in the persistent store
+        """
+        if session_id in self._sessions:
+            self._drop(session_id)
+
+        self._sessions[session_id] = _SessionEntry(
+            chat, system_instruction, persisted_count
+        )
+        self._enforce_limits()
+
+    def persisted_count(self, session_id: str) -> Optional[int]:
+        """Return how many messages of a live session are known to be persisted."""
+        entry = self._sessions.get(session_id)
+        return entry.persisted_count if entry else None
+
+    def mark_persisted(self, session_id: str, count: int) -> None:
+        """Record the persisted message count of a live session."""
+        entry = self._sessions.get(session_id)
+        if entry is not None:
+            entry.persisted_count = count
+
+    def record_turn(self, session_id: str) -> None:
+        """
+        Update a session's history size after a turn and enforce memory caps.
+
+        Args:
+            session_id: Session identifier
+        """
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return
+
+        history = entry.chat.get_history()
+        size = history_size(history)
+
+        if size > self.max_history_bytes:
+            history = self._trim(history)
+            entry.chat = self.chat_factory(entry.system_instruction, history)
+            size = history_size(history)
+            self.trims += 1
+            logger.info(f"Trimmed history of session {session_id} to {size} bytes")
+
+        self._total_bytes += size - entry.history_bytes
+        entry.history_bytes = size
+        self._enforce_limits()
+
+    def _trim(self, history: List) -> List:
+        """Drop the oldest user/model turns until the history fits the cap."""
+        history = list(history)
+        while len(history) > 2 and history_size(history) > self.max_history_bytes:
+            # Drop the oldest turn: a user message and the replies that follow
+            history.pop(0)
+            while history and history[0].role != "user":
+                history.pop(0)
+        return history
+
+    def remove(self, session_id: str) -> bool:
+        """
+        Remove a session.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            True if the session existed, False otherwise
+        """
+        if session_id not in self._sessions:
+            return False
+        self._drop(session_id)
+        return True
+
+    def _drop(self, session_id: str) -> None:
+        entry = self._sessions.pop(session_id)
+        self._total_bytes -= entry.history_bytes
+
+    def _enforce_limits(self) -> None:
+        """Evict least recently used sessions past the count or memory budget."""
+        while len(self._sessions) > self.max_sessions or (
+            self._total_bytes > self.max_total_bytes and len(self._sessions) > 1
+        ):
+            session_id = next(iter(self._sessions))
+            self._drop(session_id)
+            self.evictions += 1
+            logger.info(f"Evicted chat session: {session_id}")
+
+    def sweep(self) -> int:
+        """
+        Remove every session idle for longer than the TTL.
+
+        Returns:
+            Number of sessions removed
+        """
+        now = time.monotonic()
+        expired = [
+            session_id
+            for session_id, entry in self._sessions.items()
+            if now - entry.last_access > self.idle_ttl
+        ]
+        for session_id in expired:
+            self._drop(session_id)
+        self.expirations += len(expired)
+        if expired:
+            logger.info(f"Expired {len(expired)} idle chat sessions")
+        return len(expired)
+
+    def stats(self) -> Dict[str, int]:
+        """Return live session count, eviction counters and bytes held."""
+        return {
+            "live_sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "trims": self.trims,
+            "history_bytes": self._total_bytes,
+        }
@@ -0,0 +1,192 @@
+"""
+Persistent chat history stores.
+
+Chat history is written append-only per session_id so any worker process can
+rehydrate a conversation. SQLite is the local default; other backends (e.g.
+DynamoDB) only need to implement the `SessionStore` interface.
+"""
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from .config import config
+from .storage import open_sqlite
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore(ABC):
+    """Interface for persistent, append-only chat history storage."""
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[Dict]:
+        """
+        Load a session.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            {"system_instruction": str | None, "messages": [{"role", "text"}]},
+            or None if the session is unknown
+        """
+
+    @abstractmethod
+    def count(self, session_id: str) -> int:
+        """Return the number of stored messages for a session (0 if unknown)."""
+
+    @abstractmethod
+    def append(
+        self,
+        session_id: str,
+        messages: List[Dict[str, str]],
+        system_instruction: Optional[str] = None,
+    ) -> int:
+        """
+        Append messages to a session, creating it if needed.
+
+        Args:
+            session_id: Session identifier
+            messages: Messages to append, as {"role": ..., "text": ...}
+            system_instruction: System instruction (stored on creation only)
+
+        Returns:
+            Number of stored messages after the append
+        """
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """Delete a session. Returns True if it existed."""
+
+    @abstractmethod
+    def purge(self, max_idle_seconds: float) -> int:
+        """Delete sessions idle for longer than max_idle_seconds. Returns the count."""
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite-backed store, shareable by all worker processes on one host."""
+
+    def __init__(self, path: str = None):
+        self.path = path or config.SESSION_STORE_PATH
+        self._lock = threading.Lock()
+        self._db = open_sqlite(
+            self.path,
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                system_instruction TEXT,
+                message_count INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS messages (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            );
+            """,
+        )
+        logger.info(f"✓ SQLite session store at {self.path}")
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT system_instruction FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            messages = self._db.execute(
+                "SELECT role, text FROM messages WHERE session_id = ? ORDER BY seq",
+                (session_id,),
+            ).fetchall()
+        return {
+            "system_instruction": row[0],
+            "messages": [{"role": role, "text": text} for role, text in messages],
+        }
+
+    def count(self, session_id: str) -> int:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT message_count FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def append(
+        self,
+        session_id: str,
+        messages: List[Dict[str, str]],
+        system_instruction: Optional[str] = None,
+    ) -> int:
+        with self._lock, self._db:
+            # BEGIN IMMEDIATE serializes concurrent appends from other workers
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.execute(
+                "INSERT OR IGNORE INTO sessions "
+                "(session_id, system_instruction, message_count, updated_at) "
+                "VALUES (?, ?, 0, ?)",
+                (session_id, system_instruction, time.time()),
+            )
+            start = self._db.execute(
+                "SELECT message_count FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()[0]
+            self._db.executemany(
+                "INSERT INTO messages (session_id, seq, role, text) VALUES (?, ?, ?, ?)",
+                [
+                    (session_id, start + i, message["role"], message["text"])
+                    for i, message in enumerate(messages)
+                ],
+            )
+            total = start + len(messages)
+            self._db.execute(
+                "UPDATE sessions SET message_count = ?, updated_at = ? "
+                "WHERE session_id = ?",
+                (total, time.time(), session_id),
+            )
+        return total
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            cursor = self._db.execute(
+                "DELETE FROM sessions WHERE session_id = ?", (session_id,)
+            )
+        return cursor.rowcount > 0
+
+    def purge(self, max_idle_seconds: float) -> int:
+        cutoff = time.time() - max_idle_seconds
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM messages WHERE session_id IN "
+                "(SELECT session_id FROM sessions WHERE updated_at < ?)",
+                (cutoff,),
+            )
+            cursor = self._db.execute(
+                "DELETE FROM sessions WHERE updated_at < ?", (cutoff,)
+            )
+        return cursor.rowcount
+
+
+def create_session_store() -> Optional[SessionStore]:
+    """
+    Build the session store selected by config.SESSION_STORE_BACKEND.
+
+    Returns:
+        A SessionStore, or None for "memory" (history lives in this process only)
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    backend = config.SESSION_STORE_BACKEND.lower()
+
+    if backend == "memory":
+        return None
+    if backend == "sqlite":
+        return SQLiteSessionStore()
+
+    raise ValueError(f"Unknown session store backend: {config.SESSION_STORE_BACKEND}")
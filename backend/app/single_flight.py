@@ -0,0 +1,103 @@
+"""
+Single-flight coalescing of identical in-flight async calls.
+
+The first caller for a key starts the call; callers arriving with the same
+key while it runs await the same task instead of issuing their own upstream
+request. The key is forgotten as soon as the call finishes, so this never
+serves stale results (caching is left to the dedicated caches).
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import re
+from typing import Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prompt(text: str) -> str:
+    """Collapse whitespace (case is kept: prompts and URLs are case sensitive)."""
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def _key_part(value):
+    # Pydantic response schemas are keyed on their JSON schema
+    if hasattr(value, "model_json_schema"):
+        return value.model_json_schema()
+    if isinstance(value, str):
+        return normalize_prompt(value)
+    if isinstance(value, (list, tuple)):
+        return [_key_part(item) for item in value]
+    return value
+
+
+def request_key(operation: str, *parts) -> str:
+    """
+    Build a single-flight key from an operation name and request fields.
+
+    Args:
+        operation: Logical operation (e.g. "structured_output")
+        *parts: Model, prompt, schema, task type... (JSON-serializable or
+            pydantic model classes)
+
+    Returns:
+        Hex digest identifying the normalized request
+    """
+    raw = json.dumps(
+        [operation, *(_key_part(part) for part in parts)],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent identical requests."""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, func: Callable[[], Awaitable]):
+        """
+        Run `func()` for `key`, or join the call already running for it.
+
+        A caller that is cancelled does not cancel the shared call for the
+        others. Followers get a deep copy of the result, so callers can
+        mutate what they receive.
+
+        Args:
+            key: Request key (see `request_key`)
+            func: Zero-argument coroutine function performing the call
+
+        Raises:
+            Exception: Whatever the shared call raised
+        """
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.info("Joined identical in-flight request")
+            return copy.deepcopy(await asyncio.shield(task))
+
+        task = asyncio.ensure_future(func())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._forget(key, task))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Return call and coalesced-call counts and current in-flight keys."""
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
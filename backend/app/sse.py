@@ -0,0 +1,31 @@
+"""
+Helpers for Server-Sent Events (SSE) responses.
+"""
+import json
+from typing import AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+# Disable proxy buffering so events reach the browser as soon as they are sent
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def format_sse(event: str, data: dict) -> str:
+    """
+    Format one SSE frame.
+
+    Args:
+        event: Event name (e.g. "chunk", "done", "error")
+        data: JSON-serializable payload
+
+    Returns:
+        The frame as a string, terminated by a blank line
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Wrap an async iterator of formatted SSE frames in a streaming response."""
+    return StreamingResponse(
+        events, media_type="text/event-stream", headers=SSE_HEADERS
+    )
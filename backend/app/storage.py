@@ -1,27 +1,199 @@
 """
-In-memory storage for generated resumes.
+Storage for generated resumes.
 
-This module manages the in-memory storage of resume data.
-In production, this should be replaced with a database (e.g., DynamoDB).
+Resumes are kept in a pluggable backend. The default is an embedded SQLite
+file (shared by all workers on a host) holding zlib-compressed JSON payloads
+that expire after a TTL, so memory stays flat however many resumes are
+generated. A DynamoDB backend only needs to implement `ResumeStore`.
+
+The module-level helpers block (disk I/O, compression); async callers run them
+with `asyncio.to_thread`.
 """
-from typing import Dict, Optional
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+import json
 import logging
+import sqlite3
+import threading
+import time
+import zlib
+
+from .config import config
 
 logger = logging.getLogger(__name__)
 
-# In-memory storage: {resume_id: resume_data_dict}
-_resume_storage: Dict[str, dict] = {}
+
+def open_sqlite(path: str, schema: str) -> sqlite3.Connection:
+    """
+    Open an SQLite file shared by the worker processes of one host.
+
+    The connection is used from worker threads (callers serialize access with
+    their own lock), so it is not tied to the creating thread.
+
+    Args:
+        path: Database file, created if missing
+        schema: Idempotent DDL script (CREATE ... IF NOT EXISTS)
+
+    Returns:
+        Open connection with the schema applied
+    """
+    db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+    # WAL lets readers in other workers proceed while one worker writes
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(schema)
+    db.commit()
+    return db
+
+
+class ResumeStore(ABC):
+    """Interface for resume storage backends."""
+
+    @abstractmethod
+    def put(self, resume_id: str, resume_data: dict) -> None:
+        """Store a resume, replacing any previous one with the same ID."""
+
+    @abstractmethod
+    def get(self, resume_id: str) -> Optional[dict]:
+        """Return a resume, or None if unknown or expired."""
+
+    @abstractmethod
+    def exists(self, resume_id: str) -> bool:
+        """Check whether an unexpired resume is stored."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Delete all resumes."""
+
+
+class MemoryResumeStore(ResumeStore):
+    """In-process store with TTL (single worker, lost on restart)."""
+
+    def __init__(self, ttl_seconds: float = None):
+        self.ttl_seconds = ttl_seconds or config.RESUME_TTL
+        # {resume_id: (expires_at, resume_data_dict)}, oldest first: with one
+        # TTL for all entries, insertion order is expiry order
+        self._resumes: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def put(self, resume_id: str, resume_data: dict) -> None:
+        now = time.time()
+        while self._resumes:
+            oldest_id, (expires_at, _) = next(iter(self._resumes.items()))
+            if expires_at > now:
+                break
+            del self._resumes[oldest_id]
+        self._resumes[resume_id] = (now + self.ttl_seconds, resume_data)
+        self._resumes.move_to_end(resume_id)
+
+    def get(self, resume_id: str) -> Optional[dict]:
+        entry = self._resumes.get(resume_id)
+        if entry is None or entry[0] <= time.time():
+            return None
+        return entry[1]
+
+    def exists(self, resume_id: str) -> bool:
+        return self.get(resume_id) is not None
+
+    def clear(self) -> None:
+        self._resumes.clear()
+
+
+class SQLiteResumeStore(ResumeStore):
+    """On-disk store of zlib-compressed resume JSON with TTL expiry."""
+
+    def __init__(self, path: str = None, ttl_seconds: float = None):
+        self.path = path or config.RESUME_STORE_PATH
+        self.ttl_seconds = ttl_seconds or config.RESUME_TTL
+        self._lock = threading.Lock()
+        self._db = open_sqlite(
+            self.path,
+            """
+            CREATE TABLE IF NOT EXISTS resumes (
+                resume_id TEXT PRIMARY KEY,
+                expires_at REAL NOT NULL,
+                payload BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS resumes_expires_at ON resumes (expires_at);
+            """,
+        )
+        logger.info(f"✓ SQLite resume store at {self.path}")
+
+    def put(self, resume_id: str, resume_data: dict) -> None:
+        payload = zlib.compress(
+            json.dumps(resume_data, ensure_ascii=False).encode("utf-8")
+        )
+        now = time.time()
+        with self._lock, self._db:
+            # Expired rows are dropped on write, keeping the file bounded
+            self._db.execute("DELETE FROM resumes WHERE expires_at <= ?", (now,))
+            self._db.execute(
+                "INSERT OR REPLACE INTO resumes VALUES (?, ?, ?)",
+                (resume_id, now + self.ttl_seconds, payload),
+            )
+
+    def get(self, resume_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload FROM resumes WHERE resume_id = ? AND expires_at > ?",
+                (resume_id, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+
+    def exists(self, resume_id: str) -> bool:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM resumes WHERE resume_id = ? AND expires_at > ?",
+                (resume_id, time.time()),
+            ).fetchone()
+        return row is not None
+
+    def clear(self) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM resumes")
+
+
+def create_resume_store() -> ResumeStore:
+    """
+    Build the resume store selected by config.RESUME_STORE_BACKEND.
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    backend = config.RESUME_STORE_BACKEND.lower()
+
+    if backend == "memory":
+        return MemoryResumeStore()
+    if backend == "sqlite":
+        return SQLiteResumeStore()
+
+    raise ValueError(f"Unknown resume store backend: {config.RESUME_STORE_BACKEND}")
+
+
+_resume_store: Optional[ResumeStore] = None
+_resume_store_lock = threading.Lock()
+
+
+def _get_store() -> ResumeStore:
+    """Create the configured store on first use (from any thread)."""
+    global _resume_store
+    with _resume_store_lock:
+        if _resume_store is None:
+            _resume_store = create_resume_store()
+    return _resume_store
 
 
 def store_resume(resume_id: str, resume_data: dict) -> None:
     """
-    Store resume data in memory.
+    Store resume data.
 
     Args:
         resume_id: Unique identifier for the resume
         resume_data: Resume data as dictionary
     """
-    _resume_storage[resume_id] = resume_data
+    _get_store().put(resume_id, resume_data)
     logger.info(f"✓ Stored resume: {resume_id}")
 
 
@@ -33,9 +205,9 @@ def get_resume(resume_id: str) -> Optional[dict]:
         resume_id: Unique identifier for the resume
 
     Returns:
-        Resume data dictionary, or None if not found
+        Resume data dictionary, or None if not found or expired
     """
-    return _resume_storage.get(resume_id)
+    return _get_store().get(resume_id)
 
 
 def resume_exists(resume_id: str) -> bool:
@@ -48,10 +220,10 @@ def resume_exists(resume_id: str) -> bool:
     Returns:
         True if resume exists, False otherwise
     """
-    return resume_id in _resume_storage
+    return _get_store().exists(resume_id)
 
 
 def clear_storage() -> None:
     """Clear all stored resumes (useful for testing)."""
-    _resume_storage.clear()
+    _get_store().clear()
     logger.info("✓ Cleared resume storage")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark: recall vs latency of the ANN index types against the flat baseline.
+
+Builds every index type (see app/ann_index.py) over the published index's
+vectors or a synthetic corpus, sweeps the query-time knobs (nprobe for IVF,
+efSearch for HNSW) and reports recall@k against exact flat search together
+with single-query latency, as served on the request path. Each quantized
+vector storage (fp16, SQ8, PQ) is then measured with and without exact
+re-scoring, with its serialized index size.
+
+Usage (from backend/):
+    python benchmarks/ann_recall.py                       # published index
+    python benchmarks/ann_recall.py --synthetic 200000    # synthetic corpus
+"""
+import argparse
+import os
+import sys
+import time
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ann_index import RescoringIndex, build_index, configure_search  # noqa: E402
+from app.chunk_store import ChunkStore  # noqa: E402
+from app.config import config  # noqa: E402
+from app.rag_service import CHUNK_STORE_DIR, read_current_version  # noqa: E402
+
+NPROBE_SWEEP = (1, 4, 16, 64)
+EF_SEARCH_SWEEP = (16, 32, 64, 128)
+
+
+def load_vectors(args):
+    """Return (vectors, ids) from the published version or a synthetic corpus."""
+    if args.synthetic:
+        print(f"Synthetic corpus: {args.synthetic} vectors of dimension {args.dimension}")
+        rng = np.random.default_rng(0)
+        # Clustered data, closer to real embeddings than uniform noise
+        centers = rng.standard_normal((max(args.synthetic // 100, 1), args.dimension))
+        vectors = centers[rng.integers(0, len(centers), args.synthetic)]
+        vectors = vectors + 0.3 * rng.standard_normal(vectors.shape)
+        vectors = vectors.astype("float32")
+        faiss.normalize_L2(vectors)
+        return vectors, np.arange(args.synthetic, dtype="int64")
+
+    version = read_current_version(config.RAG_INDEX_DIR)
+    if version is None:
+        sys.exit(f"No published index in {config.RAG_INDEX_DIR} - run ingest.py first")
+    store = ChunkStore(os.path.join(config.RAG_INDEX_DIR, version, CHUNK_STORE_DIR))
+    if store.vectors is None:
+        sys.exit(f"Index version {version} has no stored vectors")
+    print(f"Index version {version}: {len(store)} vectors")
+    return np.array(store.vectors), np.array(store.ids)
+
+
+def make_queries(vectors, count, seed=1):
+    """Perturbed corpus vectors, so queries have near (not exact) neighbours."""
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.integers(0, len(vectors), count)]
+    queries = queries + 0.1 * rng.standard_normal(queries.shape).astype("float32")
+    queries = queries.astype("float32")
+    faiss.normalize_L2(queries)
+    return queries
+
+
+def measure(index, queries, truth, k):
+    """Return (recall@k, p50 ms, p95 ms) of one query at a time."""
+    latencies = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        _, found = index.search(query[None, :], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(set(found[0]) & set(expected))
+    recall = hits / (len(queries) * k)
+    return recall, np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+
+def index_megabytes(index):
+    """Serialized size of a FAISS index in MB."""
+    return len(faiss.serialize_index(index)) / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--synthetic", type=int, default=0, help="vector count")
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=config.RAG_TOP_K)
+    args = parser.parse_args()
+
+    vectors, ids = load_vectors(args)
+    queries = make_queries(vectors, args.queries)
+    k = min(args.k, len(vectors))
+
+    rows = []
+    flat = build_index(vectors, ids, "flat")
+    _, truth = flat.search(queries, k)
+    rows.append(
+        ("flat", "float32", "-", *measure(flat, queries, truth, k), index_megabytes(flat))
+    )
+
+    for index_type, knob, sweep in (
+        ("hnsw", "efSearch", EF_SEARCH_SWEEP),
+        ("ivf", "nprobe", NPROBE_SWEEP),
+    ):
+        index = build_index(vectors, ids, index_type)
+        size = index_megabytes(index)
+        for value in sweep:
+            if knob == "nprobe":
+                configure_search(index, nprobe=value)
+            else:
+                configure_search(index, ef_search=value)
+            rows.append(
+                (
+                    index_type,
+                    "float32",
+                    f"{knob}={value}",
+                    *measure(index, queries, truth, k),
+                    size,
+                )
+            )
+
+    # Quantized storage at the configured knobs, raw and exactly re-scored
+    positions = {int(chunk_id): row for row, chunk_id in enumerate(ids)}
+    for storage in ("fp16", "sq8", "pq"):
+        for index_type in ("flat", "hnsw", "ivf"):
+            if storage == "pq" and (
+                index_type == "hnsw" or len(vectors) < config.RAG_PQ_MIN_TRAIN
+            ):
+                continue
+            index = build_index(vectors, ids, index_type, storage)
+            size = index_megabytes(index)
+            rescored = RescoringIndex(index, vectors, positions.get)
+            rows.append((index_type, storage, "-", *measure(index, queries, truth, k), size))
+            rows.append(
+                (
+                    index_type,
+                    storage,
+                    f"rescore x{rescored.factor}",
+                    *measure(rescored, queries, truth, k),
+                    size,
+                )
+            )
+
+    print(f"\nrecall@{k} over {len(queries)} queries (baseline: exact flat search)")
+    print(
+        f"{'index':<6} {'storage':<8} {'params':<14} {'recall':>7} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'size MB':>8}"
+    )
+    for index_type, storage, params, recall, p50, p95, size in rows:
+        print(
+            f"{index_type:<6} {storage:<8} {params:<14} {recall:>7.3f} "
+            f"{p50:>8.3f} {p95:>8.3f} {size:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory held per uvicorn-like worker for the RAG index.
+
+Starts N worker processes that each load the RAG index and chunk store, once
+with a private in-memory copy (RAG_INDEX_MMAP off) and once with the shared
+mmap mode, then reports RSS and PSS per worker. PSS splits shared pages
+between the processes mapping them, so it shows the real per-worker cost.
+
+Usage (from backend/):
+    python benchmarks/index_memory.py                       # current index
+    python benchmarks/index_memory.py --synthetic 200000    # synthetic index
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.chunk_store import write_chunk_store  # noqa: E402
+from app.rag_service import (  # noqa: E402
+    CHUNK_STORE_DIR,
+    INDEX_FILE,
+    publish_index_version,
+)
+
+
+def read_memory_kb():
+    """Return (rss_kb, pss_kb) of the current process (Linux only)."""
+    values = {}
+    with open("/proc/self/smaps_rollup", "r") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                values[parts[0]] = int(parts[1])
+    return values.get("Rss:", 0), values.get("Pss:", 0)
+
+
+def build_synthetic_index(directory, count, dimension):
+    """Publish a random normalized index version of `count` vectors."""
+    print(f"Building synthetic index: {count} vectors of dimension {dimension}...")
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((count, dimension), dtype="float32")
+    faiss.normalize_L2(vectors)
+    ids = np.arange(count, dtype="int64")
+
+    index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+    index.add_with_ids(vectors, ids)
+    version_path = os.path.join(directory, "synthetic")
+    os.makedirs(version_path)
+    faiss.write_index(index, os.path.join(version_path, INDEX_FILE))
+
+    chunks = [f"synthetic chunk {i}" for i in range(count)]
+    metadata = [
+        {"filename": "synthetic.md", "chunk_id": i, "source": "synthetic.md"}
+        for i in range(count)
+    ]
+    write_chunk_store(
+        os.path.join(version_path, CHUNK_STORE_DIR),
+        chunks,
+        metadata,
+        ids.tolist(),
+        vectors,
+    )
+    publish_index_version(directory, "synthetic")
+
+
+def worker(mmap_mode, index_dir, barrier, results):
+    """Load the index like a worker would and report memory before/after."""
+    from app.config import config
+
+    config.RAG_INDEX_MMAP = mmap_mode
+    from app.rag_service import RAGService
+
+    rss_before, _ = read_memory_kb()
+
+    rag = RAGService(index_dir=index_dir)
+    if not rag.initialize():
+        results.put(None)
+        barrier.wait()
+        barrier.wait()
+        return
+
+    # One query touches every vector, like steady-state traffic would
+    query = np.random.default_rng().standard_normal((1, rag.index.d), dtype="float32")
+    faiss.normalize_L2(query)
+    rag.index.search(query, 10)
+
+    # Measure once every worker is loaded so shared pages are split fairly
+    barrier.wait()
+    rss_after, pss_after = read_memory_kb()
+    results.put((os.getpid(), rss_before, rss_after, pss_after))
+    barrier.wait()
+
+
+def run(mmap_mode, workers, index_dir):
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(
+            target=worker,
+            args=(mmap_mode, index_dir, barrier, results),
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    rows = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--synthetic", type=int, default=0, help="vector count")
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--index-dir", default="index_versions")
+    args = parser.parse_args()
+
+    index_dir = args.index_dir
+    tmp_dir = None
+    if args.synthetic:
+        tmp_dir = tempfile.TemporaryDirectory()
+        index_dir = tmp_dir.name
+        build_synthetic_index(index_dir, args.synthetic, args.dimension)
+
+    print(f"\n{'mode':<10} {'pid':>8} {'RSS before':>12} {'RSS after':>12} {'PSS after':>12}")
+    for label, mmap_mode in (("in-memory", False), ("mmap", True)):
+        rows = run(mmap_mode, args.workers, index_dir)
+        if any(row is None for row in rows):
+            print(f"{label:<10} failed to load index")
+            continue
+        for pid, rss_before, rss_after, pss_after in rows:
+            print(
+                f"{label:<10} {pid:>8} {rss_before / 1024:>10.1f}MB "
+                f"{rss_after / 1024:>10.1f}MB {pss_after / 1024:>10.1f}MB"
+            )
+        total_pss = sum(row[3] for row in rows) / 1024
+        print(f"{label:<10} {'total':>8} {'':>12} {'':>12} {total_pss:>10.1f}MB\n")
+
+    if tmp_dir:
+        tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Tests for approximate nearest neighbour indexes and exact re-scoring."""
+import faiss
+import numpy as np
+import pytest
+
+from app import ann_index
+from app.ann_index import (
+    RescoringIndex,
+    build_index,
+    index_type_of,
+    select_index_type,
+)
+
+DIMENSION = 16
+
+
+def normalized(rows, seed):
+    vectors = np.random.default_rng(seed).normal(size=(rows, DIMENSION))
+    vectors = vectors.astype("float32")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf"])
+def test_built_index_is_searchable_through_mmap(index_type, tmp_path):
+    vectors = normalized(500, seed=1)
+    ids = np.arange(1000, 1500, dtype="int64")
+    path = str(tmp_path / "index.faiss")
+    faiss.write_index(build_index(vectors, ids, index_type), path)
+
+    index = faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    ann_index.configure_search(index)
+    _, found = index.search(vectors[:20], 5)
+
+    assert index_type_of(index) == index_type
+    assert index.ntotal == 500
+    # Every stored vector is its own nearest neighbour, returned by chunk id
+    assert found[:, 0].tolist() == ids[:20].tolist()
+
+
+def test_hnsw_rejects_pq_storage():
+    with pytest.raises(ValueError, match="PQ storage is not supported with HNSW"):
+        build_index(normalized(300, seed=2), np.arange(300), "hnsw", "pq")
+
+
+def test_unknown_index_type_is_rejected():
+    with pytest.raises(ValueError, match="Unknown RAG index type"):
+        build_index(normalized(10, seed=3), np.arange(10), "lsh")
+
+
+def test_auto_index_type_follows_corpus_size(monkeypatch):
+    monkeypatch.setattr(ann_index.config, "RAG_INDEX_AUTO_HNSW_MIN", 100)
+    monkeypatch.setattr(ann_index.config, "RAG_INDEX_AUTO_IVF_MIN", 1000)
+
+    assert select_index_type(99, "auto") == "flat"
+    assert select_index_type(100, "auto") == "hnsw"
+    assert select_index_type(100, "auto", storage="pq") == "ivf"
+    assert select_index_type(1000, "auto") == "ivf"
+
+
+@pytest.mark.parametrize("storage", ["fp16", "sq8", "pq"])
+def test_rescoring_ranks_candidates_by_exact_scores(storage):
+    vectors = normalized(1000, seed=4)
+    ids = np.arange(5000, 6000, dtype="int64")
+    quantized = build_index(vectors, ids, "flat", storage)
+    queries = normalized(10, seed=5)
+
+    # Enough candidates to cover the corpus: rescoring must be exact
+    index = RescoringIndex(quantized, vectors, lambda i: i - 5000, factor=100)
+    scores, found = index.search(queries, 10)
+
+    exact = faiss.IndexIDMap(faiss.IndexFlatIP(DIMENSION))
+    exact.add_with_ids(vectors, ids)
+    expected_scores, expected_ids = exact.search(queries, 10)
+    np.testing.assert_array_equal(found, expected_ids)
+    np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+
+
+def test_rescoring_reorders_quantized_candidates():
+    vectors = normalized(1000, seed=6)
+    ids = np.arange(1000, dtype="int64")
+    quantized = build_index(vectors, ids, "flat", "pq")
+    queries = normalized(10, seed=7)
+
+    _, candidates = quantized.search(queries, 20)
+    scores, found = RescoringIndex(quantized, vectors, int, factor=4).search(
+        queries, 5
+    )
+
+    for query, row_candidates, row_scores, row_ids in zip(
+        queries, candidates, scores, found
+    ):
+        exact = vectors[row_candidates] @ query
+        best = row_candidates[np.argsort(-exact)[:5]]
+        assert row_ids.tolist() == best.tolist()
+        np.testing.assert_allclose(row_scores, vectors[row_ids] @ query, rtol=1e-5)
+
+
+def test_rescoring_skips_unknown_ids():
+    vectors = normalized(50, seed=8)
+    quantized = build_index(vectors, np.arange(50), "flat", "sq8")
+    # Only even ids are still in the chunk store
+    index = RescoringIndex(
+        quantized, vectors, lambda i: i if i % 2 == 0 else None, factor=2
+    )
+
+    _, found = index.search(vectors[:3], 5)
+
+    assert all(i % 2 == 0 for i in found.ravel() if i >= 0)
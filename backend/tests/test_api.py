@@ -0,0 +1,219 @@
+"""Contract tests for the API endpoints (no Gemini or index needed)."""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.cv_jobs import MemoryCVJobStore
+
+FORM = {
+    "company_name": "Acme",
+    "job_title": "Data Engineer",
+    "job_description": "Pipelines et API",
+}
+RESULT = {
+    "response": "Voici votre CV",
+    "session_id": "s1",
+    "flow_id": "DYNAMIC_CV",
+    "next_action": "RENDER_ANALYSIS",
+    "widget_data": {"resume_id": "r1"},
+}
+
+
+async def generate(form_data, progress):
+    progress("retrieval_done", {"chunks": 3})
+    progress("generation_done", {})
+    progress("stored", {"resume_id": "r1"})
+    return RESULT
+
+
+async def idle():
+    return None
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """App with fake services: RAG ready, Gemini available, no startup work."""
+    monkeypatch.setattr(main, "prepare_rag", idle)
+    monkeypatch.setattr(main.gemini_service, "run_session_sweeper", idle)
+    monkeypatch.setattr(main.gemini_service, "is_available", lambda: True)
+    monkeypatch.setattr(main.rag_service, "is_available", lambda: True)
+    monkeypatch.setattr(main.cv_job_queue, "handler", generate)
+    monkeypatch.setattr(main.cv_job_queue, "store", MemoryCVJobStore())
+    monkeypatch.setattr(main, "get_scrape_cache", lambda: None)
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def chat(client, **payload):
+    body = {"message": "", "session_id": "s1", "flow_id": "DYNAMIC_CV"}
+    return client.post("/chat", json={**body, **payload})
+
+
+def test_health(client):
+    response = client.get("/health")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ok"
+    assert {"rag_status", "cv_jobs", "gemini_retries"} <= body.keys()
+
+
+def test_dynamic_cv_waits_for_the_job(client):
+    response = chat(client, form_data=FORM)
+
+    assert response.status_code == 200
+    assert response.json() == RESULT
+
+
+def test_dynamic_cv_async_job(client):
+    response = chat(client, form_data=FORM, async_job=True)
+
+    assert response.status_code == 202
+    body = response.json()
+    assert body["next_action"] == "RENDER_LOADING"
+    job_id = body["widget_data"]["job_id"]
+    assert body["widget_data"]["status_url"] == f"/cv-jobs/{job_id}"
+
+    events = client.get(body["widget_data"]["events_url"])
+    assert events.status_code == 200
+    assert events.headers["content-type"].startswith("text/event-stream")
+    names = [
+        line.removeprefix("event: ")
+        for line in events.text.splitlines()
+        if line.startswith("event: ")
+    ]
+    assert names == [
+        "queued",
+        "started",
+        "retrieval_done",
+        "generation_done",
+        "stored",
+        "done",
+    ]
+
+    status = client.get(body["widget_data"]["status_url"]).json()
+    assert status["status"] == "done"
+    assert status["result"] == RESULT
+
+
+def test_dynamic_cv_requires_form_data(client):
+    response = chat(client, form_data={"company_name": "Acme"})
+
+    assert response.status_code == 400
+    assert response.json() == {
+        "detail": "company_name, job_title, and job_description are required"
+    }
+
+
+@pytest.mark.parametrize("path", ["/cv-jobs/unknown", "/cv-jobs/unknown/events"])
+def test_unknown_job(client, path):
+    response = client.get(path)
+
+    assert response.status_code == 404
+    assert response.json()["detail"].startswith("Job not found or expired")
+
+
+def test_rag_flows_wait_for_the_knowledge_base(client, monkeypatch):
+    monkeypatch.setattr(main.rag_service, "is_available", lambda: False)
+
+    response = chat(client, form_data=FORM)
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "10"
+
+
+def test_presentation_answers_without_the_knowledge_base(client, monkeypatch):
+    monkeypatch.setattr(main.rag_service, "is_available", lambda: False)
+    sent = []
+
+    async def send_chat_message(session_id, message, system_instruction=None):
+        sent.append(message)
+        return "Bonjour !"
+
+    monkeypatch.setattr(main.gemini_service, "send_chat_message", send_chat_message)
+
+    response = chat(client, flow_id="PRESENTATION", message="Qui êtes-vous ?")
+
+    assert response.status_code == 200
+    assert response.json()["response"] == "Bonjour !"
+    assert sent == ["Qui êtes-vous ?"]
+
+
+def chat_stream(client, **payload):
+    body = {"message": "", "session_id": "s1", "flow_id": "DYNAMIC_CV"}
+    return client.post("/chat/stream", json={**body, **payload})
+
+
+def sse_events(text):
+    """Parse an SSE body into (event, data) pairs, checking the framing."""
+    assert text.endswith("\n\n")
+    events = []
+    for frame in text.removesuffix("\n\n").split("\n\n"):
+        event, data = frame.split("\n")
+        events.append(
+            (event.removeprefix("event: "), json.loads(data.removeprefix("data: ")))
+        )
+    return events
+
+
+def fake_stream(chunks, error=None):
+    async def send_chat_message_stream(session_id, message, system_instruction=None):
+        for chunk in chunks:
+            yield chunk
+        if error is not None:
+            raise error
+
+    return send_chat_message_stream
+
+
+def test_chat_stream_sends_chunks_then_done(client, monkeypatch):
+    monkeypatch.setattr(
+        main.gemini_service,
+        "send_chat_message_stream",
+        fake_stream(["Première étape", " : clarifier l'offre."]),
+    )
+
+    response = chat_stream(client, message="Par où commencer ?", flow_id="ROADMAP")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    assert sse_events(response.text) == [
+        ("chunk", {"text": "Première étape"}),
+        ("chunk", {"text": " : clarifier l'offre."}),
+        ("done", {"session_id": "s1", "flow_id": "ROADMAP"}),
+    ]
+
+
+def test_chat_stream_reports_model_errors(client, monkeypatch):
+    monkeypatch.setattr(
+        main.gemini_service,
+        "send_chat_message_stream",
+        fake_stream(["Première"], error=RuntimeError("quota exceeded")),
+    )
+
+    response = chat_stream(client, message="Par où commencer ?", flow_id="ROADMAP")
+
+    assert response.status_code == 200
+    assert sse_events(response.text) == [
+        ("chunk", {"text": "Première"}),
+        ("error", {"detail": "quota exceeded"}),
+    ]
+
+
+def test_chat_stream_rejects_non_streaming_flows(client):
+    response = chat_stream(client)
+
+    assert response.status_code == 400
+    assert response.json() == {
+        "detail": "Streaming not supported for flow_id: DYNAMIC_CV"
+    }
+
+
+def test_unknown_flow(client):
+    response = chat(client, flow_id="UNKNOWN")
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Unknown flow_id: UNKNOWN"}
@@ -0,0 +1,92 @@
+"""Tests for micro-batching of concurrent calls."""
+import asyncio
+
+import pytest
+
+from app.batcher import MicroBatcher
+
+
+def make_batcher(max_batch_size=4, max_wait=0.01):
+    batches = []
+
+    async def handler(items):
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    return MicroBatcher(handler, max_batch_size, max_wait), batches
+
+
+def test_concurrent_items_share_a_batch():
+    batcher, batches = make_batcher()
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+
+    assert asyncio.run(run()) == [0, 10, 20]
+    assert batches == [[0, 1, 2]]
+    assert batcher.stats()["avg_batch_size"] == 3
+
+
+def test_full_batch_flushes_without_waiting():
+    batcher, batches = make_batcher(max_batch_size=2, max_wait=60)
+
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(4))), timeout=1
+        )
+
+    assert asyncio.run(run()) == [0, 10, 20, 30]
+    assert batches == [[0, 1], [2, 3]]
+
+
+def test_sequential_items_get_separate_batches():
+    batcher, batches = make_batcher()
+
+    async def run():
+        return [await batcher.submit(i) for i in range(2)]
+
+    assert asyncio.run(run()) == [0, 10]
+    assert batches == [[0], [1]]
+
+
+def test_handler_error_reaches_every_caller():
+    async def handler(items):
+        raise RuntimeError("embedding failed")
+
+    batcher = MicroBatcher(handler, max_batch_size=4, max_wait=0.01)
+
+    async def run():
+        return await asyncio.gather(
+            batcher.submit("a"), batcher.submit("b"), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+
+    assert [str(result) for result in results] == ["embedding failed"] * 2
+
+
+def test_wrong_result_count_is_an_error():
+    async def handler(items):
+        return items[:1]
+
+    batcher = MicroBatcher(handler, max_batch_size=4, max_wait=0.01)
+
+    async def run():
+        return await asyncio.gather(batcher.submit("a"), batcher.submit("b"))
+
+    with pytest.raises(RuntimeError, match="returned 1 results for 2 items"):
+        asyncio.run(run())
+
+
+def test_cancelled_caller_does_not_break_the_batch():
+    batcher, batches = make_batcher(max_wait=0.05)
+
+    async def run():
+        cancelled = asyncio.create_task(batcher.submit(1))
+        kept = asyncio.create_task(batcher.submit(2))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        return await kept
+
+    assert asyncio.run(run()) == 20
+    assert batches == [[1, 2]]
@@ -0,0 +1,71 @@
+"""Tests for the mmap-able chunk store."""
+import numpy as np
+
+from app.chunk_store import ChunkStore, write_chunk_store
+
+CHUNKS = ["Première expérience", "Projet data — 2024 ✓", "Loisirs"]
+METADATA = [
+    {"filename": "cv.md", "chunk_id": 0, "source": "kb/cv.md"},
+    {"filename": "cv.md", "chunk_id": 1, "source": "kb/cv.md"},
+    {"filename": "perso.md", "chunk_id": 0, "source": "kb/perso.md"},
+]
+IDS = [7, 2, 11]
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "chunk_store")
+    vectors = np.eye(3, 4, dtype="float32")
+    write_chunk_store(path, CHUNKS, METADATA, IDS, vectors)
+
+    store = ChunkStore(path)
+    try:
+        assert len(store) == 3
+        assert [store.chunk(i) for i in range(3)] == CHUNKS
+        assert [store.metadata(i) for i in range(3)] == METADATA
+        assert list(store.ids) == IDS
+        np.testing.assert_array_equal(store.vectors, vectors)
+    finally:
+        store.close()
+
+
+def test_position_lookup(tmp_path):
+    path = str(tmp_path / "chunk_store")
+    write_chunk_store(path, CHUNKS, METADATA, IDS)
+
+    store = ChunkStore(path)
+    try:
+        assert [store.position(chunk_id) for chunk_id in IDS] == [0, 1, 2]
+        assert store.position(-1) is None
+        assert store.position(5) is None
+        assert store.position(99) is None
+        assert store.vectors is None
+    finally:
+        store.close()
+
+
+def test_rewrite_replaces_store(tmp_path):
+    path = str(tmp_path / "chunk_store")
+    write_chunk_store(path, CHUNKS, METADATA, IDS)
+    write_chunk_store(path, CHUNKS[:1], METADATA[:1], [3])
+
+    store = ChunkStore(path)
+    try:
+        assert len(store) == 1
+        assert store.chunk(0) == CHUNKS[0]
+        assert store.position(3) == 0
+    finally:
+        store.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["chunk_store"]
+
+
+def test_empty_store(tmp_path):
+    path = str(tmp_path / "chunk_store")
+    write_chunk_store(path, [], [], [])
+
+    assert ChunkStore.exists(path)
+    store = ChunkStore(path)
+    try:
+        assert len(store) == 0
+        assert store.position(0) is None
+    finally:
+        store.close()
@@ -0,0 +1,188 @@
+"""Tests for the background CV generation job queue and stores."""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app import cv_jobs
+from app.cv_jobs import CVJobQueue, MemoryCVJobStore, SQLiteCVJobStore
+
+FORM = {"company_name": "Acme", "job_title": "Data Engineer"}
+RESULT = {"next_action": "RENDER_ANALYSIS", "widget_data": {"resume_id": "r1"}}
+
+
+async def generate(form_data, progress):
+    progress("retrieval_done", {"chunks": 3})
+    await asyncio.sleep(0.01)
+    progress("generation_done", {})
+    return RESULT
+
+
+def fail_with(error):
+    async def handler(form_data, progress):
+        raise error
+
+    return handler
+
+
+async def run_queue(queue):
+    """Start a queue's workers; returns a coroutine function stopping them."""
+    workers = queue.start()
+
+    async def stop():
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    return stop
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(cv_jobs.config, "CV_JOB_POLL_INTERVAL", 0.01)
+
+
+def test_job_events_and_result():
+    async def run():
+        queue = CVJobQueue(generate, workers=1, store=MemoryCVJobStore())
+        stop = await run_queue(queue)
+        job = await queue.submit(FORM)
+        events = [event async for event, _ in queue.follow(job.job_id)]
+        status = await queue.status(job.job_id)
+        await stop()
+        return events, status
+
+    events, status = asyncio.run(run())
+
+    assert events == [
+        "queued",
+        "started",
+        "retrieval_done",
+        "generation_done",
+        "done",
+    ]
+    assert status["status"] == "done"
+    assert status["stage"] == "done"
+    assert status["result"] == RESULT
+    assert status["error"] is None
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (
+            HTTPException(status_code=503, detail="Knowledge base not ready"),
+            {"status_code": 503, "detail": "Knowledge base not ready"},
+        ),
+        (RuntimeError("boom"), {"status_code": 500, "detail": "boom"}),
+    ],
+)
+def test_failed_job_reports_its_error(error, expected):
+    async def run():
+        queue = CVJobQueue(fail_with(error), workers=1, store=MemoryCVJobStore())
+        stop = await run_queue(queue)
+        job = await queue.submit(FORM)
+        await job.wait()
+        await stop()
+        return job, queue.stats()
+
+    job, stats = asyncio.run(run())
+
+    assert job.status == "failed"
+    assert job.error == expected
+    assert job.events[-1] == ("error", expected)
+    assert stats["failed"] == 1
+
+
+def test_submit_fails_when_not_started():
+    queue = CVJobQueue(generate, workers=1, store=MemoryCVJobStore())
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(queue.submit(FORM))
+
+    assert exc_info.value.status_code == 503
+
+
+def test_submit_fails_when_queue_is_full():
+    async def run():
+        gate = asyncio.Event()
+
+        async def blocked(form_data, progress):
+            await gate.wait()
+            return RESULT
+
+        queue = CVJobQueue(blocked, workers=1, max_queued=1, store=MemoryCVJobStore())
+        stop = await run_queue(queue)
+        running = await queue.submit(FORM)
+        await asyncio.sleep(0.01)  # picked up by the only worker
+        await queue.submit(FORM)
+        with pytest.raises(HTTPException) as exc_info:
+            await queue.submit(FORM)
+        gate.set()
+        await running.wait()
+        await stop()
+        return exc_info.value
+
+    error = asyncio.run(run())
+
+    assert error.status_code == 503
+    assert error.headers == {"Retry-After": "30"}
+
+
+def test_jobs_are_visible_to_other_processes(tmp_path):
+    """A queue sharing the SQLite store sees jobs run by another one."""
+    path = str(tmp_path / "cv_jobs.db")
+
+    async def run():
+        worker = CVJobQueue(generate, workers=1, store=SQLiteCVJobStore(path))
+        other = CVJobQueue(generate, workers=1, store=SQLiteCVJobStore(path))
+        stop = await run_queue(worker)
+        job = await worker.submit(FORM)
+        events = [event async for event, _ in other.follow(job.job_id)]
+        status = await other.status(job.job_id)
+        missing = await other.status("unknown")
+        await stop()
+        return events, status, missing
+
+    events, status, missing = asyncio.run(run())
+
+    assert events[0] == "queued"
+    assert events[-1] == "done"
+    assert status["status"] == "done"
+    assert status["result"] == RESULT
+    assert missing is None
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCVJobStore(ttl_seconds=60)
+    return SQLiteCVJobStore(str(tmp_path / "cv_jobs.db"), ttl_seconds=60)
+
+
+def record(seq, status="running"):
+    return {
+        "job_id": "job-1",
+        "seq": seq,
+        "status": status,
+        "events": [["queued", {}]] * seq,
+        "result": None,
+        "error": None,
+    }
+
+
+def test_store_never_replaces_newer_records(store):
+    store.put(record(1))
+    store.put(record(3, status="done"))
+    store.put(record(2))
+
+    assert store.get("job-1")["seq"] == 3
+    assert store.get("job-1")["status"] == "done"
+
+
+def test_store_expires_records(store, monkeypatch):
+    store.put(record(1))
+    now = cv_jobs.time.time()
+    monkeypatch.setattr(cv_jobs.time, "time", lambda: now + 120)
+
+    assert store.get("job-1") is None
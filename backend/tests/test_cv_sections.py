@@ -0,0 +1,93 @@
+"""Tests for CV generation in sections mode."""
+import asyncio
+
+import pytest
+
+from app.flows import cv_flow
+from app.resume_models import RESUME_SECTIONS, StructuredResume
+
+RESUME = {
+    "contact_info": {
+        "name": "Camille Martin",
+        "job_title": "Data Engineer",
+        "city": "Lyon, France",
+        "email": "camille@example.com",
+        "phone": "+33 6 00 00 00 00",
+    },
+    "professional_summary": "Ingénieure data orientée produit.",
+    "key_skills": {"technical_skills": ["Python", "SQL"]},
+    "professional_experience": [
+        {
+            "job_title": "Data Engineer",
+            "company": "Globex",
+            "location": "Lyon",
+            "duration": "2021 - 2024",
+            "achievements": ["Pipelines temps réel"],
+        }
+    ],
+    "education": [],
+    "projects": [],
+    "match_analysis": {
+        "score": 87,
+        "tag": "Un profil très solide pour ce poste",
+        "intro_message": "Camille a construit des pipelines similaires.",
+        "key_strengths": ["Pipelines"],
+        "points_of_attention": ["Secteur santé"],
+    },
+}
+
+
+class FakeGemini:
+    """Answers each section request with its slice of RESUME."""
+
+    def __init__(self, invalid_first=()):
+        self.prompts = {}
+        self.invalid_first = set(invalid_first)
+
+    async def generate_structured_output(
+        self, prompt, response_schema, temperature=None
+    ):
+        section = response_schema["title"].removeprefix("Resume_")
+        self.prompts.setdefault(section, []).append(prompt)
+        if section in self.invalid_first:
+            self.invalid_first.discard(section)
+            return {"unexpected": True}
+        return {name: RESUME[name] for name in RESUME_SECTIONS[section]}
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    fake = FakeGemini(invalid_first={"experience"})
+    monkeypatch.setattr(cv_flow, "gemini_service", fake)
+    monkeypatch.setattr(cv_flow.config, "CV_SECTION_RETRIES", 1)
+    return fake
+
+
+def test_sections_are_merged_into_a_valid_resume(gemini):
+    merged = asyncio.run(cv_flow._generate_resume_by_sections("Offre: Data Engineer"))
+
+    assert StructuredResume.model_validate(merged)
+    assert merged["languages"] == []
+    assert merged["professional_experience"][0]["company"] == "Globex"
+    # The invalid first answer was retried
+    assert len(gemini.prompts["experience"]) == 2
+
+
+def test_match_analysis_sees_the_generated_resume(gemini):
+    asyncio.run(cv_flow._generate_resume_by_sections("Offre: Data Engineer"))
+
+    (match_prompt,) = gemini.prompts.pop("match_analysis")
+    assert "Globex" in match_prompt
+    # Content sections are generated independently of each other
+    assert not any(
+        "Globex" in prompt
+        for section_prompts in gemini.prompts.values()
+        for prompt in section_prompts
+    )
+
+
+def test_failed_section_fails_the_resume(gemini, monkeypatch):
+    monkeypatch.setattr(cv_flow.config, "CV_SECTION_RETRIES", 0)
+
+    assert asyncio.run(cv_flow._generate_resume_by_sections("Offre")) is None
+    assert "match_analysis" not in gemini.prompts
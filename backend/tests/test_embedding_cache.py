@@ -0,0 +1,107 @@
+"""Tests for the query embedding cache."""
+import asyncio
+
+import numpy as np
+import pytest
+
+from app import embedding_cache as embedding_cache_module
+from app.embedding_cache import EmbeddingCache
+
+TASK = "RETRIEVAL_QUERY"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(embedding_cache_module.time, "time", fake.time)
+    return fake
+
+
+def get(cache, text, model=None):
+    return asyncio.run(cache.get(text, TASK, model))
+
+
+def put(cache, text, vector, model=None):
+    asyncio.run(cache.put(text, TASK, vector, model))
+
+
+def test_hit_ignores_case_and_whitespace(clock):
+    cache = EmbeddingCache(max_entries=4, ttl_seconds=60, disk_path="")
+    put(cache, "Bonjour  Camille", [1.0, 2.0])
+
+    np.testing.assert_array_equal(get(cache, "  bonjour camille "), [1.0, 2.0])
+    assert cache.stats()["hits"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = EmbeddingCache(max_entries=2, ttl_seconds=60, disk_path="")
+    put(cache, "a", [1.0])
+    put(cache, "b", [2.0])
+    get(cache, "a")
+    put(cache, "c", [3.0])
+
+    assert get(cache, "b") is None
+    assert get(cache, "a") is not None
+    assert get(cache, "c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = EmbeddingCache(max_entries=4, ttl_seconds=60, disk_path="")
+    put(cache, "a", [1.0])
+
+    clock.now += 60
+    assert get(cache, "a") is not None
+    clock.now += 1
+    assert get(cache, "a") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_entries_are_keyed_by_model(clock):
+    cache = EmbeddingCache(max_entries=4, ttl_seconds=60, disk_path="")
+    put(cache, "a", [1.0], model="model-a")
+
+    assert get(cache, "a", model="model-b") is None
+    assert get(cache, "a", model="model-a") is not None
+
+
+def test_entries_are_keyed_by_output_dimensionality(clock, monkeypatch):
+    cache = EmbeddingCache(max_entries=4, ttl_seconds=60, disk_path="")
+    put(cache, "a", [1.0])
+
+    monkeypatch.setattr(embedding_cache_module.config, "EMBEDDING_DIMENSION", 8)
+    monkeypatch.setattr(embedding_cache_module.config, "EMBEDDING_REDUCTION", "api")
+    assert get(cache, "a") is None
+
+
+def test_disk_tier_persists_across_instances(clock, tmp_path):
+    disk_path = str(tmp_path / "embeddings.db")
+    put(EmbeddingCache(max_entries=4, ttl_seconds=60, disk_path=disk_path), "a", [1.5])
+
+    cache = EmbeddingCache(max_entries=4, ttl_seconds=60, disk_path=disk_path)
+    np.testing.assert_array_equal(get(cache, "a"), [1.5])
+    # Promoted to the memory tier
+    get(cache, "a")
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_expired_disk_entries_are_dropped(clock, tmp_path):
+    disk_path = str(tmp_path / "embeddings.db")
+    put(EmbeddingCache(max_entries=4, ttl_seconds=60, disk_path=disk_path), "a", [1.5])
+
+    clock.now += 61
+    cache = EmbeddingCache(max_entries=4, ttl_seconds=60, disk_path=disk_path)
+    assert get(cache, "a") is None
+    clock.now -= 61
+    assert get(cache, "a") is None
+    assert cache.stats()["expirations"] == 1
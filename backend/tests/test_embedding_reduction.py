@@ -0,0 +1,114 @@
+"""Tests for reduced-dimension embeddings."""
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app import embedding_reduction
+from app.embedding_reduction import (
+    api_output_dimensionality,
+    fit_pca,
+    load_pca,
+    project,
+    reduction_settings,
+    save_pca,
+)
+from app.gemini_service import gemini_service
+
+
+@pytest.fixture
+def reduce_to(monkeypatch):
+    def configure(dimension, reduction):
+        config = embedding_reduction.config
+        monkeypatch.setattr(config, "EMBEDDING_DIMENSION", dimension)
+        monkeypatch.setattr(config, "EMBEDDING_REDUCTION", reduction)
+
+    return configure
+
+
+def documents(rows=64, dimension=16, seed=1):
+    """Vectors whose variance lives mostly in their first 4 dimensions."""
+    rng = np.random.default_rng(seed)
+    scale = np.array([10.0] * 4 + [0.1] * (dimension - 4))
+    return (rng.normal(size=(rows, dimension)) * scale).astype("float32")
+
+
+def test_api_reduction_requests_truncated_vectors(reduce_to):
+    reduce_to(0, "api")
+    assert api_output_dimensionality() is None
+
+    reduce_to(256, "api")
+    assert api_output_dimensionality() == 256
+
+    reduce_to(256, "pca")
+    assert api_output_dimensionality() is None
+
+
+def test_unknown_reduction_is_rejected(reduce_to):
+    reduce_to(256, "svd")
+
+    with pytest.raises(ValueError, match="Unknown embedding reduction"):
+        reduction_settings()
+
+
+def test_embedding_requests_carry_output_dimensionality(reduce_to, monkeypatch):
+    reduce_to(8, "api")
+    requests = []
+
+    async def embed_content(model, contents, config):
+        requests.append(config)
+        return SimpleNamespace(
+            embeddings=[SimpleNamespace(values=[0.5] * 8) for _ in contents]
+        )
+
+    client = SimpleNamespace(
+        aio=SimpleNamespace(models=SimpleNamespace(embed_content=embed_content))
+    )
+    monkeypatch.setattr(gemini_service, "client", client)
+
+    vectors = asyncio.run(
+        gemini_service.create_embeddings_batch_async(["a", "b"], "RETRIEVAL_QUERY")
+    )
+
+    assert [len(vector) for vector in vectors] == [8, 8]
+    assert requests[0].output_dimensionality == 8
+    assert requests[0].task_type == "RETRIEVAL_QUERY"
+
+
+def test_project_normalizes_without_pca():
+    vectors = project([[3.0, 4.0], [0.0, 2.0]])
+
+    np.testing.assert_allclose(vectors, [[0.6, 0.8], [0.0, 1.0]])
+
+
+def test_pca_projection_is_normalized_and_survives_a_round_trip(tmp_path):
+    docs = project(documents())
+    pca = fit_pca(docs, 4)
+    path = str(tmp_path / "pca.faiss")
+    save_pca(pca, path)
+
+    projected = project(documents(), load_pca(path))
+
+    assert projected.shape == (64, 4)
+    np.testing.assert_allclose(np.linalg.norm(projected, axis=1), 1.0, rtol=1e-5)
+    np.testing.assert_allclose(projected, project(documents(), pca), rtol=1e-5)
+
+
+def test_pca_preserves_nearest_neighbours():
+    pca = fit_pca(project(documents()), 4)
+    docs = project(documents(), pca)
+    queries = project(documents(rows=8, seed=2), pca)
+
+    full_docs = project(documents())
+    full_queries = project(documents(rows=8, seed=2))
+
+    assert (
+        np.argmax(queries @ docs.T, axis=1).tolist()
+        == np.argmax(full_queries @ full_docs.T, axis=1).tolist()
+    )
+
+
+def test_pca_needs_as_many_vectors_as_dimensions():
+    with pytest.raises(ValueError, match="needs at least 8 chunks"):
+        fit_pca(project(documents(rows=4)), 8)
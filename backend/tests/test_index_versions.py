@@ -0,0 +1,78 @@
+"""Tests for publishing and pruning index versions."""
+import os
+import time
+
+import pytest
+
+from app import rag_service
+from app.rag_service import (
+    IN_USE_FILE,
+    mark_version_in_use,
+    new_version_name,
+    prune_index_versions,
+    publish_index_version,
+    read_current_version,
+)
+
+VERSIONS = ["v1", "v2", "v3", "v4", "v5", "v6"]
+
+
+@pytest.fixture
+def index_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(rag_service.config, "RAG_INDEX_IN_USE_GRACE", 60)
+    for name in VERSIONS:
+        (tmp_path / name).mkdir()
+    return tmp_path
+
+
+def remaining(index_dir):
+    return sorted(p.name for p in index_dir.iterdir() if p.is_dir())
+
+
+def test_publish_records_previous_version(index_dir):
+    publish_index_version(str(index_dir), "v1")
+    publish_index_version(str(index_dir), "v2")
+
+    assert read_current_version(str(index_dir)) == "v2"
+    assert (index_dir / "PREVIOUS").read_text().strip() == "v1"
+    assert remaining(index_dir) == VERSIONS
+
+
+def test_prune_keeps_newest_versions(index_dir):
+    publish_index_version(str(index_dir), "v4")
+    publish_index_version(str(index_dir), "v5")
+
+    deleted = prune_index_versions(str(index_dir), keep=3)
+
+    # v4 is PREVIOUS, v6 is newer than CURRENT (an ingest may be writing it)
+    assert deleted == ["v1", "v2"]
+    assert remaining(index_dir) == ["v3", "v4", "v5", "v6"]
+
+
+def test_prune_spares_versions_in_use(index_dir):
+    publish_index_version(str(index_dir), "v5")
+    mark_version_in_use(str(index_dir / "v2"))
+
+    assert prune_index_versions(str(index_dir), keep=1) == ["v1", "v3", "v4"]
+    assert remaining(index_dir) == ["v2", "v5", "v6"]
+
+
+def test_prune_removes_stale_heartbeats(index_dir):
+    publish_index_version(str(index_dir), "v5")
+    mark_version_in_use(str(index_dir / "v2"))
+    stale = time.time() - 120
+    os.utime(index_dir / "v2" / IN_USE_FILE, (stale, stale))
+
+    assert "v2" in prune_index_versions(str(index_dir), keep=1)
+
+
+def test_prune_without_current_version_is_a_no_op(index_dir):
+    assert prune_index_versions(str(index_dir), keep=1) == []
+    assert remaining(index_dir) == VERSIONS
+
+
+def test_version_names_are_unique_and_sortable():
+    names = [new_version_name() for _ in range(100)]
+
+    assert len(set(names)) == len(names)
+    assert names == sorted(names)
@@ -0,0 +1,290 @@
+"""Tests for incremental ingestion of the knowledge base."""
+import asyncio
+import hashlib
+import os
+
+import numpy as np
+import pytest
+
+from app import config as config_module
+from app import ingest_pipeline
+from app.chunk_store import ChunkStore
+from app.ingest_pipeline import (
+    assemble_vectors,
+    batch_checkpoint_path,
+    chunk_hash,
+    load_batch_checkpoint,
+    ingest_lock,
+    plan_incremental_update,
+    run_ingest,
+    save_batch_checkpoint,
+)
+from app.rag_service import (
+    CHUNK_STORE_DIR,
+    PCA_FILE,
+    RAGService,
+    _IndexSnapshot,
+    read_current_version,
+)
+
+DIMENSION = 8
+
+
+def fake_embedding(text):
+    """Deterministic positive vector for a text."""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return np.frombuffer(digest[:DIMENSION], dtype="uint8").astype("float32") + 1
+
+
+class FakeGemini:
+    def is_available(self):
+        return True
+
+    async def create_embeddings_batch_async(self, texts, task_type=None):
+        return np.array([fake_embedding(text) for text in texts])
+
+
+@pytest.fixture
+def ingest_env(monkeypatch, tmp_path):
+    """Knowledge base and index directories under tmp_path, fake embeddings."""
+    knowledge_base = tmp_path / "knowledge_base"
+    knowledge_base.mkdir()
+    index_dir = tmp_path / "index_versions"
+    config = ingest_pipeline.config
+    monkeypatch.setattr(config, "KNOWLEDGE_BASE_DIR", str(knowledge_base))
+    monkeypatch.setattr(config, "RAG_INDEX_DIR", str(index_dir))
+    monkeypatch.setattr(config, "INGEST_CHECKPOINT_DIR", str(tmp_path / "checkpoints"))
+    monkeypatch.setattr(ingest_pipeline, "gemini_service", FakeGemini())
+
+    embedded = []
+
+    async def create_embeddings_batch(chunks):
+        embedded.append(list(chunks))
+        return np.array([fake_embedding(chunk) for chunk in chunks])
+
+    monkeypatch.setattr(
+        ingest_pipeline, "create_embeddings_batch", create_embeddings_batch
+    )
+    return knowledge_base, index_dir, embedded
+
+
+def paragraph(topic):
+    return f"{topic}: " + " ".join(f"{topic} detail {i}." for i in range(8))
+
+
+def current_chunks(index_dir):
+    version = read_current_version(str(index_dir))
+    store = ChunkStore(os.path.join(index_dir, version, CHUNK_STORE_DIR))
+    chunks = {store.chunk(i): int(store.ids[i]) for i in range(len(store))}
+    store.close()
+    return chunks
+
+
+def remaining_versions(index_dir):
+    return [entry.name for entry in index_dir.iterdir() if entry.is_dir()]
+
+
+def manifest(hashes, next_id=None):
+    return {
+        "chunks": [{"hash": digest, "id": i} for i, digest in enumerate(hashes)],
+        "next_id": len(hashes) if next_id is None else next_id,
+    }
+
+
+def test_plan_full_rebuild_without_manifest():
+    assert plan_incremental_update(["a", "b", "c"], None) == (
+        [0, 1, 2],
+        [0, 1, 2],
+        [],
+        3,
+    )
+
+
+def test_plan_reuses_unchanged_chunks():
+    ids, to_embed, removed_ids, next_id = plan_incremental_update(
+        ["a", "x", "c", "d"], manifest(["a", "b", "c"])
+    )
+
+    assert ids == [0, 3, 2, 4]
+    assert to_embed == [1, 3]
+    assert removed_ids == [1]
+    assert next_id == 5
+
+
+def test_plan_never_reuses_freed_ids():
+    ids, to_embed, removed_ids, next_id = plan_incremental_update(
+        ["a"], manifest(["a"], next_id=7)
+    )
+
+    assert (ids, to_embed, removed_ids, next_id) == ([0], [], [], 7)
+
+
+def test_plan_matches_duplicate_chunks_one_to_one():
+    ids, to_embed, removed_ids, _ = plan_incremental_update(
+        ["a", "a", "a"], manifest(["a", "a"])
+    )
+
+    assert ids == [0, 1, 2]
+    assert to_embed == [2]
+    assert removed_ids == []
+
+
+def test_chunk_hash_depends_on_file():
+    assert chunk_hash("cv.md", "Python") != chunk_hash("projets.md", "Python")
+
+
+def test_assemble_vectors_rejects_empty_plan():
+    with pytest.raises(ValueError, match="No chunks to index"):
+        assemble_vectors(None, None, [], [])
+
+
+def test_checkpoints_are_keyed_by_reduction_settings(ingest_env, monkeypatch):
+    batch = ["chunk a", "chunk b"]
+    save_batch_checkpoint(batch, np.ones((2, 16)))
+    assert load_batch_checkpoint(batch).shape == (2, 16)
+
+    monkeypatch.setattr(ingest_pipeline.config, "EMBEDDING_DIMENSION", 8)
+    monkeypatch.setattr(ingest_pipeline.config, "EMBEDDING_REDUCTION", "api")
+    assert load_batch_checkpoint(batch) is None
+
+    monkeypatch.setattr(ingest_pipeline.config, "EMBEDDING_REDUCTION", "pca")
+    assert load_batch_checkpoint(batch) is None
+
+
+def test_checkpoint_of_wrong_dimension_is_ignored(ingest_env, monkeypatch):
+    monkeypatch.setattr(ingest_pipeline.config, "EMBEDDING_DIMENSION", 8)
+    monkeypatch.setattr(ingest_pipeline.config, "EMBEDDING_REDUCTION", "api")
+    batch = ["chunk a"]
+    os.makedirs(ingest_pipeline.config.INGEST_CHECKPOINT_DIR)
+    np.save(batch_checkpoint_path(batch), np.ones((1, 16), dtype="float32"))
+
+    assert load_batch_checkpoint(batch) is None
+
+
+def test_run_ingest_embeds_only_changed_chunks(ingest_env):
+    knowledge_base, index_dir, embedded = ingest_env
+    (knowledge_base / "cv.md").write_text(paragraph("Experience"), encoding="utf-8")
+    (knowledge_base / "projets.md").write_text(paragraph("Projets"), encoding="utf-8")
+
+    assert asyncio.run(run_ingest())
+    first = current_chunks(index_dir)
+    assert len(embedded) == 1 and len(embedded[0]) == len(first) == 2
+
+    # Nothing changed: nothing embedded, no new version
+    version = read_current_version(str(index_dir))
+    assert asyncio.run(run_ingest())
+    assert len(embedded) == 1
+    assert read_current_version(str(index_dir)) == version
+
+    (knowledge_base / "projets.md").write_text(paragraph("Loisirs"), encoding="utf-8")
+    assert asyncio.run(run_ingest())
+    second = current_chunks(index_dir)
+
+    assert embedded[1] == [paragraph("Loisirs")]
+    experience = paragraph("Experience")
+    assert second[experience] == first[experience]
+    assert paragraph("Projets") not in second
+
+
+def test_run_ingest_fits_pca(ingest_env, monkeypatch):
+    knowledge_base, index_dir, _ = ingest_env
+    monkeypatch.setattr(ingest_pipeline.config, "EMBEDDING_DIMENSION", 2)
+    monkeypatch.setattr(ingest_pipeline.config, "EMBEDDING_REDUCTION", "pca")
+    for topic in ("Experience", "Projets", "Loisirs"):
+        (knowledge_base / f"{topic}.md").write_text(paragraph(topic), encoding="utf-8")
+
+    assert asyncio.run(run_ingest())
+
+    version_path = index_dir / read_current_version(str(index_dir))
+    assert (version_path / PCA_FILE).exists()
+    snapshot = _IndexSnapshot(version_path.name, str(version_path))
+    assert snapshot.index.d == 2
+    assert snapshot.pca is not None
+    snapshot.chunk_store.close()
+
+
+def test_snapshot_rejects_index_of_other_dimension(ingest_env, monkeypatch):
+    knowledge_base, index_dir, _ = ingest_env
+    (knowledge_base / "cv.md").write_text(paragraph("Experience"), encoding="utf-8")
+    assert asyncio.run(run_ingest())
+    version = read_current_version(str(index_dir))
+
+    monkeypatch.setattr(ingest_pipeline.config, "EMBEDDING_DIMENSION", 4)
+    monkeypatch.setattr(ingest_pipeline.config, "EMBEDDING_REDUCTION", "api")
+
+    with pytest.raises(ValueError, match="embedding_dimension=0"):
+        _IndexSnapshot(version, str(index_dir / version))
+
+
+def test_reload_closes_the_old_snapshot_after_in_flight_searches(ingest_env):
+    knowledge_base, index_dir, _ = ingest_env
+    (knowledge_base / "cv.md").write_text(paragraph("Experience"), encoding="utf-8")
+    assert asyncio.run(run_ingest())
+    service = RAGService(index_dir=str(index_dir))
+    assert service.initialize()
+    old = service._snapshot
+    old.acquire()  # a search still running on the old version
+
+    (knowledge_base / "cv.md").write_text(paragraph("Projets"), encoding="utf-8")
+    assert asyncio.run(run_ingest())
+    assert asyncio.run(service.reload())
+
+    assert service._snapshot is not old
+    assert not old.chunk_store._text_file.closed
+    old.release()
+    assert old.chunk_store._text_file.closed
+    assert not service._snapshot.chunk_store._text_file.closed
+    service._snapshot.close()
+
+
+def test_run_ingest_fails_cleanly_on_empty_corpus(ingest_env):
+    knowledge_base, index_dir, embedded = ingest_env
+    (knowledge_base / "vide.md").write_text("# Titre\n\nTrop court.", encoding="utf-8")
+
+    assert asyncio.run(run_ingest()) is False
+    assert embedded == []
+    assert read_current_version(str(index_dir)) is None
+
+
+def test_run_ingest_fails_without_markdown_files(ingest_env):
+    _, index_dir, _ = ingest_env
+
+    assert asyncio.run(run_ingest()) is False
+    assert read_current_version(str(index_dir)) is None
+
+
+def test_ingest_lock_serializes_holders(tmp_path):
+    held = []
+
+    async def hold(name):
+        async with ingest_lock(str(tmp_path), poll_interval=0.01):
+            held.append(f"{name} in")
+            await asyncio.sleep(0.05)
+            held.append(f"{name} out")
+
+    async def run():
+        await asyncio.gather(hold("a"), hold("b"))
+
+    asyncio.run(run())
+
+    assert held in (
+        ["a in", "a out", "b in", "b out"],
+        ["b in", "b out", "a in", "a out"],
+    )
+
+
+def test_concurrent_ingests_embed_once(ingest_env):
+    knowledge_base, index_dir, embedded = ingest_env
+    (knowledge_base / "cv.md").write_text(paragraph("Experience"), encoding="utf-8")
+
+    async def run():
+        return await asyncio.gather(run_ingest(), run_ingest())
+
+    assert asyncio.run(run()) == [True, True]
+    # The second run waited for the first, then found the index up to date
+    assert len(embedded) == 1
+    assert len(remaining_versions(index_dir)) == 1
+
+
+def test_default_knowledge_base_dir_exists():
+    assert os.path.isdir(config_module._default_knowledge_base_dir())
@@ -0,0 +1,141 @@
+"""Tests for the job scraping flow (SCRAPE_MODE, cache, URL checks)."""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.flows import cv_flow
+from app.models import JobScrapingRequest
+from app.page_fetcher import UnsafeURLError
+from app.scrape_cache import ScrapeCache
+
+JOB = {
+    "company_name": "Acme",
+    "job_title": "Data Engineer",
+    "job_description": "Pipelines et API",
+    "main_missions": "",
+    "qualifications": "Python",
+    "additional_info": "",
+}
+PAGE_TEXT = "Data Engineer chez Acme. " * 20
+
+
+class FakeGemini:
+    """Stand-in for gemini_service recording which extraction was used."""
+
+    def __init__(self):
+        self.calls = []
+
+    def is_available(self):
+        return True
+
+    async def generate_structured_output(self, prompt, schema, temperature=None):
+        self.calls.append("local")
+        return dict(JOB)
+
+    async def generate_structured_output_with_url(
+        self, prompt, schema, temperature=None
+    ):
+        self.calls.append("url_context")
+        return dict(JOB, additional_info="via URL context")
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    fake = FakeGemini()
+    monkeypatch.setattr(cv_flow, "gemini_service", fake)
+    monkeypatch.setattr(cv_flow, "get_scrape_cache", lambda: None)
+    return fake
+
+
+def serve_page(monkeypatch, text=PAGE_TEXT, error=None):
+    """Make page_fetcher.fetch_main_text return `text` or raise `error`."""
+    fetched = []
+
+    async def fetch_main_text(url):
+        fetched.append(url)
+        if error is not None:
+            raise error
+        return text
+
+    monkeypatch.setattr(cv_flow.page_fetcher, "fetch_main_text", fetch_main_text)
+    return fetched
+
+
+def scrape(url):
+    return asyncio.run(cv_flow._scrape_job(url))
+
+
+def test_auto_mode_extracts_locally(monkeypatch, gemini):
+    monkeypatch.setattr(cv_flow.config, "SCRAPE_MODE", "auto")
+    serve_page(monkeypatch)
+
+    assert scrape("https://jobs.example.com/1") == JOB
+    assert gemini.calls == ["local"]
+
+
+def test_auto_mode_falls_back_when_fetch_fails(monkeypatch, gemini):
+    monkeypatch.setattr(cv_flow.config, "SCRAPE_MODE", "auto")
+    serve_page(monkeypatch, error=httpx.ConnectError("connection refused"))
+
+    data = scrape("https://jobs.example.com/1")
+
+    assert data["additional_info"] == "via URL context"
+    assert gemini.calls == ["url_context"]
+
+
+def test_auto_mode_falls_back_when_page_is_nearly_empty(monkeypatch, gemini):
+    monkeypatch.setattr(cv_flow.config, "SCRAPE_MODE", "auto")
+    serve_page(monkeypatch, text="Loading...")
+
+    scrape("https://jobs.example.com/1")
+
+    assert gemini.calls == ["url_context"]
+
+
+def test_local_mode_does_not_fall_back(monkeypatch, gemini):
+    monkeypatch.setattr(cv_flow.config, "SCRAPE_MODE", "local")
+    serve_page(monkeypatch, error=httpx.ConnectError("connection refused"))
+
+    with pytest.raises(httpx.ConnectError):
+        scrape("https://jobs.example.com/1")
+    assert gemini.calls == []
+
+
+def test_url_context_mode_skips_local_fetch(monkeypatch, gemini):
+    monkeypatch.setattr(cv_flow.config, "SCRAPE_MODE", "url_context")
+    fetched = serve_page(monkeypatch)
+
+    scrape("https://jobs.example.com/1")
+
+    assert fetched == []
+    assert gemini.calls == ["url_context"]
+
+
+def test_unsafe_url_is_refused_without_fallback(monkeypatch, gemini):
+    monkeypatch.setattr(cv_flow.config, "SCRAPE_MODE", "auto")
+    serve_page(monkeypatch, error=UnsafeURLError("10.0.0.1 is not public"))
+    request = JobScrapingRequest(job_url="http://10.0.0.1/admin")
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(cv_flow.handle_job_scraping(request))
+
+    assert exc_info.value.status_code == 400
+    assert gemini.calls == []
+
+
+def test_scheme_less_url_is_scraped_and_cached(monkeypatch, gemini, tmp_path):
+    monkeypatch.setattr(cv_flow.config, "SCRAPE_MODE", "auto")
+    fetched = serve_page(monkeypatch)
+    cache = ScrapeCache(path=str(tmp_path / "scrapes.db"), ttl_seconds=60)
+    monkeypatch.setattr(cv_flow, "get_scrape_cache", lambda: cache)
+    request = JobScrapingRequest(job_url="jobs.example.com/offre/1?utm_source=x")
+
+    first = asyncio.run(cv_flow.handle_job_scraping(request))
+    second = asyncio.run(cv_flow.handle_job_scraping(request))
+
+    assert fetched == ["https://jobs.example.com/offre/1?utm_source=x"]
+    assert first == second
+    assert gemini.calls == ["local"]
+    assert cache.get("https://jobs.example.com/offre/1")[0] == JOB
@@ -0,0 +1,53 @@
+"""Tests for the memory-mapped flat index."""
+import faiss
+import numpy as np
+
+from app.mmap_index import MmapFlatIndex
+
+
+def normalized(rows, dimension, seed):
+    vectors = np.random.default_rng(seed).normal(size=(rows, dimension))
+    vectors = vectors.astype("float32")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def test_matches_faiss_flat_index(tmp_path):
+    vectors = normalized(200, 16, seed=1)
+    ids = np.arange(1000, 1200, dtype="int64")
+    np.save(tmp_path / "vectors.npy", vectors)
+    index = MmapFlatIndex(np.load(tmp_path / "vectors.npy", mmap_mode="r"), ids)
+
+    reference = faiss.IndexIDMap(faiss.IndexFlatIP(16))
+    reference.add_with_ids(vectors, ids)
+    queries = normalized(5, 16, seed=2)
+
+    scores, found = index.search(queries, 10)
+    expected_scores, expected_ids = reference.search(queries, 10)
+
+    assert (index.ntotal, index.d) == (200, 16)
+    np.testing.assert_array_equal(found, expected_ids)
+    np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+
+
+def test_pads_when_k_exceeds_rows():
+    vectors = normalized(3, 4, seed=3)
+    index = MmapFlatIndex(vectors, np.array([5, 6, 7], dtype="int64"))
+
+    scores, ids = index.search(vectors[:1], 5)
+
+    assert ids[0, 0] == 5
+    assert sorted(ids[0, :3]) == [5, 6, 7]
+    assert list(ids[0, 3:]) == [-1, -1]
+    assert np.all(np.isneginf(scores[0, 3:]))
+    assert np.all(np.diff(scores[0, :3]) <= 0)
+
+
+def test_empty_index():
+    index = MmapFlatIndex(np.zeros((0,), dtype="float32"), np.zeros(0, "int64"))
+
+    scores, ids = index.search(normalized(2, 4, seed=4), 3)
+
+    assert (index.ntotal, index.d) == (0, 0)
+    assert ids.tolist() == [[-1, -1, -1], [-1, -1, -1]]
+    assert np.all(np.isneginf(scores))
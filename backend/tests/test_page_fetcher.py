@@ -0,0 +1,259 @@
+"""Tests for local job page fetching and main-content extraction."""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.page_fetcher import (
+    PageFetcher,
+    UnsafeURLError,
+    extract_main_text,
+    is_public_address,
+)
+
+PUBLIC_IP = "93.184.216.34"
+
+
+def make_fetcher(handler, addresses=None):
+    """PageFetcher over a mock transport, resolving hosts from `addresses`."""
+    addresses = addresses or {}
+
+    async def resolver(host, port):
+        return addresses.get(host, [PUBLIC_IP])
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return PageFetcher(client=client, resolver=resolver)
+
+
+def html_response(body, status_code=200, **kwargs):
+    return httpx.Response(
+        status_code,
+        headers={"content-type": "text/html; charset=utf-8"},
+        text=body,
+        **kwargs,
+    )
+
+
+def test_extract_main_text_prefers_main_and_drops_boilerplate():
+    page = """
+    <html><head><title>Offre</title><style>body { color: red }</style></head>
+    <body>
+      <header>Logo - Connexion</header>
+      <nav><a href="/">Accueil</a><a href="/jobs">Offres</a></nav>
+      <main>
+        <h1>Data Engineer</h1>
+        <p>Vous construirez nos pipelines &amp; nos API.</p>
+        <ul><li>Python</li><li>SQL</li></ul>
+      </main>
+      <script>trackVisit()</script>
+      <footer>Mentions légales</footer>
+    </body></html>
+    """
+    text = extract_main_text(page, max_chars=10_000)
+
+    assert text.splitlines() == [
+        "Data Engineer",
+        "Vous construirez nos pipelines & nos API.",
+        "Python",
+        "SQL",
+    ]
+
+
+def test_extract_main_text_falls_back_to_page_when_main_is_a_teaser():
+    body = "<p>" + "Description complète du poste. " * 20 + "</p>"
+    page = f"<body><main>Postuler</main><div>{body}</div></body>"
+
+    text = extract_main_text(page, max_chars=10_000)
+
+    assert "Description complète du poste." in text
+    assert text.startswith("Postuler")
+
+
+def test_extract_main_text_reads_job_posting_json_ld():
+    posting = {
+        "@context": "https://schema.org",
+        "@graph": [
+            {"@type": "WebPage", "name": "Carrières"},
+            {
+                "@type": "JobPosting",
+                "title": "Développeur Python",
+                "hiringOrganization": {"name": "Acme"},
+                "employmentType": "CDI",
+                "description": "<p>Rejoignez l&#39;équipe <b>plateforme</b>.</p>",
+            },
+        ],
+    }
+    page = (
+        '<script type="application/ld+json">'
+        f"{json.dumps(posting)}</script>"
+        '<script type="application/ld+json">{not json</script>'
+        "<main><p>Texte visible</p></main>"
+    )
+
+    text = extract_main_text(page, max_chars=10_000)
+
+    assert text.split("\n\n") == [
+        "Intitulé: Développeur Python\n"
+        "Entreprise: Acme\n"
+        "Contrat: CDI\n"
+        "Description: Rejoignez l'équipe plateforme.",
+        "Texte visible",
+    ]
+
+
+def test_extract_main_text_caps_output():
+    page = "<main><p>" + "x" * 500 + "</p></main>"
+
+    assert len(extract_main_text(page, max_chars=100)) == 100
+
+
+@pytest.mark.parametrize(
+    "address, expected",
+    [
+        (PUBLIC_IP, True),
+        ("2606:4700:4700::1111", True),
+        ("127.0.0.1", False),
+        ("10.0.0.8", False),
+        ("172.16.5.4", False),
+        ("192.168.1.1", False),
+        ("169.254.169.254", False),
+        ("0.0.0.0", False),
+        ("::1", False),
+        ("fe80::1%eth0", False),
+        ("fd00::1", False),
+        ("::ffff:127.0.0.1", False),
+        ("224.0.0.1", False),
+    ],
+)
+def test_is_public_address(address, expected):
+    assert is_public_address(address) is expected
+
+
+def test_fetch_returns_html():
+    def handler(request):
+        assert request.url == "https://jobs.example.com/offre/42"
+        return html_response("<main>Offre</main>")
+
+    fetcher = make_fetcher(handler)
+
+    assert asyncio.run(fetcher.fetch("https://jobs.example.com/offre/42")) == (
+        "<main>Offre</main>"
+    )
+
+
+def test_fetch_main_text():
+    def handler(request):
+        return html_response("<nav>Menu</nav><main><p>Data Engineer</p></main>")
+
+    fetcher = make_fetcher(handler)
+
+    text = asyncio.run(fetcher.fetch_main_text("https://jobs.example.com/offre/42"))
+
+    assert text == "Data Engineer"
+
+
+def test_fetch_rejects_non_html():
+    def handler(request):
+        return httpx.Response(200, json={"job": "Data Engineer"})
+
+    fetcher = make_fetcher(handler)
+
+    with pytest.raises(ValueError, match="Not an HTML page"):
+        asyncio.run(fetcher.fetch("https://jobs.example.com/api"))
+
+
+def test_fetch_raises_on_error_status():
+    fetcher = make_fetcher(lambda request: html_response("Gone", status_code=404))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(fetcher.fetch("https://jobs.example.com/offre/1"))
+
+
+def test_fetch_follows_public_redirects():
+    def handler(request):
+        if request.url.path == "/short":
+            return httpx.Response(301, headers={"location": "/offre/42"})
+        return html_response("<main>Offre</main>")
+
+    fetcher = make_fetcher(handler)
+
+    assert asyncio.run(fetcher.fetch("https://jobs.example.com/short")) == (
+        "<main>Offre</main>"
+    )
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "file:///etc/passwd",
+        "ftp://jobs.example.com/offre",
+        "http://localhost:8000/admin/reload-index",
+        "http://169.254.169.254/latest/meta-data/",
+        "http://[::1]/",
+        "https://intranet.example.com/offre",
+    ],
+)
+def test_fetch_refuses_non_public_urls(url):
+    requested = []
+
+    def handler(request):
+        requested.append(request.url)
+        return html_response("secret")
+
+    fetcher = make_fetcher(
+        handler,
+        addresses={
+            "localhost": ["127.0.0.1"],
+            "169.254.169.254": ["169.254.169.254"],
+            "::1": ["::1"],
+            # One private address among public ones is enough to refuse
+            "intranet.example.com": [PUBLIC_IP, "10.1.2.3"],
+        },
+    )
+
+    with pytest.raises(UnsafeURLError):
+        asyncio.run(fetcher.fetch(url))
+    assert requested == []
+
+
+def test_fetch_checks_every_redirect_hop():
+    requested = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        return httpx.Response(
+            302, headers={"location": "http://169.254.169.254/latest/meta-data/"}
+        )
+
+    fetcher = make_fetcher(handler, addresses={"169.254.169.254": ["169.254.169.254"]})
+
+    with pytest.raises(UnsafeURLError):
+        asyncio.run(fetcher.fetch("https://jobs.example.com/offre/42"))
+    assert requested == ["https://jobs.example.com/offre/42"]
+
+
+def test_fetch_refuses_unresolvable_hosts():
+    async def resolver(host, port):
+        raise OSError("Name or service not known")
+
+    fetcher = make_fetcher(lambda request: html_response("<main>Offre</main>"))
+    fetcher._resolver = resolver
+
+    with pytest.raises(UnsafeURLError, match="Cannot resolve"):
+        asyncio.run(fetcher.fetch("https://nowhere.invalid/offre"))
+
+
+def test_fetch_stops_redirect_loops(monkeypatch):
+    monkeypatch.setattr("app.page_fetcher.config.SCRAPE_MAX_REDIRECTS", 3)
+    requested = []
+
+    def handler(request):
+        requested.append(request.url)
+        return httpx.Response(302, headers={"location": "/loop"})
+
+    fetcher = make_fetcher(handler)
+
+    with pytest.raises(httpx.TooManyRedirects):
+        asyncio.run(fetcher.fetch("https://jobs.example.com/loop"))
+    assert len(requested) == 4
@@ -0,0 +1,74 @@
+"""Tests for the ingest rate limiter."""
+import asyncio
+
+import pytest
+
+from app import rate_limiter
+from app.rate_limiter import AsyncRateLimiter, estimate_tokens
+
+
+class FakeClock:
+    """Monotonic clock advanced by the limiter's own sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake.sleep)
+    return fake
+
+
+def acquire_all(limiter, token_counts):
+    async def run():
+        for tokens in token_counts:
+            await limiter.acquire(tokens)
+
+    asyncio.run(run())
+
+
+def test_requests_within_budget_do_not_wait(clock):
+    acquire_all(AsyncRateLimiter(3, 1000), [100, 100, 100])
+
+    assert clock.sleeps == []
+
+
+def test_request_budget_is_enforced(clock):
+    acquire_all(AsyncRateLimiter(2, 0), [0, 0, 0])
+
+    # The third request waits for one request's worth of refill (30s)
+    assert clock.now == pytest.approx(30.0)
+
+
+def test_token_budget_is_enforced(clock):
+    acquire_all(AsyncRateLimiter(0, 600), [600, 300])
+
+    assert clock.now == pytest.approx(30.0)
+
+
+def test_oversized_request_waits_for_a_full_bucket(clock):
+    acquire_all(AsyncRateLimiter(0, 600), [100, 5000])
+
+    assert clock.now == pytest.approx(10.0)
+
+
+def test_zero_budgets_mean_unlimited(clock):
+    acquire_all(AsyncRateLimiter(0, 0), [10_000] * 50)
+
+    assert clock.sleeps == []
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("x" * 400) == 101
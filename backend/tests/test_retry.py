@@ -0,0 +1,134 @@
+"""Tests for the retry policy of upstream calls."""
+import asyncio
+
+import httpx
+import pytest
+from google.genai import errors as genai_errors
+
+from app import retry
+from app.retry import RetryStats, is_retryable, retry_async
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    """Retry immediately and record stats in a fresh instance."""
+    monkeypatch.setattr(retry.config, "RETRY_BASE_DELAY", 0.0)
+    monkeypatch.setattr(retry, "retry_stats", RetryStats())
+
+
+def api_error(code):
+    error_class = (
+        genai_errors.ServerError if code >= 500 else genai_errors.ClientError
+    )
+    return error_class(code, {"error": {"message": "upstream error"}})
+
+
+def flaky(*errors, result="ok"):
+    """Coroutine function raising `errors` in turn, then returning `result`."""
+    remaining = list(errors)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        if remaining:
+            raise remaining.pop(0)
+        return result
+
+    call.calls = calls
+    return call
+
+
+def outcome(operation):
+    stats = retry.retry_stats.snapshot()[operation]
+    return next(
+        name
+        for name in ("success", "fatal", "exhausted", "deadline")
+        if stats[name]
+    )
+
+
+@pytest.mark.parametrize(
+    "exc, expected",
+    [
+        (api_error(429), True),
+        (api_error(503), True),
+        (api_error(408), True),
+        (api_error(400), False),
+        (api_error(403), False),
+        (httpx.ConnectError("refused"), True),
+        (httpx.ReadTimeout("slow"), True),
+        (ConnectionResetError(), True),
+        (TimeoutError(), True),
+        (ValueError("bad schema"), False),
+    ],
+)
+def test_is_retryable(exc, expected):
+    assert is_retryable(exc) is expected
+
+
+def test_retries_transient_errors_until_success():
+    call = flaky(api_error(503), httpx.ConnectError("refused"))
+
+    assert asyncio.run(retry_async(call, operation="chat", max_retries=3)) == "ok"
+    assert len(call.calls) == 3
+    assert retry.retry_stats.snapshot()["chat"]["retries"] == 2
+    assert outcome("chat") == "success"
+
+
+def test_does_not_retry_fatal_errors():
+    call = flaky(api_error(400))
+
+    with pytest.raises(genai_errors.ClientError):
+        asyncio.run(retry_async(call, operation="chat", max_retries=3))
+    assert len(call.calls) == 1
+    assert outcome("chat") == "fatal"
+
+
+def test_gives_up_after_max_retries():
+    call = flaky(*[api_error(503)] * 5)
+
+    with pytest.raises(genai_errors.ServerError):
+        asyncio.run(retry_async(call, operation="chat", max_retries=3))
+    assert len(call.calls) == 3
+    assert outcome("chat") == "exhausted"
+
+
+def test_upstream_timeout_is_retried_not_treated_as_deadline():
+    call = flaky(TimeoutError("read timed out"))
+
+    assert asyncio.run(retry_async(call, operation="chat", deadline=5)) == "ok"
+    assert len(call.calls) == 2
+    assert outcome("chat") == "success"
+
+
+def test_deadline_cancels_the_attempt():
+    async def hang():
+        await asyncio.sleep(10)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(retry_async(hang, operation="chat", deadline=0.05))
+    assert outcome("chat") == "deadline"
+
+
+def test_no_retry_when_backoff_would_overrun_deadline(monkeypatch):
+    monkeypatch.setattr(retry, "backoff_delay", lambda attempt: 10.0)
+    call = flaky(api_error(503))
+
+    with pytest.raises(genai_errors.ServerError):
+        asyncio.run(retry_async(call, operation="chat", deadline=1))
+    assert len(call.calls) == 1
+    assert outcome("chat") == "deadline"
+
+
+def test_backoff_delay_is_capped(monkeypatch):
+    monkeypatch.setattr(retry.config, "RETRY_BASE_DELAY", 1.0)
+    monkeypatch.setattr(retry.config, "RETRY_MAX_DELAY", 4.0)
+    monkeypatch.setattr(retry.random, "uniform", lambda low, high: high)
+
+    assert [retry.backoff_delay(attempt) for attempt in range(4)] == [
+        1.0,
+        2.0,
+        4.0,
+        4.0,
+    ]
+
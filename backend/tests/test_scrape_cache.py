@@ -0,0 +1,76 @@
+"""Tests for the scrape cache and URL canonicalization."""
+import pytest
+
+from app import scrape_cache
+from app.scrape_cache import ScrapeCache, canonicalize_url
+
+JOB = {"company_name": "Acme", "job_title": "Data Engineer"}
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        (
+            "HTTPS://Jobs.Example.com:443/offre/42/?utm_source=li&b=2&a=1#apply",
+            "https://jobs.example.com/offre/42?a=1&b=2",
+        ),
+        (
+            "https://jobs.example.com/offre/42?gclid=x&trk=feed&ref=home",
+            "https://jobs.example.com/offre/42",
+        ),
+        ("http://jobs.example.com:80/offre", "http://jobs.example.com/offre"),
+        ("http://jobs.example.com:8080/offre", "http://jobs.example.com:8080/offre"),
+        ("https://jobs.example.com", "https://jobs.example.com/"),
+        ("jobs.example.com/offre/42", "https://jobs.example.com/offre/42"),
+        ("  //jobs.example.com/offre/42 ", "https://jobs.example.com/offre/42"),
+        ("https://jobs.example.com/Offre?Id=A", "https://jobs.example.com/Offre?Id=A"),
+    ],
+)
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(scrape_cache.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return ScrapeCache(
+        path=str(tmp_path / "scrapes.db"), ttl_seconds=100, stale_seconds=50
+    )
+
+
+def test_fresh_then_stale_then_expired(cache, clock):
+    url = "https://jobs.example.com/offre/42"
+    assert cache.get(url) is None
+
+    cache.put(url, JOB)
+    assert cache.get(url) == (JOB, True)
+
+    clock[0] += 120
+    assert cache.get(url) == (JOB, False)
+
+    clock[0] += 40
+    assert cache.get(url) is None
+    assert cache.stats() == {"fresh_hits": 1, "stale_hits": 1, "misses": 2}
+
+
+def test_put_drops_expired_entries(cache, clock):
+    cache.put("https://a.example.com/", JOB)
+    clock[0] += 200
+    cache.put("https://b.example.com/", JOB)
+
+    rows = cache._db.execute("SELECT url FROM scrapes").fetchall()
+    assert rows == [("https://b.example.com/",)]
+
+
+def test_entries_are_shared_between_instances(cache):
+    cache.put("https://jobs.example.com/offre/42", JOB)
+
+    other = ScrapeCache(path=cache.path)
+
+    assert other.get("https://jobs.example.com/offre/42") == (JOB, True)
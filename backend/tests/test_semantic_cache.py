@@ -0,0 +1,103 @@
+"""Tests for the semantic answer cache of the PRESENTATION flow."""
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app import rag_service as rag_service_module
+from app import semantic_cache
+from app.rag_service import RAGService
+from app.semantic_cache import SemanticAnswerCache, detect_language
+
+QUESTION = np.array([1.0, 0.0, 0.0])
+# Cosine distance 1 - cos(angle) from QUESTION
+CLOSE = np.array([1.0, 0.1, 0.0])  # ~0.005
+FAR = np.array([1.0, 1.0, 0.0])  # ~0.29
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(semantic_cache.time, "time", fake.time)
+    return fake
+
+
+def make_cache(**kwargs):
+    limits = dict(max_entries=4, ttl_seconds=60, max_distance=0.05)
+    limits.update(kwargs)
+    cache = SemanticAnswerCache(**limits)
+    cache.store("Que faites-vous ?", QUESTION, "fr", "Je construis...", "v1")
+    return cache
+
+
+def test_close_question_is_a_hit(clock):
+    cache = make_cache()
+
+    assert cache.lookup(CLOSE, "fr", "v1") == "Je construis..."
+    assert cache.stats()["hits"] == 1
+
+
+def test_distant_question_is_a_miss(clock):
+    cache = make_cache()
+
+    assert cache.lookup(FAR, "fr", "v1") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_other_language_is_a_miss(clock):
+    assert make_cache().lookup(QUESTION, "en", "v1") is None
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = make_cache(ttl_seconds=60)
+
+    clock.now += 61
+    assert cache.lookup(QUESTION, "fr", "v1") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_new_index_version_invalidates_entries(clock):
+    cache = make_cache()
+
+    assert cache.lookup(QUESTION, "fr", "v2") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_cache_is_cleared_on_index_reload(clock, monkeypatch):
+    cache = make_cache()
+    monkeypatch.setattr(rag_service_module, "answer_cache", cache)
+    service = RAGService(index_dir="unused")
+    service._snapshot = SimpleNamespace(version="v1", retire=lambda: None)
+    monkeypatch.setattr(service, "current_version", lambda: "v2")
+    monkeypatch.setattr(
+        service,
+        "_load_snapshot",
+        lambda: SimpleNamespace(version="v2", candidate_context="Profil"),
+    )
+
+    assert asyncio.run(service.reload())
+    # Same version string as before: only the reload could have cleared it
+    assert cache.lookup(QUESTION, "fr", "v1") is None
+    assert cache.stats()["size"] == 0
+
+
+@pytest.mark.parametrize(
+    "text, language",
+    [
+        ("Quels services proposez-vous ?", "fr"),
+        ("Présentez-vous", "fr"),
+        ("What do you do for a living?", "en"),
+        ("Python", "unknown"),
+    ],
+)
+def test_detect_language(text, language):
+    assert detect_language(text) == language
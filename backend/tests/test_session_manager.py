@@ -0,0 +1,126 @@
+"""Tests for the bounded in-memory chat session store."""
+from types import SimpleNamespace
+
+import pytest
+
+from app import session_manager
+from app.session_manager import ChatSessionManager, history_size
+
+
+def message(role, text):
+    return SimpleNamespace(role=role, parts=[SimpleNamespace(text=text)])
+
+
+class FakeChat:
+    def __init__(self, system_instruction=None, history=None):
+        self.system_instruction = system_instruction
+        self.history = list(history or [])
+
+    def get_history(self):
+        return self.history
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(session_manager.time, "monotonic", fake.monotonic)
+    return fake
+
+
+def make_manager(**kwargs):
+    limits = dict(
+        max_sessions=10, idle_ttl=60, max_history_bytes=1000, max_total_bytes=10_000
+    )
+    limits.update(kwargs)
+    return ChatSessionManager(chat_factory=FakeChat, **limits)
+
+
+def test_least_recently_used_session_is_evicted(clock):
+    manager = make_manager(max_sessions=2)
+    manager.put("a", FakeChat())
+    manager.put("b", FakeChat())
+    assert manager.get("a") is not None
+    manager.put("c", FakeChat())
+
+    assert "b" not in manager
+    assert "a" in manager and "c" in manager
+    assert manager.stats()["evictions"] == 1
+
+
+def test_idle_sessions_expire(clock):
+    manager = make_manager(idle_ttl=60)
+    manager.put("a", FakeChat())
+    manager.put("b", FakeChat())
+
+    clock.now += 60
+    assert manager.get("a") is not None
+    clock.now += 1
+    assert manager.get("a") is not None  # refreshed by the previous access
+    assert manager.get("b") is None
+    assert manager.stats()["expirations"] == 1
+
+
+def test_sweep_removes_idle_sessions(clock):
+    manager = make_manager(idle_ttl=60)
+    manager.put("a", FakeChat())
+    clock.now += 30
+    manager.put("b", FakeChat())
+
+    clock.now += 31
+    assert manager.sweep() == 1
+    assert len(manager) == 1 and "b" in manager
+
+
+def test_long_history_is_trimmed_oldest_turns_first(clock):
+    manager = make_manager(max_history_bytes=25)
+    chat = FakeChat(
+        "Tu es Camille.",
+        [
+            message("user", "aaaaa"),
+            message("model", "bbbbb"),
+            message("user", "ccccc"),
+            message("model", "ddddd"),
+            message("user", "eeeee"),
+            message("model", "fffff"),
+        ],
+    )
+    manager.put("a", chat, system_instruction="Tu es Camille.")
+
+    manager.record_turn("a")
+
+    trimmed = manager.get("a")
+    assert trimmed is not chat
+    assert trimmed.system_instruction == "Tu es Camille."
+    assert [m.parts[0].text for m in trimmed.history] == [
+        "ccccc",
+        "ddddd",
+        "eeeee",
+        "fffff",
+    ]
+    assert manager.stats()["trims"] == 1
+    assert manager.stats()["history_bytes"] == 20
+
+
+def test_total_byte_budget_evicts_least_recently_used(clock):
+    manager = make_manager(max_total_bytes=15)
+    for session_id in ("a", "b"):
+        manager.put(session_id, FakeChat(history=[message("user", "x" * 10)]))
+        manager.record_turn(session_id)
+
+    assert "a" not in manager
+    assert "b" in manager
+    assert manager.stats()["history_bytes"] == 10
+
+
+def test_history_size_counts_text_bytes():
+    history = [message("user", "é"), SimpleNamespace(role="model", parts=None)]
+
+    assert history_size(history) == 2
@@ -0,0 +1,55 @@
+"""Tests for the persistent chat history store."""
+import pytest
+
+from app import session_store
+from app.session_store import SessionStore, SQLiteSessionStore
+
+HELLO = [{"role": "user", "text": "Bonjour"}, {"role": "model", "text": "Salut !"}]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteSessionStore(str(tmp_path / "sessions.db"))
+
+
+def test_session_store_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+
+def test_append_and_load(store):
+    assert store.load("s1") is None
+    assert store.append("s1", HELLO, system_instruction="Sois concis") == 2
+    assert store.append("s1", HELLO[:1], system_instruction="ignored") == 3
+
+    assert store.count("s1") == 3
+    assert store.load("s1") == {
+        "system_instruction": "Sois concis",
+        "messages": HELLO + HELLO[:1],
+    }
+
+
+def test_sessions_are_shared_between_instances(store):
+    store.append("s1", HELLO)
+
+    assert SQLiteSessionStore(store.path).load("s1")["messages"] == HELLO
+
+
+def test_delete(store):
+    store.append("s1", HELLO)
+
+    assert store.delete("s1") is True
+    assert store.delete("s1") is False
+    assert store.count("s1") == 0
+
+
+def test_purge_idle_sessions(store, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(session_store.time, "time", lambda: now[0])
+    store.append("old", HELLO)
+    now[0] += 100
+    store.append("recent", HELLO)
+
+    assert store.purge(max_idle_seconds=50) == 1
+    assert store.load("old") is None
+    assert store.count("recent") == 2
@@ -0,0 +1,114 @@
+"""Tests for single-flight coalescing of identical calls."""
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from app.single_flight import SingleFlight, normalize_prompt, request_key
+
+
+class Answer(BaseModel):
+    text: str
+
+
+def test_identical_calls_share_one_upstream_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"skills": ["Python"]}
+
+    async def run():
+        return await asyncio.gather(*(flight.run("key", call) for _ in range(3)))
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert results == [{"skills": ["Python"]}] * 3
+    # Followers get copies they can mutate freely
+    results[1]["skills"].append("SQL")
+    assert results[0] == results[2] == {"skills": ["Python"]}
+    assert flight.stats() == {"calls": 3, "coalesced": 2, "in_flight": 0}
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+
+    async def run():
+        return await asyncio.gather(
+            flight.run("a", lambda: asyncio.sleep(0, "A")),
+            flight.run("b", lambda: asyncio.sleep(0, "B")),
+        )
+
+    assert asyncio.run(run()) == ["A", "B"]
+    assert flight.stats()["coalesced"] == 0
+
+
+def test_finished_calls_are_not_cached():
+    flight = SingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        return len(calls)
+
+    async def run():
+        return [await flight.run("key", call), await flight.run("key", call)]
+
+    assert asyncio.run(run()) == [1, 2]
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise ValueError("quota exceeded")
+
+    async def run():
+        return await asyncio.gather(
+            flight.run("key", call), flight.run("key", call), return_exceptions=True
+        )
+
+    assert [str(error) for error in asyncio.run(run())] == ["quota exceeded"] * 2
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        first = asyncio.create_task(flight.run("key", call))
+        second = asyncio.create_task(flight.run("key", call))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_request_key_normalizes_whitespace_only():
+    assert request_key("chat", "Bonjour  le\nmonde") == request_key(
+        "chat", " Bonjour le monde "
+    )
+    assert request_key("chat", "Bonjour") != request_key("chat", "bonjour")
+    assert request_key("chat", "Bonjour") != request_key("embedding", "Bonjour")
+
+
+def test_request_key_uses_schema_of_models():
+    assert request_key("structured", "prompt", Answer) == request_key(
+        "structured", "prompt", Answer.model_json_schema()
+    )
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [("a\t b\n\nc", "a b c"), ("  Senior  Data ", "Senior Data")],
+)
+def test_normalize_prompt(text, expected):
+    assert normalize_prompt(text) == expected
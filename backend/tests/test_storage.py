@@ -0,0 +1,75 @@
+"""Tests for the generated resume stores."""
+import pytest
+
+from app import storage
+from app.storage import MemoryResumeStore, ResumeStore, SQLiteResumeStore
+
+RESUME = {"contact_info": {"name": "Camille Martin"}, "skills": ["Python", "SQL"]}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(storage.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path, clock):
+    if request.param == "memory":
+        return MemoryResumeStore(ttl_seconds=60)
+    return SQLiteResumeStore(str(tmp_path / "resumes.db"), ttl_seconds=60)
+
+
+def test_resume_store_is_abstract():
+    with pytest.raises(TypeError):
+        ResumeStore()
+
+
+def test_put_and_get(store):
+    store.put("r1", RESUME)
+
+    assert store.get("r1") == RESUME
+    assert store.exists("r1")
+    assert store.get("r2") is None
+    assert not store.exists("r2")
+
+
+def test_entries_expire(store, clock):
+    store.put("r1", RESUME)
+    clock[0] += 61
+
+    assert store.get("r1") is None
+    assert not store.exists("r1")
+
+
+def test_clear(store):
+    store.put("r1", RESUME)
+    store.clear()
+
+    assert store.get("r1") is None
+
+
+def test_memory_store_evicts_expired_entries_on_put(clock):
+    store = MemoryResumeStore(ttl_seconds=60)
+    store.put("r1", RESUME)
+    clock[0] += 30
+    store.put("r2", RESUME)
+    clock[0] += 31
+    store.put("r3", RESUME)
+
+    assert list(store._resumes) == ["r2", "r3"]
+
+
+def test_memory_store_rewrite_moves_entry_to_the_end(clock):
+    store = MemoryResumeStore(ttl_seconds=60)
+    store.put("r1", RESUME)
+    clock[0] += 30
+    store.put("r2", RESUME)
+    store.put("r1", RESUME)
+    clock[0] += 31
+    store.put("r3", RESUME)
+
+    # r1 was rewritten after r2, so it expires after r2
+    assert store.get("r1") == RESUME
+    assert list(store._resumes) == ["r2", "r1", "r3"]
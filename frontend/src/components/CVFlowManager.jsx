@@ -5,11 +5,21 @@ import FormWidget from "./FormWidget";
 import LoadingScreen from "./LoadingScreen";
 import CVAnalysisView from "./CVAnalysisView";
 
+// Loading subtitle shown for each progress event of the generation job
+const GENERATION_PROGRESS = {
+  queued: "Votre demande est dans la file d'attente, ça arrive.",
+  started: "Je relis mon parcours...",
+  retrieval_done: "J'ai tout ce qu'il faut, je rédige le CV...",
+  generation_done: "CV rédigé, je le prépare pour vous...",
+  stored: "C'est prêt !",
+};
+
 function CVFlowManager() {
   const [currentStep, setCurrentStep] = useState(1);
   const [formData, setFormData] = useState({});
   const [isLoading, setIsLoading] = useState(false);
   const [analysisData, setAnalysisData] = useState(null);
+  const [generationStage, setGenerationStage] = useState(null);
 
   const totalSteps = 11;
 
@@ -57,9 +67,10 @@ function CVFlowManager() {
     } else if (currentStep === 9) {
       setCurrentStep(10);
       setIsLoading(true);
+      setGenerationStage(null);
 
       try {
-        const result = await generateResume(updatedData);
+        const result = await generateResume(updatedData, setGenerationStage);
         setIsLoading(false);
 
         if (result.next_action === "RENDER_ANALYSIS") {
@@ -100,7 +111,10 @@ function CVFlowManager() {
     return (
       <LoadingScreen
         title="Je génère un CV sur mesure..."
-        subtitle="Donnez-moi 20 à 30 secondes."
+        subtitle={
+          GENERATION_PROGRESS[generationStage] ||
+          "Donnez-moi 20 à 30 secondes."
+        }
       />
     );
   }
@@ -1,5 +1,9 @@
 import { useState, useEffect, useRef } from "react";
-import { sendMessage, clearSession } from "../services/apiService";
+import {
+  sendMessage,
+  streamMessage,
+  clearSession,
+} from "../services/apiService";
 import ChatHeader from "./ChatHeader";
 import MessageList from "./MessageList";
 import ChatInput from "./ChatInput";
@@ -10,6 +14,7 @@ function ChatbotUI() {
   const [messages, setMessages] = useState([]);
   const [currentInput, setCurrentInput] = useState("");
   const [isLoading, setIsLoading] = useState(false);
+  const [isStreaming, setIsStreaming] = useState(false);
   const [showCVFlow, setShowCVFlow] = useState(false);
   const [showDebugResume, setShowDebugResume] = useState(false); // DEBUG
   const messagesEndRef = useRef(null);
@@ -25,7 +30,7 @@ function ChatbotUI() {
   const handleSubmit = async (e, flowId = "PRESENTATION") => {
     e.preventDefault();
 
-    if (!currentInput.trim() || isLoading) return;
+    if (!currentInput.trim() || isLoading || isStreaming) return;
 
     const userMessage = {
       id: Date.now(),
@@ -37,15 +42,28 @@ function ChatbotUI() {
     setCurrentInput("");
     setIsLoading(true);
 
-    try {
-      const response = await sendMessage(userMessage.text, flowId, null);
+    const botMessageId = Date.now() + 1;
+    let hasStarted = false;
 
-      if (response.type === "text" && response.data) {
-        setMessages((prev) => [
-          ...prev,
-          { id: Date.now(), text: response.data, sender: "bot" },
-        ]);
-      }
+    try {
+      await streamMessage(userMessage.text, flowId, (chunk) => {
+        if (!hasStarted) {
+          // First token: replace the typing indicator with the bot message
+          hasStarted = true;
+          setIsLoading(false);
+          setIsStreaming(true);
+          setMessages((prev) => [
+            ...prev,
+            { id: botMessageId, text: chunk, sender: "bot" },
+          ]);
+          return;
+        }
+        setMessages((prev) =>
+          prev.map((msg) =>
+            msg.id === botMessageId ? { ...msg, text: msg.text + chunk } : msg,
+          ),
+        );
+      });
     } catch (error) {
       setMessages((prev) => [
         ...prev,
@@ -58,6 +76,7 @@ function ChatbotUI() {
       ]);
     } finally {
       setIsLoading(false);
+      setIsStreaming(false);
     }
   };
 
@@ -214,7 +233,7 @@ function ChatbotUI() {
         currentInput={currentInput}
         setCurrentInput={setCurrentInput}
         onSubmit={handleSubmit}
-        isLoading={isLoading}
+        isLoading={isLoading || isStreaming}
         onKeyPress={handleKeyPress}
       />
 
@@ -18,8 +18,17 @@ function getOrCreateSessionId() {
 
 /**
  * Clear the current session (start a new conversation).
+ * Also asks the backend to free the conversation history (fire-and-forget).
  */
 export function clearSession() {
+  const sessionId = sessionStorage.getItem("chat_session_id");
+
+  if (sessionId) {
+    fetch(`${API_BASE_URL}/chat/${encodeURIComponent(sessionId)}`, {
+      method: "DELETE",
+    }).catch(() => {});
+  }
+
   sessionStorage.removeItem("chat_session_id");
 }
 
@@ -76,6 +85,71 @@ export async function sendMessage(
   return { type: "text", data: data.response };
 }
 
+/**
+ * Send a message and stream the answer (Server-Sent Events).
+ *
+ * Only supported for conversational flows (PRESENTATION, ROADMAP).
+ *
+ * @param {string} message - The user's message
+ * @param {string} flowId - The flow to use (PRESENTATION, ROADMAP)
+ * @param {function} onChunk - Called with each text chunk as it arrives
+ * @returns {Promise<string>} The full answer once the stream is done
+ */
+export async function streamMessage(message, flowId, onChunk) {
+  const sessionId = getOrCreateSessionId();
+
+  const response = await fetch(`${API_BASE_URL}/chat/stream`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify({
+      message,
+      flow_id: flowId,
+      session_id: sessionId,
+    }),
+  });
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({}));
+    throw new Error(
+      errorData.detail || `HTTP error! status: ${response.status}`,
+    );
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let fullText = "";
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+
+    // SSE frames are separated by a blank line
+    const frames = buffer.split("\n\n");
+    buffer = frames.pop();
+
+    for (const frame of frames) {
+      const event = frame.match(/^event: (.*)$/m)?.[1];
+      const data = frame.match(/^data: (.*)$/m)?.[1];
+      if (!event || !data) continue;
+
+      const payload = JSON.parse(data);
+      if (event === "chunk") {
+        fullText += payload.text;
+        onChunk(payload.text);
+      } else if (event === "error") {
+        throw new Error(payload.detail);
+      }
+    }
+  }
+
+  return fullText;
+}
+
 /**
  * Scrape job information from URL.
  *
@@ -104,10 +178,14 @@ export async function scrapeJobUrl(jobUrl) {
 /**
  * Generate resume from complete job data.
  *
+ * The generation runs as a background job on the server; this follows its
+ * progress events (Server-Sent Events) until the result is available.
+ *
  * @param {object} jobData - Complete job and recruiter data
+ * @param {function} onProgress - Optional, called with each progress event name
  * @returns {Promise<object>} Resume generation result
  */
-export async function generateResume(jobData) {
+export async function generateResume(jobData, onProgress = () => {}) {
   const sessionId = getOrCreateSessionId();
 
   const response = await fetch(`${API_BASE_URL}/chat`, {
@@ -120,6 +198,7 @@ export async function generateResume(jobData) {
       flow_id: "DYNAMIC_CV",
       session_id: sessionId,
       form_data: jobData,
+      async_job: true,
     }),
   });
 
@@ -130,5 +209,74 @@ export async function generateResume(jobData) {
     );
   }
 
-  return await response.json();
+  const { widget_data: job } = await response.json();
+
+  try {
+    return await followGenerationJob(job, onProgress);
+  } catch (error) {
+    if (!error.streamClosed) throw error;
+    // The event stream could not be (re)opened: poll the job instead
+    return await pollGenerationJob(job, onProgress);
+  }
+}
+
+/**
+ * Follow a generation job over Server-Sent Events until it finishes.
+ *
+ * Transient disconnects are left to EventSource, which reconnects and gets
+ * the events replayed; only a closed stream or a server "error" event fail.
+ */
+function followGenerationJob(job, onProgress) {
+  return new Promise((resolve, reject) => {
+    const events = new EventSource(`${API_BASE_URL}${job.events_url}`);
+    const progressEvents = [
+      "queued",
+      "started",
+      "retrieval_done",
+      "generation_done",
+      "stored",
+    ];
+
+    for (const name of progressEvents) {
+      events.addEventListener(name, () => onProgress(name));
+    }
+    events.addEventListener("done", (event) => {
+      events.close();
+      resolve(JSON.parse(event.data));
+    });
+    events.addEventListener("error", (event) => {
+      if (event.data) {
+        // The job failed on the server
+        events.close();
+        reject(new Error(JSON.parse(event.data).detail));
+      } else if (events.readyState === EventSource.CLOSED) {
+        const error = new Error("Resume generation stream closed");
+        error.streamClosed = true;
+        reject(error);
+      }
+      // Otherwise EventSource is reconnecting on its own
+    });
+  });
+}
+
+/**
+ * Poll a generation job until it finishes.
+ */
+async function pollGenerationJob(job, onProgress, intervalMs = 1000) {
+  while (true) {
+    const response = await fetch(`${API_BASE_URL}${job.status_url}`);
+    if (!response.ok) {
+      const errorData = await response.json().catch(() => ({}));
+      throw new Error(
+        errorData.detail || `HTTP error! status: ${response.status}`,
+      );
+    }
+
+    const status = await response.json();
+    if (status.stage) onProgress(status.stage);
+    if (status.status === "done") return status.result;
+    if (status.status === "failed") throw new Error(status.error.detail);
+
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
 }